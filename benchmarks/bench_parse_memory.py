@@ -0,0 +1,43 @@
+"""
+Compare the vectorised parser of the measured shots with the previous
+conversion of each shot in a Python loop.
+"""
+
+import timeit
+from functools import partial
+
+import numpy as np
+
+from pennylane_ls.parsing import parse_memory, parse_memory_loop
+
+
+def random_memory(shots: int, wires: int, high: int) -> list:
+    """
+    Shots of random integers below `high` in the format of the server.
+    """
+    rng = np.random.default_rng(42)
+    values = rng.integers(0, high, size=(shots, wires))
+    return [" ".join(str(value) for value in row) for row in values]
+
+
+def main():
+    """
+    Run the benchmark for fermion occupations and large qudit values.
+    """
+    cases = {
+        "fermions, 1e5 shots x 8 wires": random_memory(10 ** 5, 8, 2),
+        "qudits, 1e5 shots x 8 wires": random_memory(10 ** 5, 8, 51),
+        "single qudit, 1e5 shots": random_memory(10 ** 5, 1, 51),
+    }
+    for name, memory in cases.items():
+        assert np.array_equal(parse_memory(memory), parse_memory_loop(memory))
+        t_loop = min(timeit.repeat(partial(parse_memory_loop, memory), number=1))
+        t_vec = min(timeit.repeat(partial(parse_memory, memory), number=1))
+        print(
+            f"{name}: loop {1e3 * t_loop:.1f} ms, vectorised {1e3 * t_vec:.1f} ms, "
+            f"speed-up {t_loop / t_vec:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
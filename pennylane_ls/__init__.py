@@ -4,5 +4,10 @@ The initialization of the `pennylane-ls` module
 from .single_qudit_device import SingleQuditDevice
 from .multi_qudit_device import MultiQuditDevice
 from .fermion_device import FermionDevice
+from .local_device import (
+    LocalFermionDevice,
+    LocalMultiQuditDevice,
+    LocalSingleQuditDevice,
+)
 
 from ._version import __version__
@@ -0,0 +1,230 @@
+"""
+Define an asynchronous client for the Django API, which allows a single
+process to keep many jobs in flight without a thread per job. It requires the
+optional `aiohttp` package, e.g. through `pip install pennylane-ls[async]`.
+"""
+
+import asyncio
+import json
+import time
+from typing import Optional
+
+from pennylane import DeviceError
+from pennylane.tape import QuantumTape
+
+from .waiting import WaitStrategy, ExponentialBackoff
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AsyncJob:
+    """
+    A job that was submitted through the `AsyncDjangoClient`.
+
+    Args:
+        client: the client through which the job was submitted.
+        job_id: the id of the job on the server.
+        device: the device that compiled the circuit of the job.
+        circuit: the `QuantumTape` of the circuit.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncDjangoClient",
+        job_id: str,
+        device: "DjangoDevice" = None,
+        circuit: QuantumTape = None,
+    ):
+        self.client = client
+        self.job_id = job_id
+        self.device = device
+        self.circuit = circuit
+        self._results_dict = None
+
+    async def status(self, long_poll: float = None) -> str:
+        """
+        Check remotely if the job was done already.
+
+        Args:
+            long_poll: the time in seconds for which the server may hold the request.
+        """
+        return await self.client.check_job_status(self.job_id, long_poll=long_poll)
+
+    async def wait(self):
+        """
+        Wait without blocking the event loop until the job is done.
+        """
+        strategy = self.client.wait_strategy
+        start = time.monotonic()
+        for delay in strategy.delays():
+            await asyncio.sleep(delay)
+            if await self.status(long_poll=strategy.long_poll) == "DONE":
+                break
+            if (
+                strategy.deadline is not None
+                and time.monotonic() - start > strategy.deadline
+            ):
+                raise TimeoutError(
+                    f"Job {self.job_id} was not done after {strategy.deadline} s."
+                )
+
+    async def result(self):
+        """
+        Wait for the job and return its result. If the job was submitted through a
+        device, these are the measured values of the circuit. Otherwise it is the
+        result dictionary of the server.
+        """
+        if self._results_dict is None:
+            await self.wait()
+            self._results_dict = await self.client.get_job_result(self.job_id)
+        if self.device is None:
+            return self._results_dict
+        return self.device.evaluate_result(
+            self.circuit, self._results_dict, job_id=self.job_id
+        )
+
+
+class AsyncDjangoClient:
+    """
+    The asynchronous counterpart of the submit, poll and fetch path of the
+    `DjangoDevice`. It is best used as an asynchronous context manager.
+
+    Args:
+        url: the url prefix of the API, e.g. "http://qsimsim.synqs.org/api/fermions/".
+        username: the username on the server.
+        password: the password on the server.
+        wait_strategy: the pauses between the status requests of each job.
+        limit: the maximum number of simultaneous connections.
+        timeout: the total timeout of each request in seconds.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        url: str,
+        username: str = None,
+        password: str = None,
+        wait_strategy: Optional[WaitStrategy] = None,
+        limit: int = 100,
+        timeout: float = 30,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "The asynchronous client requires aiohttp. "
+                "Install it with `pip install pennylane-ls[async]`."
+            )
+        self.url_prefix = url
+        self.username = username
+        self.password = password
+        if wait_strategy is None:
+            wait_strategy = ExponentialBackoff()
+        self.wait_strategy = wait_strategy
+        self.limit = limit
+        self.timeout = timeout
+        self._session = None
+
+    def session(self):
+        """
+        The HTTP session of the client, which is created on first use.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        """
+        Close the HTTP session and all its connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _call_api(
+        self, endpoint: str, payload: dict, method: str = "GET", timeout=None
+    ) -> dict:
+        """
+        Send the payload together with the credentials to the endpoint of the API
+        and return the decoded answer.
+
+        Args:
+            endpoint: the name of the endpoint, e.g. "get_job_status/"
+            payload: the dictionary which is send as json
+            method: "GET" sends the data as url parameters and "POST" as form data.
+            timeout: the total timeout of the request in seconds.
+        """
+        url = self.url_prefix + endpoint
+        data = {"json": json.dumps(payload)}
+        if self.username is not None:
+            data["username"] = self.username
+        if self.password is not None:
+            data["password"] = self.password
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        if method == "POST":
+            kwargs["data"] = data
+        else:
+            kwargs["params"] = data
+        async with self.session().request(method, url, **kwargs) as response:
+            return json.loads(await response.text())
+
+    async def submit(
+        self,
+        job_payload: dict,
+        device: "DjangoDevice" = None,
+        circuit: QuantumTape = None,
+    ) -> AsyncJob:
+        """
+        Submit the job payload to the server.
+
+        Args:
+            job_payload: the experiments of the job.
+            device: the device that compiled the circuit, if any.
+            circuit: the `QuantumTape` of the circuit, if any.
+        """
+        answer = await self._call_api("post_job/", job_payload, method="POST")
+        return AsyncJob(self, answer["job_id"], device=device, circuit=circuit)
+
+    async def check_job_status(self, job_id: str, long_poll: float = None) -> str:
+        """
+        Check remotely if the job was done already.
+
+        Args:
+            job_id: the id of the job.
+            long_poll: the time in seconds for which the server may hold the request.
+        """
+        status_payload = {"job_id": job_id}
+        timeout = None
+        if long_poll:
+            status_payload["wait"] = long_poll
+            timeout = long_poll + 10
+        answer = await self._call_api(
+            "get_job_status/", status_payload, timeout=timeout
+        )
+        if answer["status"] == "ERROR":
+            raise SyntaxError(answer["detail"])
+        return answer["status"]
+
+    async def get_job_result(self, job_id: str) -> dict:
+        """
+        Obtain the result of the job from the server.
+
+        Args:
+            job_id: the id of the job.
+        """
+        results_dict = await self._call_api("get_job_result/", {"job_id": job_id})
+        if "results" not in results_dict:
+            raise DeviceError(json.dumps(results_dict))
+        return results_dict
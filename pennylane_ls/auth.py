@@ -0,0 +1,120 @@
+"""
+Define the authentication with session tokens, such that the credentials are
+checked by the server only once instead of on every request.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from pennylane import DeviceError
+
+
+class TokenAuth:
+    """
+    Exchange the credentials of the devices once for a token and cache it. The
+    token is refreshed shortly before it expires or whenever the server rejects
+    it. Servers that answer the token endpoint with 404 are remembered and keep
+    receiving the credentials with every request. The exchange is sent through
+    the transport of the device, so it is retried like all other requests.
+
+    Args:
+        endpoint: the endpoint of the API that exchanges the credentials.
+        lifetime: the lifetime of a token in seconds, if the server does not
+            send its own `expires_in`.
+        refresh_margin: the time in seconds before the expiry at which the token
+            is refreshed.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "get_token/",
+        lifetime: float = 3600,
+        refresh_margin: float = 60,
+    ):
+        self.endpoint = endpoint
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._unsupported: Set[str] = set()
+        self._exchange_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.exchanges = 0
+        self.refreshes = 0
+
+    def token(self, device: "DjangoDevice") -> Optional[str]:
+        """
+        The valid token for the server and user of the device. `None` means that
+        the server does not support tokens. Failed exchanges raise a `DeviceError`.
+
+        Args:
+            device: the device that sends the request
+        """
+        key = (device.url_prefix, device.username)
+        with self._lock:
+            lock = self._exchange_locks.setdefault(key, threading.Lock())
+        # parallel requests of the same user exchange the credentials once, while
+        # the other users and servers do not wait for the exchange.
+        with lock:
+            with self._lock:
+                if device.url_prefix in self._unsupported:
+                    return None
+                cached = self._tokens.get(key)
+                if cached is not None and time.monotonic() < cached[1]:
+                    return cached[0]
+            exchanged = self._exchange(device)
+            with self._lock:
+                if exchanged is None:
+                    self._unsupported.add(device.url_prefix)
+                    return None
+                self._tokens[key] = exchanged
+                self.exchanges += 1
+                if cached is not None:
+                    self.refreshes += 1
+            return exchanged[0]
+
+    def _exchange(self, device: "DjangoDevice") -> Optional[Tuple[str, float]]:
+        """
+        Send the credentials to the token endpoint and return the token with its
+        expiry, or `None` if the server has no such endpoint.
+        """
+        response = device.transport.request(
+            device.session_pool,
+            "POST",
+            device.url_prefix + self.endpoint,
+            scope=device.url_prefix,
+            data={"username": device.username, "password": device.password},
+        )
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise DeviceError(f"The token exchange failed with {response.status_code}.")
+        try:
+            answer = response.json()
+            token = answer["token"]
+            lifetime = float(answer.get("expires_in", self.lifetime))
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            raise DeviceError("The server sent an invalid token answer.") from exc
+        return token, time.monotonic() + max(lifetime - self.refresh_margin, 0)
+
+    def invalidate(self, device: "DjangoDevice", token: str):
+        """
+        Forget the token after the server rejected it, such that the next request
+        obtains a new one.
+
+        Args:
+            device: the device that sent the request
+            token: the rejected token
+        """
+        key = (device.url_prefix, device.username)
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached is not None and cached[0] == token:
+                # expire the token, such that its renewal counts as a refresh.
+                self._tokens[key] = (token, 0)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        The counters for the exchanges of credentials and the refreshed tokens.
+        """
+        return {"exchanges": self.exchanges, "refreshes": self.refreshes}
@@ -3,10 +3,29 @@ Define the base class for communication with the Django API as laid out for
 `labscript-qc`
 """
 
+import copy
 import time
 import json
-import requests
-from pennylane import Device
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+import numpy as np
+from pennylane import Device, DeviceError, QuantumFunctionError
+from pennylane.operation import Expectation, Probability, Sample, Tensor, Variance
+from pennylane.tape import QuantumTape
+from pennylane.wires import Wires
+
+from .auth import TokenAuth
+from .job_future import Circuit, JobFuture
+from .parsing import parse_memory, unpack_memory
+from .poller import JobPoller
+from .result_store import ResultStore
+from .session_pool import SessionPool
+from .streaming import CHUNK_SIZE, MemoryStreamReader
+from .transport import Transport
+from .wire_format import WireFormat
+from .waiting import WaitStrategy, ExponentialBackoff
 
 
 class DjangoDevice(Device):
@@ -17,6 +36,21 @@ class DjangoDevice(Device):
     _operation_map = {}
     _observable_map = {}
 
+    # the keep-alive sessions that are shared by all devices
+    _session_pool = None
+
+    # the background poller that may be shared by all devices
+    _poller = None
+
+    # the retries and circuit breakers that are shared by all devices
+    _transport = None
+
+    # the token cache that may be shared by all devices
+    _token_auth = None
+
+    # the url prefixes of the servers that do not answer bulk status requests
+    _single_status_urls = set()
+
     # pylint: disable=R0913
     def __init__(
         self,
@@ -27,6 +61,16 @@ class DjangoDevice(Device):
         password=None,
         job_id=None,
         blocking=True,
+        session_pool=None,
+        wait_strategy: WaitStrategy = None,
+        max_workers: int = None,
+        result_store: ResultStore = None,
+        poller: JobPoller = None,
+        token_auth: TokenAuth = None,
+        transport: Transport = None,
+        wire_format: WireFormat = None,
+        stream_results: bool = False,
+        memmap_dir: str = None,
     ):
         """
         The initial part.
@@ -38,36 +82,456 @@ class DjangoDevice(Device):
         self.job_id = job_id
         self.url_prefix = url
         self.job_payload = {}
+        self._results_dict = None
+        self._job_samples = None
+        self._job_weights = None
+        self._wire_counts = None
+        self._pending_results = None
+        self._measured_wires = None
+        if session_pool is None:
+            session_pool = self.shared_session_pool()
+        self.session_pool = session_pool
+        if wait_strategy is None:
+            wait_strategy = ExponentialBackoff()
+        self.wait_strategy = wait_strategy
+        self.max_workers = max_workers
+        self.result_store = result_store
+        self.poller = poller
+        self.token_auth = token_auth
+        if transport is None:
+            transport = self.shared_transport()
+        self.transport = transport
+        self.wire_format = wire_format
+        self.stream_results = stream_results or memmap_dir is not None
+        self.memmap_dir = memmap_dir
+        self._submitted_payload = None
+        self._job_future = None
 
-    def check_job_status(self) -> str:
+    @classmethod
+    def shared_session_pool(cls) -> SessionPool:
         """
-        Check remotely if the job was done already.
+        The session pool that is used by all devices, which were not given their own.
+        """
+        if DjangoDevice._session_pool is None:
+            DjangoDevice._session_pool = SessionPool()
+        return DjangoDevice._session_pool
+
+    @classmethod
+    def configure_session_pool(cls, **kwargs) -> SessionPool:
+        """
+        Replace the shared session pool by a new one with the given settings.
+
+        Args:
+            kwargs: the arguments of `SessionPool`, i.e. `pool_connections`,
+                `pool_maxsize` and `timeout`.
+        """
+        if DjangoDevice._session_pool is not None:
+            DjangoDevice._session_pool.close()
+        DjangoDevice._session_pool = SessionPool(**kwargs)
+        return DjangoDevice._session_pool
+
+    @classmethod
+    def shared_poller(cls) -> JobPoller:
         """
-        status_payload = {"job_id": self.job_id}
-        url = self.url_prefix + "get_job_status/"
-        status_response = requests.get(
+        The background poller for the jobs of all devices. Devices use it if they
+        are created with `poller=DjangoDevice.shared_poller()`.
+        """
+        if DjangoDevice._poller is None:
+            DjangoDevice._poller = JobPoller()
+        return DjangoDevice._poller
+
+    @classmethod
+    def shared_transport(cls) -> Transport:
+        """
+        The retries and circuit breakers that are used by all devices, which were
+        not given their own transport.
+        """
+        if DjangoDevice._transport is None:
+            DjangoDevice._transport = Transport()
+        return DjangoDevice._transport
+
+    @classmethod
+    def shared_token_auth(cls) -> TokenAuth:
+        """
+        The token cache for all devices. Devices use it if they are created with
+        `token_auth=DjangoDevice.shared_token_auth()`.
+        """
+        if DjangoDevice._token_auth is None:
+            DjangoDevice._token_auth = TokenAuth()
+        return DjangoDevice._token_auth
+
+    def _call_api(self, endpoint: str, payload: dict, method: str = "GET", **kwargs):
+        """
+        Send the payload to the endpoint of the API. The request is authenticated
+        by the token of the device, if it has one, and by the credentials otherwise.
+        A rejected token is refreshed once.
+
+        Args:
+            endpoint: the name of the endpoint, e.g. "get_job_status/"
+            payload: the dictionary which is send as json
+            method: "GET" sends the data as url parameters and "POST" as form data.
+            kwargs: further arguments for the request, e.g. the `timeout` or the
+                `idempotency_key`, under which the server recognises repetitions.
+        """
+        url = self.url_prefix + endpoint
+        token = None
+        if self.token_auth is not None:
+            token = self.token_auth.token(self)
+        response = self._send(method, url, payload, token, **kwargs)
+        if token is not None and response.status_code in (401, 403):
+            # the server has dropped the token, so we ask for a new one.
+            response.close()
+            self.token_auth.invalidate(self, token)
+            token = self.token_auth.token(self)
+            response = self._send(method, url, payload, token, **kwargs)
+        return response
+
+    # pylint: disable=R0913
+    def _send(
+        self,
+        method: str,
+        url: str,
+        payload: dict,
+        token: str,
+        idempotency_key: str = None,
+        **kwargs,
+    ):
+        """
+        Send the payload with the token or, if there is none, with the credentials.
+        GET requests and requests with an idempotency key are repeated by the
+        transport, if they fail.
+        """
+        fields = {}
+        headers = {}
+        if token is None:
+            fields["username"] = self.username
+            fields["password"] = self.password
+        else:
+            headers["Authorization"] = f"Token {token}"
+        if idempotency_key is not None:
+            fields["idempotency_key"] = idempotency_key
+        idempotent = method == "GET" or idempotency_key is not None
+        if self.wire_format is not None:
+            kwargs.update(
+                self.wire_format.encode(method, url, payload, fields, headers)
+            )
+        else:
+            data = dict(fields, json=json.dumps(payload))
+            if headers:
+                kwargs["headers"] = headers
+            if method == "POST":
+                kwargs["data"] = data
+            else:
+                kwargs["params"] = data
+        return self.transport.request(
+            self.session_pool,
+            method,
             url,
-            params={
-                "json": json.dumps(status_payload),
-                "username": self.username,
-                "password": self.password,
-            },
+            idempotent=idempotent,
+            scope=self.url_prefix,
+            **kwargs,
+        )
+
+    def _decode(self, response) -> dict:
+        """
+        The decoded answer of the server, which is JSON unless the wire format
+        negotiated something else.
+        """
+        if self.wire_format is None:
+            return response.json()
+        return self.wire_format.decode(response)
+
+    def submit_job(self, job_payload: dict) -> str:
+        """
+        Submit a job payload to the server and return the id of the job.
+
+        Args:
+            job_payload: the experiments of the job
+        """
+        # a repeated submission carries the same key, such that the server can
+        # recognise it instead of running the job twice.
+        job_response = self._call_api(
+            "post_job/", job_payload, method="POST", idempotency_key=uuid.uuid4().hex
         )
-        job_status = (status_response.json())["status"]
-        job_status_detail = (status_response.json())["detail"]
+        return self._decode(job_response)["job_id"]
+
+    def post_job(self) -> str:
+        """
+        Submit the job payload to the server and remember the job id.
+        """
+        self.job_id = self.submit_job(self.job_payload)
+        self._submitted_payload = self.job_payload
+        return self.job_id
+
+    def check_job_status(self, long_poll: float = None, job_id: str = None) -> str:
+        """
+        Check remotely if the job was done already.
+
+        Args:
+            long_poll: the time in seconds for which the server may hold the request
+                until the status of the job changes.
+            job_id: the id of the job. By default it is the current job of the device.
+        """
+        if job_id is None:
+            job_id = self.job_id
+        status_payload = {"job_id": job_id}
+        kwargs = {}
+        if long_poll:
+            status_payload["wait"] = long_poll
+            timeout = self.session_pool.timeout
+            connect_timeout = timeout[0] if isinstance(timeout, tuple) else timeout
+            kwargs["timeout"] = (connect_timeout, long_poll + 10)
+        status_response = self._call_api("get_job_status/", status_payload, **kwargs)
+        answer = self._decode(status_response)
+        job_status = answer["status"]
+        job_status_detail = answer["detail"]
         if job_status == "ERROR":
             raise SyntaxError(job_status_detail)
         return job_status
 
-    def wait_till_done(self):
+    def check_job_statuses(self, job_ids: List[str]) -> dict:
+        """
+        Check the status of many jobs at once. If the server supports it, all ids
+        are sent in a single request. Otherwise each job is checked on its own.
+        The answer maps each job id to its "status" and "detail". Failed requests
+        raise a `DeviceError`, since they are no evidence against bulk requests.
+
+        Args:
+            job_ids: the ids of the jobs.
+        """
+        if len(job_ids) > 1 and self.url_prefix not in self._single_status_urls:
+            status_response = self._call_api("get_job_status/", {"job_ids": job_ids})
+            if status_response.status_code not in (200, 400):
+                raise DeviceError(
+                    f"The status request failed with {status_response.status_code}."
+                )
+            answer = self._decode(status_response)
+            if "statuses" in answer:
+                return {job_id: answer["statuses"][job_id] for job_id in job_ids}
+            if "status" not in answer and "detail" not in answer:
+                raise DeviceError(f"Unexpected status answer {answer}.")
+            # the server answered as for a single job, i.e. it lacks bulk requests.
+            DjangoDevice._single_status_urls.add(self.url_prefix)
+        statuses = {}
+        for job_id in job_ids:
+            status_response = self._call_api("get_job_status/", {"job_id": job_id})
+            statuses[job_id] = self._decode(status_response)
+        return statuses
+
+    def get_job_result(self, job_id: str = None) -> dict:
+        """
+        Obtain the result of the job from the server. If the device streams the
+        results, JSON answers are read chunk by chunk and the shots are converted
+        into arrays on the way.
+
+        Args:
+            job_id: the id of the job. By default it is the current job of the device.
+        """
+        if job_id is None:
+            job_id = self.job_id
+        result_payload = {"job_id": job_id}
+        result_response = self._call_api(
+            "get_job_result/", result_payload, stream=self.stream_results
+        )
+        content_type = result_response.headers.get("Content-Type", "application/json")
+        if self.stream_results and content_type.startswith("application/json"):
+            reader = MemoryStreamReader(shots=self.shots, memmap_dir=self.memmap_dir)
+            with result_response:
+                for chunk in result_response.iter_content(chunk_size=CHUNK_SIZE):
+                    reader.feed(chunk)
+            results_dict = reader.close()
+        else:
+            results_dict = self._decode(result_response)
+        if "results" not in results_dict:
+            raise DeviceError(str(results_dict))
+        return results_dict
+
+    def job_result(self) -> dict:
+        """
+        The result of the current job. It is obtained from the server once the job
+        is done. In the non-blocking mode `None` is returned for unfinished jobs.
+        """
+        if self._results_dict is None:
+            if self.blocking:
+                self.wait_till_done()
+            elif self.check_job_status() != "DONE":
+                return None
+            self._results_dict = self.fetch_result(self.job_id, self._submitted_payload)
+        return self._results_dict
+
+    def fetch_result(self, job_id: str, job_payload: dict = None) -> dict:
+        """
+        Obtain the result of a finished job and save it in the result store.
+
+        Args:
+            job_id: the id of the job.
+            job_payload: the experiments of the job, if they are known.
+        """
+        results_dict = self.get_job_result(job_id)
+        self._store_result(job_payload, results_dict)
+        return results_dict
+
+    def job_future(self) -> JobFuture:
+        """
+        The future of the current job, which is returned by the measurements in
+        the non-blocking mode. During the execution of a circuit its result are
+        the measured values of the circuit.
+        """
+        if self._job_future is None or self._job_future.job_id != self.job_id:
+            circuit = None
+            if self._op_queue is not None:
+                circuit = Circuit(list(self._op_queue), list(self._obs_queue))
+            self._job_future = JobFuture(
+                self, self.job_id, circuit, job_payload=self._submitted_payload
+            )
+        return self._job_future
+
+    @staticmethod
+    def parse_memory(memory: List[str]) -> np.ndarray:
+        """
+        Convert the measured shots into an integer array of the shape
+        (shots, measured wires).
+
+        Args:
+            memory: the shots as strings of space separated integers
+        """
+        return parse_memory(memory)
+
+    def job_samples(self) -> np.ndarray:
+        """
+        The measured shots of the current job as an integer array of the shape
+        (shots, measured wires). The result is fetched and parsed only once per
+        job, such that all observables are derived from the same array. In the
+        non-blocking mode `None` is returned for unfinished jobs.
+        """
+        if self._job_samples is None:
+            results_dict = self.job_result()
+            if results_dict is None:
+                return None
+            self._job_samples = self._parse_samples(results_dict)
+        return self._job_samples
+
+    def _parse_samples(self, results_dict: dict) -> np.ndarray:
         """
-        The waiting function that blocks the program
+        Convert the shots of the first experiment in the result into an array.
+        For an exact distribution these are its outcomes.
         """
-        while True:
-            time.sleep(2)
-            job_status = self.check_job_status()
+        data = results_dict["results"][0]["data"]
+        if "memory_packed" in data:
+            return unpack_memory(data["memory_packed"])
+        if "probabilities" in data:
+            return self.parse_memory(list(data["probabilities"]))
+        return self.parse_memory(data["memory"])
+
+    def job_weights(self) -> np.ndarray:
+        """
+        The probability of each row of `job_samples` if the result is the exact
+        distribution of an experiment without shots. For measured shots, which
+        all have the same weight, `None` is returned.
+        """
+        if self._job_weights is None:
+            results_dict = self.job_result()
+            if results_dict is None:
+                return None
+            data = results_dict["results"][0]["data"]
+            if "probabilities" not in data:
+                return None
+            self._job_weights = np.array(list(data["probabilities"].values()))
+        return self._job_weights
+
+    def wire_counts(self) -> np.ndarray:
+        """
+        The histogram of the measured values of each wire as an array of the
+        shape (measured wires, values). It is computed once per job in a single
+        pass over the shots, which are not kept unless `job_samples` was called.
+        For an exact distribution the counts are the probabilities of the values.
+        In the non-blocking mode `None` is returned for unfinished jobs.
+        """
+        if self._wire_counts is None:
+            results_dict = self.job_result()
+            if results_dict is None:
+                return None
+            samples = self._job_samples
+            if samples is None:
+                samples = self._parse_samples(results_dict)
+            num_values = int(samples.max()) + 1 if samples.size else 1
+            num_columns = samples.shape[1]
+            # shift the values of each column into a range of its own.
+            offsets = np.arange(num_columns) * num_values
+            weights = self.job_weights()
+            if weights is not None:
+                weights = np.repeat(weights, num_columns)
+            counts = np.bincount(
+                (samples + offsets).ravel(),
+                weights=weights,
+                minlength=num_columns * num_values,
+            )
+            self._wire_counts = counts.reshape(num_columns, num_values)
+        return self._wire_counts
+
+    def joint_counts(self, columns: List[int]) -> np.ndarray:
+        """
+        The joint histogram of the measured values on several wires. The entry
+        `[v_0, v_1, ...]` counts the shots with the value `v_i` in the column
+        `columns[i]` of the shots.
+
+        Args:
+            columns: the columns of the measured wires in the shots
+        """
+        samples = self.job_samples()
+        num_values = self.wire_counts().shape[1]
+        dims = (num_values,) * len(columns)
+        codes = np.ravel_multi_index(samples[:, columns].T, dims)
+        counts = np.bincount(
+            codes, weights=self.job_weights(), minlength=num_values ** len(columns)
+        )
+        return counts.reshape(dims)
+
+    def _stored_result(self, job_payload: dict) -> dict:
+        """
+        The result of an identical job from the result store, if there is any.
+        """
+        if self.result_store is None:
+            return None
+        return self.result_store.get(self.url_prefix, job_payload)
+
+    def _store_result(self, job_payload: dict, results_dict: dict):
+        """
+        Save the result of a job in the result store, if there is any.
+        """
+        if self.result_store is not None and job_payload is not None:
+            self.result_store.put(self.url_prefix, job_payload, results_dict)
+
+    def wait_till_done(self, job_id: str = None):
+        """
+        The waiting function that blocks the program until the job is done. The
+        pauses between the status requests are given by the `wait_strategy`. If
+        the device has a poller, we sleep until the poller wakes us instead.
+
+        Args:
+            job_id: the id of the job. By default it is the current job of the device.
+        """
+        if job_id is None:
+            job_id = self.job_id
+        strategy = self.wait_strategy
+        if self.poller is not None:
+            exception = JobFuture(self, job_id).exception(strategy.deadline)
+            if exception is not None:
+                raise exception
+            return
+        start = time.monotonic()
+        for delay in strategy.delays():
+            time.sleep(delay)
+            job_status = self.check_job_status(strategy.long_poll, job_id)
             if job_status == "DONE":
                 break
+            if (
+                strategy.deadline is not None
+                and time.monotonic() - start > strategy.deadline
+            ):
+                raise TimeoutError(
+                    f"Job {job_id} was not done after {strategy.deadline} s."
+                )
 
     def pre_apply(self):
         """
@@ -83,6 +547,494 @@ class DjangoDevice(Device):
             },
         }
 
+    def measurement_instructions(self, wires: Wires) -> list:
+        """
+        The measurement instructions that are appended to the job for the
+        observed wires.
+
+        Args:
+            wires: the wires of all observables in the circuit
+        """
+        return [("measure", [wire], []) for wire in wires.labels]
+
+    def _add_measurements(self, observables):
+        """
+        Append the measurement instructions for the observables to the payload.
+        """
+        wires = Wires.all_wires([obs.wires for obs in observables])
+        self._measured_wires = wires.labels
+        self.job_payload["experiment_0"]["instructions"].extend(
+            self.measurement_instructions(wires)
+        )
+
+    def pre_measure(self):
+        """
+        Add the measurements and submit the job. In the blocking mode we also
+        wait for the result.
+        """
+        self._add_measurements(self.obs_queue)
+        if self._pending_results is not None:
+            self.job_id, self._results_dict = self._pending_results
+            self._pending_results = None
+            return
+        stored_result = self._stored_result(self.job_payload)
+        if stored_result is not None:
+            self.job_id, self._results_dict = stored_result.get("job_id"), stored_result
+            return
+        self.post_job()
+        if self.blocking:
+            self.job_result()
+
+    @staticmethod
+    def broadcast(operations: list, observables: list) -> List[Circuit]:
+        """
+        Split a circuit whose gates have arrays of parameters into one circuit per
+        element of the arrays. If no gate is broadcast, `None` is returned.
+
+        Args:
+            operations: the operations of the circuit
+            observables: the observables of the circuit
+        """
+        # the arrays are converted once, such that each element is a lookup.
+        arrays = [
+            [np.asarray(param) if np.ndim(param) == 1 else None for param in op.data]
+            for op in operations
+        ]
+        sizes = {
+            len(array) for params in arrays for array in params if array is not None
+        }
+        if not sizes:
+            return None
+        if len(sizes) > 1:
+            raise ValueError("The broadcast parameters must have the same length.")
+        circuits = []
+        for index in range(sizes.pop()):
+            elements = []
+            for operation, params in zip(operations, arrays):
+                element = operation
+                if any(array is not None for array in params):
+                    element = copy.copy(operation)
+                    element.data = [
+                        param if array is None else array[index]
+                        for param, array in zip(operation.data, params)
+                    ]
+                elements.append(element)
+            circuits.append(Circuit(elements, observables))
+        return circuits
+
+    # pylint: disable=W0102
+    def execute(self, queue: list, observables: list, parameters: dict = {}, **kwargs):
+        """
+        Execute a circuit. Gates with arrays of parameters broadcast the circuit
+        over the arrays, i.e. it is executed for each element of the arrays as
+        an experiment of a single job and the measured values are stacked.
+
+        Args:
+            queue: the operations of the circuit
+            observables: the observables of the circuit
+            parameters: the dependencies of the operations on the free parameters
+            kwargs: further arguments of `Device.execute`
+        """
+        circuits = self.broadcast(queue, observables)
+        if circuits is None:
+            return self.run_circuit(queue, observables, parameters)
+        if self.blocking and not self.max_workers:
+            self.check_validity(queue, observables)
+            return self.broadcast_execute(circuits)
+        results = self.batch_execute(circuits)
+        if not self.blocking:
+            return results
+        return np.stack([np.asarray(result) for result in results])
+
+    def run_circuit(self, queue: list, observables: list, parameters: dict):
+        """
+        Execute a single circuit like `Device.execute`, but hand out the
+        `JobFuture` of a job that is not done yet as the value of any measurement,
+        including distributions.
+
+        Args:
+            queue: the operations of the circuit
+            observables: the observables of the circuit
+            parameters: the dependencies of the operations on the free parameters
+        """
+        self.check_validity(queue, observables)
+        self._op_queue = queue
+        self._obs_queue = observables
+        self._parameters = dict(parameters)
+
+        with self.execution_context():
+            self.pre_apply()
+            for operation in queue:
+                self.apply(operation.name, operation.wires, operation.parameters)
+            self.post_apply()
+
+            self.pre_measure()
+            results = [self.measure(observable) for observable in observables]
+            self.post_measure()
+
+            self._op_queue = None
+            self._obs_queue = None
+            self._parameters = None
+
+            self._num_executions += 1
+            if self.tracker.active:
+                self.tracker.update(executions=1, shots=self._shots)
+                self.tracker.record()
+
+        if all(obs.return_type is Sample for obs in observables):
+            return self._asarray(results)
+        if any(obs.return_type is Sample for obs in observables):
+            return self._asarray(results, dtype="object")
+        return self._asarray(results)
+
+    def measure(self, observable: Any):
+        """
+        The measured value of an observable of the executed circuit.
+
+        Args:
+            observable: the observable or measurement with its return type
+        """
+        if isinstance(observable, Tensor):
+            wires = [obs.wires for obs in observable.obs]
+        else:
+            wires = observable.wires
+        if observable.return_type is Probability:
+            probabilities = self.probability(wires=wires)
+            if isinstance(probabilities, JobFuture):
+                return [probabilities]
+            return list(probabilities.values())
+        name, params = observable.name, observable.parameters
+        if observable.return_type is Expectation:
+            return self.expval(name, wires, params)
+        if observable.return_type is Variance:
+            return self.var(name, wires, params)
+        if observable.return_type is Sample:
+            return np.array(self.sample(name, wires, params))
+        raise QuantumFunctionError(
+            f"Unsupported return type specified for observable {observable.name}"
+        )
+
+    def broadcast_execute(self, circuits: List[Circuit]) -> np.ndarray:
+        """
+        Execute the elements of a broadcast circuit as the experiments of a single
+        job and stack their measured values. The expectation values and variances
+        are computed for all elements at once from the histograms of their
+        outcomes, while other measurements are evaluated element by element.
+
+        Args:
+            circuits: the circuits of the elements, which share their observables
+        """
+        experiments = {}
+        contexts = []
+        measurements = None
+        for index, circuit in enumerate(circuits):
+            self.pre_apply()
+            for operation in circuit.operations:
+                self.apply(operation.name, operation.wires, operation.parameters)
+            experiment = self.job_payload["experiment_0"]
+            # the measurements are the same for all elements.
+            if measurements is None:
+                start = len(experiment["instructions"])
+                self._add_measurements(circuit.observables)
+                measurements = experiment["instructions"][start:]
+                measured_wires = self._measured_wires
+            else:
+                experiment["instructions"].extend(measurements)
+                self._measured_wires = measured_wires
+            experiments[f"experiment_{index}"] = experiment
+            contexts.append(self.observable_context())
+        self.reset()
+        job_id, results_dict = self.run_job(experiments)
+        results = self.experiment_results(results_dict, len(circuits))
+
+        self._num_executions += len(circuits)
+        if self.tracker.active:
+            self.tracker.update(batches=1, batch_len=len(circuits))
+            self.tracker.record()
+
+        stacked = self.stacked_moments(circuits[0].observables, results, contexts)
+        if stacked is not None:
+            return stacked
+        return np.stack(
+            [
+                np.asarray(self.evaluate_result(circuit, result, job_id))
+                for circuit, result in zip(circuits, results)
+            ]
+        )
+
+    def stacked_moments(
+        self, observables: list, results: List[dict], contexts: list
+    ) -> np.ndarray:
+        """
+        The expectation values and variances of the observables for each of the
+        experiment results as an array of the shape (experiments, observables).
+        The outcomes of all experiments are parsed once and each experiment
+        contributes a row of weights, i.e. its probabilities or its counts. If
+        the results or observables do not allow this, `None` is returned.
+
+        Args:
+            observables: the observables of the experiments
+            results: the result of each experiment as given by `experiment_results`
+            contexts: the `observable_context` of each experiment
+        """
+        if any(obs.return_type not in (Expectation, Variance) for obs in observables):
+            return None
+        columns = {}
+        # the experiments mostly share their outcomes, so their columns are reused.
+        known = {}
+        histograms = []
+        for result in results:
+            data = result["results"][0]["data"]
+            if "probabilities" in data:
+                histogram = data["probabilities"]
+            elif "memory" in data:
+                histogram = Counter(data["memory"])
+            else:
+                return None
+            keys = tuple(histogram)
+            if keys not in known:
+                known[keys] = [columns.setdefault(key, len(columns)) for key in keys]
+            histograms.append((known[keys], list(histogram.values())))
+        matrix = np.zeros((len(results), len(columns)))
+        for row, (cols, weights) in enumerate(histograms):
+            matrix[row, cols] = weights
+        matrix /= matrix.sum(axis=1, keepdims=True)
+        outcomes = self.parse_memory(list(columns))
+
+        groups = {}
+        for row, context in enumerate(contexts):
+            groups.setdefault(context, []).append(row)
+        stacks = []
+        for obs in observables:
+            stack = None
+            for context, group in groups.items():
+                try:
+                    values = self.observable_values(
+                        obs.name, obs.wires, outcomes, context
+                    )
+                except NotImplementedError:
+                    return None
+                probabilities = matrix[group]
+                mean = probabilities @ values
+                if obs.return_type is Variance:
+                    deviations = values[np.newaxis] - mean[:, np.newaxis]
+                    mean = np.einsum("nk,nk...->n...", probabilities, deviations ** 2)
+                if stack is None:
+                    stack = np.zeros((len(results),) + mean.shape[1:])
+                stack[group] = mean
+            stacks.append(stack)
+        return np.stack(stacks, axis=1)
+
+    def observable_context(self):
+        """
+        The state of the device, on which the values of the observables depend,
+        e.g. the dimension of the qudits. It is recorded for each element of a
+        broadcast circuit.
+        """
+        return None
+
+    def observable_values(
+        self, observable: str, wires: Wires, outcomes: np.ndarray, context: Any
+    ) -> np.ndarray:
+        """
+        The value of the observable for each outcome, i.e. for each row of the
+        measured shots. Devices that do not know them raise `NotImplementedError`,
+        in which case the broadcast circuits are evaluated one by one.
+
+        Args:
+            observable: the name of the observable
+            wires: the wires of the observable
+            outcomes: the outcomes as an integer array of the shape (outcomes, columns)
+            context: the `observable_context` of the experiment
+        """
+        raise NotImplementedError()
+
+    def job_payload_for(self, circuit: QuantumTape) -> dict:
+        """
+        Compile a circuit into the job payload without submitting it.
+
+        Args:
+            circuit: the `QuantumTape` of the circuit
+        """
+        self.pre_apply()
+        for operation in circuit.operations:
+            self.apply(operation.name, operation.wires, operation.parameters)
+        self._add_measurements(circuit.observables)
+        return self.job_payload
+
+    def evaluate_result(
+        self, circuit: QuantumTape, results_dict: dict, job_id: str = None
+    ):
+        """
+        Obtain the measured values of a circuit from the result of its job
+        without contacting the server.
+
+        Args:
+            circuit: the `QuantumTape` of the circuit
+            results_dict: the result of the job as returned by `get_job_result`
+            job_id: the id of the job
+        """
+        self._pending_results = (job_id, results_dict)
+        return self.execute(circuit.operations, circuit.observables)
+
+    @staticmethod
+    def experiment_result(results_dict: dict, index: int) -> dict:
+        """
+        Extract the result of a single experiment from the result of a job with
+        many experiments, such that it looks like the result of a job with only
+        this experiment.
+
+        Args:
+            results_dict: the result of the job as returned by `get_job_result`
+            index: the number of the experiment
+        """
+        name = f"experiment_{index}"
+        for result in results_dict["results"]:
+            if result.get("header", {}).get("name") == name:
+                break
+        else:
+            result = results_dict["results"][index]
+        return dict(results_dict, results=[result])
+
+    @staticmethod
+    def experiment_results(results_dict: dict, num_experiments: int) -> List[dict]:
+        """
+        Split the result of a job into the results of its experiments, as given
+        by `experiment_result`, in a single pass over the results.
+
+        Args:
+            results_dict: the result of the job as returned by `get_job_result`
+            num_experiments: the number of experiments of the job
+        """
+        results = results_dict["results"]
+        by_name = {}
+        for result in results:
+            by_name.setdefault(result.get("header", {}).get("name"), result)
+        return [
+            dict(
+                results_dict,
+                results=[by_name.get(f"experiment_{index}", results[index])],
+            )
+            for index in range(num_experiments)
+        ]
+
+    def run_job(self, job_payload: dict) -> tuple:
+        """
+        Submit a job payload, wait for the job and obtain its result. The state
+        of the device is not touched, such that many jobs can run in parallel.
+
+        Args:
+            job_payload: the experiments of the job
+        """
+        stored_result = self._stored_result(job_payload)
+        if stored_result is not None:
+            return stored_result.get("job_id"), stored_result
+        job_id = self.submit_job(job_payload)
+        self.wait_till_done(job_id)
+        return job_id, self.fetch_result(job_id, job_payload)
+
+    def submit_circuit(self, circuit: QuantumTape) -> JobFuture:
+        """
+        Submit a circuit without waiting for its job. The returned future gives
+        the measured values of the circuit once the job is done, such that many
+        circuits can be in flight at the same time.
+
+        Args:
+            circuit: the `QuantumTape` of the circuit
+        """
+        job_payload = self.job_payload_for(circuit)
+        self.reset()
+        stored_result = self._stored_result(job_payload)
+        if stored_result is not None:
+            return JobFuture(
+                self, stored_result.get("job_id"), circuit, results_dict=stored_result
+            )
+        job_id = self.submit_job(job_payload)
+        return JobFuture(self, job_id, circuit, job_payload=job_payload)
+
+    def batch_execute(self, circuits: List[QuantumTape]):
+        """
+        Execute a batch of circuits. By default they are the numbered experiments
+        of a single job, such that the whole batch is submitted, polled and fetched
+        only once. If the device has `max_workers`, each circuit is a job of its
+        own and the jobs run in parallel on a pool of this many threads. In the
+        non-blocking mode each circuit is submitted one after the other.
+
+        Args:
+            circuits: the list of `QuantumTape` to execute
+        """
+        if not self.blocking or len(circuits) < 2:
+            return super().batch_execute(circuits)
+
+        job_payloads = [self.job_payload_for(circuit) for circuit in circuits]
+        self.reset()
+
+        if self.max_workers:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                jobs = list(executor.map(self.run_job, job_payloads))
+            results = [
+                self.evaluate_result(circuit, results_dict, job_id)
+                for circuit, (job_id, results_dict) in zip(circuits, jobs)
+            ]
+        else:
+            job_payload = {
+                f"experiment_{index}": payload["experiment_0"]
+                for index, payload in enumerate(job_payloads)
+            }
+            job_id, results_dict = self.run_job(job_payload)
+            results = [
+                self.evaluate_result(circuit, experiment_result, job_id)
+                for circuit, experiment_result in zip(
+                    circuits, self.experiment_results(results_dict, len(circuits))
+                )
+            ]
+
+        if self.tracker.active:
+            self.tracker.update(batches=1, batch_len=len(circuits))
+            self.tracker.record()
+
+        return results
+
+    async def submit(self, circuit: QuantumTape, client: "AsyncDjangoClient"):
+        """
+        Submit a circuit through an asynchronous client. The returned job can be
+        awaited for the measured values of the circuit, e.g.
+        `await (await device.submit(tape, client)).result()`.
+
+        Args:
+            circuit: the `QuantumTape` of the circuit
+            client: the `AsyncDjangoClient` which communicates with the server
+        """
+        job_payload = self.job_payload_for(circuit)
+        return await client.submit(job_payload, device=self, circuit=circuit)
+
+    def async_client(self, **kwargs):
+        """
+        Create an asynchronous client with the url, credentials and waiting
+        strategy of this device.
+
+        Args:
+            kwargs: further arguments of `AsyncDjangoClient`
+        """
+        from .async_client import AsyncDjangoClient
+
+        kwargs.setdefault("wait_strategy", self.wait_strategy)
+        return AsyncDjangoClient(
+            self.url_prefix,
+            username=self.username,
+            password=self.password,
+            **kwargs,
+        )
+
+    def reset(self):
+        self.job_id = None
+        self._results_dict = None
+        self._job_samples = None
+        self._job_weights = None
+        self._wire_counts = None
+        self._submitted_payload = None
+        self._measured_wires = None
+
     @property
     def operations(self):
         return set(self._operation_map.keys())
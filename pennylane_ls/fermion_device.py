@@ -2,16 +2,14 @@
 A device that allows us to implement operation ons a fermion tweezer experiments.
 The backend is a remote simulator.
 """
-import json
 from collections import OrderedDict
 
 import numpy as np
-import requests
-
-from pennylane import DeviceError
-
+from pennylane.wires import Wires
 
 from .django_device import DjangoDevice
+from .parsing import MAX_PACKED_WIRES, parse_memory, pack_bits, unpack_bits
+from .parsing import unpack_memory
 
 # observables
 from .fermion_ops import ParticleNumber
@@ -54,6 +52,12 @@ class FermionDevice(DjangoDevice):
         "Identity": Identity,
     }
 
+    # the largest number of wires of the experiment, or None without limit
+    max_wires = 8
+
+    # beyond this number of wires no histogram over all codes is kept
+    max_histogram_wires = 16
+
     # pylint: disable=R0913
     def __init__(
         self,
@@ -64,9 +68,21 @@ class FermionDevice(DjangoDevice):
         password=None,
         job_id=None,
         blocking=True,
+        session_pool=None,
+        wait_strategy=None,
+        max_workers=None,
+        result_store=None,
+        poller=None,
+        token_auth=None,
+        transport=None,
+        wire_format=None,
+        stream_results=False,
+        memmap_dir=None,
+        packed_samples=False,
     ):
         """
-        The initial part.
+        The initial part. With `packed_samples` the occupations of each shot are
+        stored as a single packed integer instead of one integer per wire.
         """
 
         super().__init__(
@@ -77,11 +93,30 @@ class FermionDevice(DjangoDevice):
             password=password,
             blocking=blocking,
             job_id=job_id,
+            session_pool=session_pool,
+            wait_strategy=wait_strategy,
+            max_workers=max_workers,
+            result_store=result_store,
+            poller=poller,
+            token_auth=token_auth,
+            transport=transport,
+            wire_format=wire_format,
+            stream_results=stream_results,
+            memmap_dir=memmap_dir,
         )
 
-        if not self.num_wires <= 8:
-            raise ValueError("Number of wires may be at most 8")
+        if self.max_wires is not None and self.num_wires > self.max_wires:
+            raise ValueError(f"Number of wires may be at most {self.max_wires}")
+        if packed_samples and self.num_wires > MAX_PACKED_WIRES:
+            raise ValueError(
+                f"Packed samples hold at most {MAX_PACKED_WIRES} wires, "
+                f"use packed_samples=False for {self.num_wires} wires"
+            )
+        self.packed_samples = packed_samples
         self._samples = None
+        self._weights = None
+        self._code_counts = None
+        self._marginals = {}
 
     @classmethod
     def capabilities(cls):
@@ -117,12 +152,21 @@ class FermionDevice(DjangoDevice):
         """
         if self._observable_map[observable] == Identity:
             return 1.0
+        if self._samples is None:
+            return self.job_future()
+
+        if self.packed_samples or self._weights is not None:
+            mean = self._occupation_means()
+            if self._observable_map[observable] == PauliZ:
+                mean = 1 - 2 * mean
+            result = mean[self.wires.indices(wires)]
+            return result.item() if len(result) == 1 else result
 
         shots = self.sample(observable, wires, par)
         if self._observable_map[observable] == PauliZ:
             shots = np.ones(shots.shape) - 2 * shots
         mean = np.mean(shots, axis=0)
-        result = mean[wires.tolist()]
+        result = mean[self.wires.indices(wires)]
         return result.item() if len(result) == 1 else result
 
     def var(self, observable=None, wires=None, par=None):
@@ -131,12 +175,23 @@ class FermionDevice(DjangoDevice):
         """
         if self._observable_map[observable] == Identity:
             return 0.0
+        if self._samples is None:
+            return self.job_future()
+
+        if self.packed_samples or self._weights is not None:
+            # the occupations are zero or one, so the variance follows from the mean.
+            mean = self._occupation_means()
+            var = mean * (1 - mean)
+            if self._observable_map[observable] == PauliZ:
+                var = 4 * var
+            result = var[self.wires.indices(wires)]
+            return result.item() if len(result) == 1 else result
 
         shots = self.sample(observable, wires, par)
         if self._observable_map[observable] == PauliZ:
             shots = np.ones(shots.shape) - 2 * shots
         var = np.var(shots, axis=0)
-        result = var[wires.tolist()]
+        result = var[self.wires.indices(wires)]
         return result.item() if len(result) == 1 else result
 
     def sample(self, observable, wires, par):
@@ -145,87 +200,137 @@ class FermionDevice(DjangoDevice):
         """
         observable_class = self._observable_map[observable]
         if issubclass(observable_class, FermionObservable):
+            if self._samples is None:
+                return self.job_future()
+            if self.packed_samples:
+                return unpack_bits(self._samples, self.num_wires)
             return self._samples
         raise NotImplementedError()
 
-    def probability(self, wires=None):
+    def observable_values(self, observable, wires, outcomes, context):
+        observable_class = self._observable_map[observable]
+        if observable_class == Identity:
+            return np.ones(len(outcomes))
+        values = outcomes[:, self.wires.indices(wires)]
+        if observable_class == PauliZ:
+            values = 1 - 2 * values
+        return values[:, 0] if values.shape[1] == 1 else values
+
+    def code_counts(self) -> np.ndarray:
+        """
+        The number of shots for each of the `2**num_wires` packed codes. The dense
+        samples are packed with their bit weights, such that all marginal
+        distributions follow from this single pass over the samples. For an
+        exact distribution the counts are the probabilities of the codes.
+        """
+        if self._code_counts is None:
+            codes = self._samples if self.packed_samples else pack_bits(self._samples)
+            self._code_counts = np.bincount(
+                codes, weights=self._weights, minlength=2 ** self.num_wires
+            )
+        return self._code_counts
+
+    def _dense_samples(self) -> np.ndarray:
+        """
+        The occupations of all wires with one column per wire.
+        """
+        if self.packed_samples:
+            return unpack_bits(self._samples, self.num_wires)
+        return self._samples
+
+    def _occupation_means(self) -> np.ndarray:
         """
-        Generates the probibility distribution for all observed outcomes.
+        The mean occupation of every wire, computed from the histogram of the
+        packed codes instead of the individual shots.
         """
-        # pylint: disable=R1728
-        shots = self._samples
-        if wires is not None:
-            shots = shots[:, wires.tolist()]
+        if self.num_wires > self.max_histogram_wires:
+            return np.average(self._dense_samples(), axis=0, weights=self._weights)
+        counts = self.code_counts()
+        all_codes = np.arange(2 ** self.num_wires)
+        return counts @ unpack_bits(all_codes, self.num_wires) / counts.sum()
 
-        patterns, counts = np.unique(shots, axis=0, return_counts=True)
+    def marginal_counts(self, wires: Wires = None) -> np.ndarray:
+        """
+        The number of shots for each outcome on the wires. The first wire is the
+        most significant bit of the outcome. The marginals are cached, such that
+        repeated requests for the same wires are free. For many wires the
+        marginal is counted from the samples on its wires alone.
 
-        probabilities = np.zeros(2 ** len(wires))
-        denominator = counts.sum()
-        for pattern, count in zip(patterns, counts):
-            probability = count / denominator
-            probabilities[
-                sum(2 ** idx for idx, d in enumerate(pattern[::-1]) if d == 1)
-            ] = probability
+        Args:
+            wires: the wires of the marginal distribution. By default all wires.
+        """
+        if wires is None:
+            wires = self.wires
+        indices = tuple(self.wires.indices(wires))
+        if indices in self._marginals:
+            return self._marginals[indices]
+        if self.num_wires > self.max_histogram_wires:
+            bits = self._dense_samples()[:, list(indices)]
+            self._marginals[indices] = np.bincount(
+                pack_bits(bits).astype(np.int64),
+                weights=self._weights,
+                minlength=2 ** len(indices),
+            )
+        else:
+            all_codes = np.arange(2 ** self.num_wires)
+            bits = unpack_bits(all_codes, self.num_wires)[:, list(indices)]
+            self._marginals[indices] = np.bincount(
+                pack_bits(bits).astype(int),
+                weights=self.code_counts(),
+                minlength=2 ** len(indices),
+            )
+        return self._marginals[indices]
+
+    def probability(self, wires: Wires = None, sparse: bool = False):
+        """
+        Generates the probibility distribution for all observed outcomes. If the
+        job is not done yet, its `JobFuture` is returned instead.
 
-        patterns = [
-            tuple([int(d) for d in bin(comp_state_index)[2:].zfill(len(wires))])
-            for comp_state_index in range(2 ** len(wires))
-        ]
+        Args:
+            wires: the wires of the distribution. By default all wires.
+            sparse: if `True` only the observed outcomes are returned.
+        """
+        if wires is None:
+            wires = self.wires
+        if self._samples is None:
+            # the job is not done, so the distribution is handed out as its future.
+            return self.job_future()
+        counts = self.marginal_counts(wires)
+        num_wires = len(wires)
+        probabilities = counts / counts.sum()
+        if sparse:
+            outcomes = np.flatnonzero(counts)
+        else:
+            outcomes = np.arange(counts.size)
+        patterns = [tuple(bits) for bits in unpack_bits(outcomes, num_wires).tolist()]
+        return OrderedDict(zip(patterns, probabilities[outcomes]))
 
-        return OrderedDict(zip(patterns, probabilities))
+    def measurement_instructions(self, wires):
+        return [("measure", [wire], []) for wire in self.wires]
 
-    # pylint: disable=R1710
     def pre_measure(self):
         """
         Apply the operations that are necessary to submit the job.
         """
-
-        wires = self.wires
-        for wire in wires:
-            m_obj = ("measure", [wire], [])
-            self.job_payload["experiment_0"]["instructions"].append(m_obj)
-        url = self.url_prefix + "post_job/"
-        job_response = requests.post(
-            url,
-            data={
-                "json": json.dumps(self.job_payload),
-                "username": self.username,
-                "password": self.password,
-            },
-        )
-
-        self.job_id = (job_response.json())["job_id"]
-
-        if self.blocking is True:
-            self.wait_till_done()
+        super().pre_measure()
+        if self._results_dict is None:
+            return
+        if self.packed_samples:
+            data = self._results_dict["results"][0]["data"]
+            if "memory_packed" in data:
+                occupations = unpack_memory(data["memory_packed"], dtype=np.uint8)
+            else:
+                # the outcomes of an exact distribution are the keys of its probabilities
+                memory = data.get("probabilities", data.get("memory"))
+                occupations = parse_memory(list(memory), dtype=np.uint8)
+            self._samples = pack_bits(occupations)
         else:
-            return self.job_id
-
-        # obtain the job result
-        result_payload = {"job_id": self.job_id}
-        url = self.url_prefix + "get_job_result/"
-
-        result_response = requests.get(
-            url,
-            params={
-                "json": json.dumps(result_payload),
-                "username": self.username,
-                "password": self.password,
-            },
-        )
-        results_dict = json.loads(result_response.text)
-        if "results" not in results_dict:
-            raise DeviceError(result_response.text)
-        results = results_dict["results"][0]["data"]["memory"]
-
-        num_obs = len(wires)
-        out = np.zeros((self.shots, num_obs), dtype=int)
-        for ind_1 in np.arange(self.shots):
-            temp = results[ind_1].split()
-            for ind_2 in np.arange(num_obs):
-                out[ind_1, ind_2] = int(temp[ind_2])
-        self._samples = out
+            self._samples = self.job_samples()
+        self._weights = self.job_weights()
 
     def reset(self):
+        super().reset()
         self._samples = None
-        self.job_id = None
+        self._weights = None
+        self._code_counts = None
+        self._marginals = {}
@@ -3,12 +3,15 @@ Define the operations that can be applied on a fermionic device.
 """
 
 import abc
+from functools import lru_cache
 from typing import List, Tuple
 from pennylane.wires import Wires
 from pennylane.operation import Operation, AnyWires, AllWires
 from pennylane.operation import Observable
 import numpy as np
 
+from .gradients import gradient_recipe
+
 
 class FermionOperation(Operation):
     """
@@ -27,6 +30,37 @@ class FermionOperation(Operation):
         """
         raise NotImplementedError()
 
+    # the factor of the parameter in the angle of the instruction
+    generator_scale = 1
+
+    def __init__(self, *params, **kwargs):
+        super().__init__(*params, **kwargs)
+        if self.grad_method == "A":
+            self.grad_recipe = self.shift_recipe(len(self.wires))
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def shift_recipe(cls, num_wires: int) -> tuple:
+        """the `grad_recipe` of the gate on the number of wires, which is computed
+        once, since the spectrum of the generator only depends on the wires
+
+        Args:
+            num_wires: the number of wires of the gate
+        """
+        return gradient_recipe(
+            cls.generator_eigvals([2] * num_wires), cls.generator_scale
+        )
+
+    @classmethod
+    def generator_eigvals(cls, qdims: List[int]) -> np.ndarray:
+        """the eigenvalues of the generator of the instruction, whose differences
+        are the frequencies of the gate
+
+        Args:
+            qdims: the number of levels of each wire of the gate
+        """
+        raise NotImplementedError()
+
 
 class FermionObservable(Observable):
     """
@@ -124,8 +158,9 @@ class Hop(FermionOperation):
     num_wires = 4
     par_domain = "R"
 
-    grad_method = None
+    grad_method = "A"
     grad_recipe = None
+    generator_scale = 0.5
 
     @classmethod
     def fermion_operator(cls, wires, par):
@@ -133,6 +168,11 @@ class Hop(FermionOperation):
         l_obj = ("fhop", wires.tolist(), [theta / 2 % (2 * np.pi)])
         return l_obj
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        # each of the two hops has the eigenvalues -1, 0 and 1.
+        return np.arange(-2, 3)
+
 
 class Inter(FermionOperation):
     r"""The interaction of fermionic modes
@@ -162,7 +202,7 @@ class Inter(FermionOperation):
     num_wires = AllWires  # AllWires#AnyWires
     par_domain = "R"
 
-    grad_method = None
+    grad_method = "A"
     grad_recipe = None
 
     @classmethod
@@ -171,6 +211,11 @@ class Inter(FermionOperation):
         l_obj = ("fint", wires.tolist(), [theta % (2 * np.pi)])
         return l_obj
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        # the number of doubly occupied sites.
+        return np.arange(len(qdims) // 2 + 1)
+
 
 class Phase(FermionOperation):
     r"""The phase operation.
@@ -201,7 +246,7 @@ class Phase(FermionOperation):
     num_wires = 2
     par_domain = "R"
 
-    grad_method = None
+    grad_method = "A"
     grad_recipe = None
 
     @classmethod
@@ -210,6 +255,11 @@ class Phase(FermionOperation):
         l_obj = ("fphase", wires.tolist(), [theta % (2 * np.pi)])
         return l_obj
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        # the number of particles on the site.
+        return np.arange(3)
+
 
 class ParticleNumber(FermionObservable):
     r"""ParticleNumber observable
@@ -0,0 +1,339 @@
+"""
+Define the local simulator of the fermionic tweezer experiments. All gates
+conserve the number of particles within each group of wires that are coupled by
+hops, so the state never leaves the sector of Fock states that is fixed by the
+loaded particles. It is simulated in this sector instead of the full Fock space.
+Circuits without interactions are free fermions, whose state is a single Slater
+determinant that is simulated with the matrix of its orbitals instead, unless
+the exact distribution is requested by an experiment without shots.
+"""
+
+from functools import lru_cache
+from itertools import combinations
+from typing import List, Tuple
+
+import numpy as np
+
+from .local_simulator import LocalSimulator, real_product, memory_strings
+
+# the codes of the Fock states are 64 bit integers with one bit per wire
+MAX_CODE_WIRES = 62
+
+
+def hop_pairs(wires: list) -> List[Tuple]:
+    """
+    The pairs of wires that are coupled by a hop on four wires, i.e. the first
+    with the third and the second with the fourth wire.
+
+    Args:
+        wires: the four wires of the hop
+    """
+    return [(wires[0], wires[2]), (wires[1], wires[3])]
+
+
+def occupations(codes: np.ndarray, modes: List[int]) -> np.ndarray:
+    """
+    The occupations of the modes in the Fock states, which are encoded as the
+    bits of integer codes.
+
+    Args:
+        codes: the codes of the Fock states
+        modes: the indices of the modes
+    """
+    return (codes[:, np.newaxis] >> np.asarray(modes, dtype=np.int64)) & 1
+
+
+def _popcount(codes: np.ndarray) -> np.ndarray:
+    """
+    The number of set bits of each code.
+    """
+    counts = np.zeros(codes.shape, dtype=np.int64)
+    codes = codes.copy()
+    while codes.any():
+        counts += codes & 1
+        codes >>= 1
+    return counts
+
+
+@lru_cache(maxsize=256)
+def sector_basis(groups: Tuple[Tuple[int, ...], ...], numbers: Tuple[int, ...]):
+    """
+    The sorted codes of all Fock states with the given number of particles in
+    each group of modes.
+
+    Args:
+        groups: the modes of each group
+        numbers: the number of particles in each group
+    """
+    codes = np.zeros(1, dtype=np.int64)
+    for modes, number in zip(groups, numbers):
+        group_codes = np.array(
+            [
+                sum(1 << mode for mode in chosen)
+                for chosen in combinations(modes, number)
+            ],
+            dtype=np.int64,
+        )
+        # the groups have disjoint bits, so their codes simply add up.
+        codes = np.add.outer(codes, group_codes).ravel()
+    return np.sort(codes)
+
+
+@lru_cache(maxsize=256)
+def hop_eigensystem(
+    groups: Tuple[Tuple[int, ...], ...],
+    numbers: Tuple[int, ...],
+    pairs: Tuple[Tuple[int, int], ...],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The eigensystem of the hopping sum_(a, b) c_a^dag c_b + c_b^dag c_a within a
+    sector. The sign of each hop counts the occupied modes in between, as given
+    by the Jordan-Wigner ordering of the modes.
+
+    Args:
+        groups: the modes of each group
+        numbers: the number of particles in each group
+        pairs: the pairs of coupled modes
+    """
+    codes = sector_basis(groups, numbers)
+    hamiltonian = np.zeros((codes.size, codes.size))
+    for first, second in pairs:
+        if first == second:
+            raise ValueError("A hop needs two different wires.")
+        low, high = sorted((first, second))
+        between = (1 << high) - (1 << (low + 1))
+        source = np.flatnonzero(((codes >> low) & 1) != ((codes >> high) & 1))
+        target = np.searchsorted(codes, codes[source] ^ ((1 << low) | (1 << high)))
+        signs = (-1.0) ** _popcount(codes[source] & between)
+        hamiltonian[target, source] += signs
+    return np.linalg.eigh(hamiltonian)
+
+
+class FermionSimulator(LocalSimulator):
+    """
+    The simulator of fermions in optical tweezers. Each pair of wires is a site
+    with a spin up and a spin down mode. The Fock states are the codes with one
+    bit per wire and the state is a vector over the sector of the loaded particles.
+    Hops are applied with the cached eigensystem of their block, while
+    interactions and phases are diagonal. Circuits without `fint` are simulated
+    as free fermions in polynomial time, which scales to hundreds of wires.
+    """
+
+    backend_name = "fermions_local"
+
+    @staticmethod
+    def mode_groups(instructions: list, modes: dict) -> Tuple[Tuple[int, ...], ...]:
+        """
+        The groups of modes that are connected by hops, in which the number of
+        particles is conserved.
+
+        Args:
+            instructions: the instructions of the experiment
+            modes: the mode of each wire
+        """
+        roots = list(range(len(modes)))
+
+        def root(mode):
+            while roots[mode] != mode:
+                roots[mode] = roots[roots[mode]]
+                mode = roots[mode]
+            return mode
+
+        for name, wires, _ in instructions:
+            if name == "fhop":
+                for first, second in hop_pairs(wires):
+                    roots[root(modes[first])] = root(modes[second])
+        groups = {}
+        for mode in range(len(modes)):
+            groups.setdefault(root(mode), []).append(mode)
+        return tuple(tuple(group) for group in groups.values())
+
+    def run_experiment(self, experiment):
+        return self.run_batch([experiment])[0]
+
+    def run_batch(self, experiments):
+        instructions = experiments[0]["instructions"]
+        free = all(name != "fint" for name, _, _ in instructions)
+        if free and experiments[0]["shots"] is not None:
+            return [self.run_free(experiment) for experiment in experiments]
+        state, outcomes = self.final_states(experiments)
+        if outcomes is None:
+            return [{"memory": []} for _ in experiments]
+        return self.measured_data(np.abs(state) ** 2, outcomes, experiments)
+
+    def final_states(self, experiments, tangents=()):
+        instructions = experiments[0]["instructions"]
+        modes = self.wire_axes(instructions)
+        if len(modes) > MAX_CODE_WIRES:
+            raise ValueError(
+                f"The Fock states of more than {MAX_CODE_WIRES} wires are not simulated."
+            )
+        groups = self.mode_groups(instructions, modes)
+        group_of = {mode: index for index, group in enumerate(groups) for mode in group}
+        numbers = [0] * len(groups)
+        codes = sector_basis(groups, tuple(numbers))
+        state = np.ones((len(experiments), 1), dtype=complex)
+        measured = []
+        for index, (name, wires, _) in enumerate(instructions):
+            targets = [modes[wire] for wire in wires]
+            if name == "load":
+                numbers[group_of[targets[0]]] += 1
+                codes, state = self.load(codes, state, groups, numbers, targets[0])
+                # the rows of the tangents may vanish, the experiments may not.
+                norms = np.abs(state[: len(experiments) - len(tangents)]).max(axis=1)
+                if not np.all(norms > 0):
+                    raise ValueError(f"The mode {targets[0]} is already occupied.")
+                continue
+            if name == "measure":
+                measured.append(targets[0])
+                continue
+            if name == "fhop":
+                pairs = tuple(
+                    (modes[first], modes[second]) for first, second in hop_pairs(wires)
+                )
+                values, vectors = hop_eigensystem(groups, tuple(numbers), pairs)
+            elif name == "fint":
+                sites = occupations(codes, targets)
+                values, vectors = (sites[:, 0::2] & sites[:, 1::2]).sum(axis=1), None
+            elif name == "fphase":
+                values, vectors = occupations(codes, targets[:2]).sum(axis=1), None
+            else:
+                raise ValueError(f"The instruction {name} is not known.")
+            theta = self.batch_angles(experiments, index)
+            phases = np.exp(-1j * np.multiply.outer(theta, values))
+            state = self.in_eigenbasis(phases, vectors, state)
+            if index in tangents:
+                state[1 + tangents.index(index)] = -1j * self.in_eigenbasis(
+                    values, vectors, state[0]
+                )
+        if not measured:
+            return state, None
+        return state, occupations(codes, measured)
+
+    @staticmethod
+    def in_eigenbasis(
+        diagonal: np.ndarray, vectors: np.ndarray, state: np.ndarray
+    ) -> np.ndarray:
+        """
+        Multiply the state by a diagonal matrix in the eigenbasis of a gate, which
+        is given by the columns of the vectors. Without vectors it is the basis
+        of the Fock states.
+
+        Args:
+            diagonal: the diagonal in the eigenbasis, or one diagonal per row of
+                the state
+            vectors: the real eigenvectors of the gate, or `None`
+            state: the state, or a stack of states with one row each
+        """
+        if vectors is None:
+            return diagonal * state
+        rotated = diagonal * real_product(vectors.T, state, -1)
+        return real_product(vectors, rotated, -1)
+
+    @staticmethod
+    def load(codes, state, groups, numbers, mode):
+        """
+        Create a particle in the mode, c_mode^dag, which moves the stack of
+        states into the sector with one more particle in the group of the mode.
+        """
+        bit = 1 << mode
+        empty = (codes & bit) == 0
+        signs = (-1.0) ** _popcount(codes[empty] & (bit - 1))
+        new_codes = sector_basis(groups, tuple(numbers))
+        new_state = np.zeros((len(state), new_codes.size), dtype=complex)
+        new_state[:, np.searchsorted(new_codes, codes[empty] | bit)] = (
+            signs * state[:, empty]
+        )
+        return new_codes, new_state
+
+    def run_free(self, experiment: dict) -> dict:
+        """
+        Simulate an experiment without interactions. The state is the Slater
+        determinant of the orbitals, which are the columns of a matrix with one
+        row per wire. Hops and phases act on the rows of their wires.
+
+        Args:
+            experiment: the instructions, the number of wires and the shots
+        """
+        instructions = experiment["instructions"]
+        modes = self.wire_axes(instructions)
+        orbitals = np.zeros((len(modes), 0), dtype=complex)
+        measured = []
+        for name, wires, params in instructions:
+            targets = [modes[wire] for wire in wires]
+            if name == "load":
+                orbital = np.zeros((len(modes), 1))
+                orbital[targets[0]] = 1
+                orbitals, triangle = np.linalg.qr(np.hstack([orbitals, orbital]))
+                if np.abs(triangle[-1, -1]) < 1e-12:
+                    raise ValueError(f"The mode {targets[0]} is already occupied.")
+            elif name == "fhop":
+                pairs = [
+                    (modes[first], modes[second]) for first, second in hop_pairs(wires)
+                ]
+                rows = sorted({mode for pair in pairs for mode in pair})
+                hopping = np.zeros((len(rows), len(rows)))
+                for first, second in pairs:
+                    if first == second:
+                        raise ValueError("A hop needs two different wires.")
+                    hopping[rows.index(first), rows.index(second)] = 1
+                    hopping[rows.index(second), rows.index(first)] = 1
+                values, vectors = np.linalg.eigh(hopping)
+                unitary = (
+                    vectors * np.exp(-1j * float(params[0]) * values)
+                ) @ vectors.T
+                orbitals[rows] = unitary @ orbitals[rows]
+            elif name == "fphase":
+                orbitals[targets[:2]] *= np.exp(-1j * float(params[0]))
+            elif name == "measure":
+                measured.append(targets[0])
+            else:
+                raise ValueError(f"The instruction {name} is not known.")
+        if not measured:
+            return {"memory": []}
+        samples = self.sample_slater(orbitals, experiment["shots"])
+        return {"memory": memory_strings(samples[:, measured])}
+
+    def sample_slater(self, orbitals: np.ndarray, shots: int) -> np.ndarray:
+        """
+        Draw the occupations of a Slater determinant with orthonormal orbitals.
+        The occupied modes follow one after the other from the chain rule of the
+        determinant: a mode is drawn with the weight of its row, which is then
+        reduced by the overlap with the rows of the modes drawn before. The rows
+        of the drawn modes are orthonormalised shot by shot, while the overlaps
+        of all shots are a single matrix product with the orbitals.
+
+        Args:
+            orbitals: the orbitals as the columns of a (modes, particles) matrix
+            shots: the number of shots
+        """
+        num_modes, num_particles = orbitals.shape
+        samples = np.zeros((shots, num_modes), dtype=np.int64)
+        row_weights = np.sum(np.abs(orbitals) ** 2, axis=1)
+        chunk_size = max(1, (1 << 22) // max(num_modes + num_particles ** 2, 1))
+        for start in range(0, shots, chunk_size):
+            chunk = np.arange(min(chunk_size, shots - start))
+            weights = np.repeat(row_weights[np.newaxis], chunk.size, axis=0)
+            drawn = np.zeros((chunk.size, num_particles, num_particles), dtype=complex)
+            # the conjugate transpose of the drawn rows, to avoid copies in the loop
+            adjoints = np.zeros_like(drawn)
+            for particle in range(num_particles):
+                cumulative = np.cumsum(weights, axis=1)
+                draws = self.rng.random(chunk.size) * cumulative[:, -1]
+                picked = np.minimum(
+                    np.sum(cumulative < draws[:, np.newaxis], axis=1), num_modes - 1
+                )
+                samples[start + chunk, picked] = 1
+                rows = orbitals[picked][:, np.newaxis, :]
+                previous = drawn[:, :particle]
+                # Gram-Schmidt is repeated once to keep the rows orthogonal.
+                for _ in range(2):
+                    overlaps = rows @ adjoints[:, :, :particle]
+                    rows = rows - overlaps @ previous
+                rows = rows[:, 0] / np.linalg.norm(rows[:, 0], axis=1, keepdims=True)
+                drawn[:, particle] = rows
+                adjoints[:, :, particle] = rows.conj()
+                weights -= np.abs(rows.conj() @ orbitals.T) ** 2
+                weights[chunk, picked] = 0
+                np.maximum(weights, 0, out=weights)
+        return samples
@@ -0,0 +1,199 @@
+"""
+Define the gradients of the circuits by generalised parameter-shift rules. The
+frequencies of a gate in its parameter are the differences of the eigenvalues of
+its generator, which depend on the loaded atoms for the spins. All shifted
+circuits of a gradient are executed as a single batch, i.e. as a single job on
+the remote devices.
+"""
+
+import warnings
+from fractions import Fraction
+from typing import List
+
+import numpy as np
+import pennylane as qml
+from pennylane.gradients import (
+    eigvals_to_frequencies,
+    generate_shift_rule,
+    generate_shifted_tapes,
+    gradient_transform,
+)
+from pennylane.operation import Expectation
+
+
+# the largest number of shifted circuits of the shift rule of a single gate
+MAX_SHIFTS = 200
+
+# the largest condition number of the linear system of a shift rule
+MAX_CONDITION = 1e8
+
+
+def shift_rule(
+    eigvals: np.ndarray,
+    scale: float = 1,
+    max_denominator: int = 100,
+    max_shifts: int = MAX_SHIFTS,
+) -> tuple:
+    """
+    The generalised parameter-shift rule of a gate exp(-i scale theta G) as the
+    coefficients and the shifts of theta. If the ratios of the frequencies are
+    fractions, the frequencies are multiples of a common divisor and the rule
+    of all these multiples up to the largest frequency is used. Its closed form
+    stays accurate for many frequencies, while the rule of other spectra
+    follows from a linear system, which is only solved if it is well conditioned.
+
+    Args:
+        eigvals: the eigenvalues of the generator G
+        scale: the factor of the parameter in the angle of the gate
+        max_denominator: the largest denominator of the ratios of the frequencies
+        max_shifts: the largest number of shifts of the rule
+
+    Raises:
+        QuantumFunctionError: if the rule needs more than `max_shifts` shifts or
+            its linear system is ill-conditioned.
+    """
+    values = np.round(np.asarray(eigvals, dtype=float) * scale, 10)
+    frequencies = sorted(set(np.round(eigvals_to_frequencies(tuple(values)), 10)))
+    if not frequencies:
+        return np.zeros(0), np.zeros(0)
+    ratios = [
+        Fraction(frequency / frequencies[0]).limit_denominator(max_denominator)
+        for frequency in frequencies
+    ]
+    commensurate = np.allclose(
+        np.array(ratios, dtype=float) * frequencies[0], frequencies
+    )
+    if commensurate:
+        base = frequencies[0] / np.lcm.reduce([ratio.denominator for ratio in ratios])
+        multiples = int(round(frequencies[-1] / base))
+        frequencies = base * np.arange(1, multiples + 1)
+    if 2 * len(frequencies) > max_shifts:
+        raise qml.QuantumFunctionError(
+            f"The shift rule needs {2 * len(frequencies)} shifted circuits, "
+            f"which is more than max_shifts={max_shifts}."
+        )
+    if not commensurate and _condition(frequencies) > MAX_CONDITION:
+        raise qml.QuantumFunctionError(
+            f"The shift rule of the {len(frequencies)} incommensurate frequencies "
+            "is ill-conditioned."
+        )
+    with warnings.catch_warnings():
+        # the conditioning is checked above, where a small determinant is harmless.
+        warnings.simplefilter("ignore", UserWarning)
+        coefficients, shifts = generate_shift_rule(tuple(frequencies))
+    return coefficients, shifts
+
+
+def _condition(frequencies: List[float]) -> float:
+    """
+    The condition number of the linear system of the shift rule of PennyLane
+    for frequencies without a common divisor, i.e. at its equidistant shifts.
+    """
+    num_frequencies = len(frequencies)
+    steps = 2 * np.arange(1, num_frequencies + 1) - 1
+    shifts = steps * np.pi / (2 * num_frequencies * frequencies[0])
+    return np.linalg.cond(np.sin(np.outer(shifts, frequencies)))
+
+
+def gradient_recipe(eigvals: np.ndarray, scale: float = 1) -> tuple:
+    """
+    The `grad_recipe` of a gate with a single parameter, as used by the
+    parameter-shift rule of PennyLane.
+
+    Args:
+        eigvals: the eigenvalues of the generator of the gate
+        scale: the factor of the parameter in the angle of the gate
+    """
+    coefficients, shifts = shift_rule(eigvals, scale)
+    return ([[c, 1, s] for c, s in zip(coefficients, shifts)],)
+
+
+def operation_qdims(tape: qml.tape.QuantumTape) -> List[List[int]]:
+    """
+    The number of levels of the wires of each operation of a circuit. It is
+    given by the atoms of the latest `Load` of the wire, while the wires without
+    such a `Load` are fermion modes or hold a single atom.
+
+    Args:
+        tape: the circuit
+    """
+    levels = {}
+    qdims = []
+    for operation in tape.operations:
+        if operation.name == "Load" and operation.num_params:
+            levels[operation.wires[0]] = int(np.asarray(operation.parameters[0])) + 1
+        qdims.append([levels.get(wire, 2) for wire in operation.wires])
+    return qdims
+
+
+@gradient_transform
+def param_shift(
+    tape: qml.tape.QuantumTape,
+    argnum: List[int] = None,
+    max_shifts: int = MAX_SHIFTS,
+    step: float = 1e-7,
+):
+    """
+    The gradient of the expectation values of a circuit by generalised
+    parameter-shift rules. Each trainable gate is shifted by the rule of the
+    spectrum of its generator, such that the gradient is exact for the exact
+    distribution. It is used as the `diff_method` of a QNode, e.g.
+    `qml.qnode(device, diff_method=param_shift)`.
+
+    The rule of a gate takes two circuits per multiple of the common divisor of
+    its frequencies up to the largest one, e.g. 2 for RLX and RLZ of a single
+    atom, 200 for RLZ2 of twenty atoms and 5000 for RLZ2 of a hundred atoms.
+    Gates whose rule needs more than `max_shifts` circuits, or whose spectrum
+    has no common divisor and gives an ill-conditioned rule, like RLXLY of many
+    atoms, are differentiated by central differences of the given step instead.
+
+    Args:
+        tape: the circuit
+        argnum: the indices of the trainable parameters to differentiate. By
+            default all of them.
+        max_shifts: the largest number of shifted circuits of a gate
+        step: the step of the central differences
+    """
+    num_params = len(tape.trainable_params)
+    if not num_params:
+        return [], lambda _: np.zeros([tape.output_dim, 0])
+    if any(
+        measurement.return_type is not Expectation for measurement in tape.measurements
+    ):
+        raise qml.QuantumFunctionError(
+            "The shift rules only differentiate expectation values."
+        )
+    argnum = range(num_params) if argnum is None else np.atleast_1d(argnum)
+    qdims = dict(zip(map(id, tape.operations), operation_qdims(tape)))
+    gradient_tapes = []
+    rules = []
+    for index in range(num_params):
+        operation, _ = tape.get_operation(index)
+        coefficients, shifts = np.zeros(0), np.zeros(0)
+        if index in argnum:
+            try:
+                coefficients, shifts = shift_rule(
+                    operation.generator_eigvals(qdims[id(operation)]),
+                    operation.generator_scale,
+                    max_shifts=max_shifts,
+                )
+            except qml.QuantumFunctionError:
+                coefficients = np.array([1, -1]) / (2 * step)
+                shifts = np.array([step, -step])
+        gradient_tapes.extend(generate_shifted_tapes(tape, index, shifts))
+        rules.append(coefficients)
+
+    # pylint: disable=E1101
+    def processing_fn(results):
+        gradients = []
+        start = 0
+        for coefficients in rules:
+            if coefficients.size == 0:
+                gradients.append(np.zeros(tape.output_dim))
+                continue
+            shifted = qml.math.stack(results[start : start + len(coefficients)])
+            start += len(coefficients)
+            gradients.append(sum(c * r for c, r in zip(coefficients, shifted)))
+        return qml.math.T(qml.math.stack(gradients))
+
+    return gradient_tapes, processing_fn
@@ -0,0 +1,243 @@
+"""
+Define the handles for jobs that were submitted in the non-blocking mode.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Iterable, Iterator, List
+
+# the operations and observables of a circuit, as they are handed to `Device.execute`
+Circuit = namedtuple("Circuit", ["operations", "observables"])
+
+LOGGER = logging.getLogger(__name__)
+
+
+class JobFuture:
+    """
+    A handle for a job that runs on the server. It allows to check the status of
+    the job and to obtain its result later on, without blocking the program in
+    the meantime. If the device has a poller, the job is watched by the poller
+    from the start.
+
+    Args:
+        device: the device through which the job was submitted.
+        job_id: the id of the job on the server.
+        circuit: the circuit of the job. If it is given, the result of the future
+            are the measured values of the circuit. Otherwise it is the result
+            dictionary of the server.
+        job_payload: the experiments of the job, under which the result is saved
+            in the result store of the device.
+        results_dict: the result of the job, if it is known already.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        device: "DjangoDevice",
+        job_id: str,
+        circuit: Circuit = None,
+        job_payload: dict = None,
+        results_dict: dict = None,
+    ):
+        self.device = device
+        self.job_id = job_id
+        self.circuit = circuit
+        self.job_payload = job_payload
+        self._results_dict = results_dict
+        self._finished = results_dict is not None
+        self._exception = None
+        self._callbacks: List[Callable] = []
+        self._lock = threading.RLock()
+        self._event = threading.Event()
+        if self._finished:
+            self._event.set()
+        elif device.poller is not None:
+            device.poller.watch(self)
+
+    def __repr__(self):
+        state = "finished" if self._finished else "pending"
+        return f"<JobFuture job_id={self.job_id} {state}>"
+
+    def status(self) -> str:
+        """
+        The status of the job on the server.
+        """
+        if self._finished:
+            return "ERROR" if self._exception is not None else "DONE"
+        try:
+            job_status = self.device.check_job_status(job_id=self.job_id)
+        except SyntaxError as exc:
+            self.set_exception(exc)
+            return "ERROR"
+        if job_status == "DONE":
+            self.set_done()
+        return job_status
+
+    def done(self) -> bool:
+        """
+        Check if the job has finished, either successfully or with an error. If
+        the device has a poller, the job is left to the poller instead of
+        contacting the server.
+        """
+        if not self._finished:
+            poller = self.device.poller
+            if poller is None:
+                self.status()
+            else:
+                poller.watch(self)
+        return self._finished
+
+    def set_done(self):
+        """
+        Mark the job as done and run the callbacks.
+        """
+        self._finish()
+
+    def set_exception(self, exception: Exception):
+        """
+        Mark the job as failed and run the callbacks.
+
+        Args:
+            exception: the error that is raised by `result`.
+        """
+        self._exception = exception
+        self._finish()
+
+    def _finish(self):
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._call(callback)
+
+    def _call(self, callback: Callable):
+        """
+        Run a callback. Its errors are logged, such that they cannot stop the
+        thread which completes the jobs.
+        """
+        try:
+            callback(self)
+        except Exception:  # pylint: disable=W0703
+            LOGGER.exception("A callback of the job %s failed.", self.job_id)
+
+    def add_done_callback(self, callback: Callable):
+        """
+        Call the function with the future as its only argument once the job has
+        finished. Finished jobs call it immediately. The completion is noticed
+        whenever the status of the future is checked.
+
+        Args:
+            callback: the function that is called
+        """
+        with self._lock:
+            if not self._finished:
+                self._callbacks.append(callback)
+                return
+        self._call(callback)
+
+    def exception(self, timeout: float = None) -> Exception:
+        """
+        The error of the job, if it failed.
+
+        Args:
+            timeout: the maximal time in seconds to wait for the job.
+        """
+        self.wait(timeout)
+        return self._exception
+
+    def wait(self, timeout: float = None):
+        """
+        Block until the job has finished. If the device has a poller, we sleep
+        until the poller wakes us. Otherwise we poll with the pauses of the
+        waiting strategy of the device.
+
+        Args:
+            timeout: the maximal time in seconds to wait. `None` waits forever.
+        """
+        if self._finished:
+            return
+        poller = self.device.poller
+        if poller is not None:
+            poller.watch(self)
+            if not self._event.wait(timeout):
+                raise TimeoutError(f"Job {self.job_id} was not done after {timeout} s.")
+            return
+        start = time.monotonic()
+        delays = self.device.wait_strategy.delays()
+        while not self.done():
+            remaining = None
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Job {self.job_id} was not done after {timeout} s."
+                    )
+            delay = next(delays)
+            time.sleep(delay if remaining is None else min(delay, remaining))
+
+    def result(self, timeout: float = None):
+        """
+        Wait for the job and return its result. The result is fetched from the
+        server only once.
+
+        Args:
+            timeout: the maximal time in seconds to wait. `None` waits forever.
+        """
+        self.wait(timeout)
+        if self._exception is not None:
+            raise self._exception
+        with self._lock:
+            if self._results_dict is None:
+                self._results_dict = self.device.fetch_result(
+                    self.job_id, self.job_payload
+                )
+        if self.circuit is None:
+            return self._results_dict
+        return self.device.evaluate_result(
+            self.circuit, self._results_dict, job_id=self.job_id
+        )
+
+
+def as_completed(
+    futures: Iterable[JobFuture], timeout: float = None
+) -> Iterator[JobFuture]:
+    """
+    Yield the futures in the order in which their jobs finish.
+
+    Args:
+        futures: the futures of the jobs
+        timeout: the maximal time in seconds to wait for all jobs.
+    """
+    pending = list(futures)
+    if not pending:
+        return
+    finished = queue.Queue()
+    for future in pending:
+        future.add_done_callback(finished.put)
+    delays = pending[0].device.wait_strategy.delays()
+    start = time.monotonic()
+    num_yielded = 0
+    for delay in delays:
+        # futures without a poller check the status of their jobs here.
+        for future in pending:
+            future.done()
+        while num_yielded < len(pending):
+            try:
+                future = finished.get(timeout=delay)
+            except queue.Empty:
+                break
+            num_yielded += 1
+            delay = 0
+            yield future
+        if num_yielded == len(pending):
+            return
+        if timeout is not None and time.monotonic() - start > timeout:
+            raise TimeoutError(
+                f"{len(pending) - num_yielded} jobs were not done after {timeout} s."
+            )
@@ -0,0 +1,269 @@
+"""
+Define the local devices, which run the very same job payloads as the remote
+devices on a local NumPy simulator. They are meant for tests and quick scans
+that should not depend on the network.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+import pennylane as qml
+from pennylane import DeviceError
+from pennylane.interfaces.batch import set_shots
+from pennylane.operation import Expectation, Variance
+from pennylane.tape import QuantumTape
+
+from .fermion_device import FermionDevice
+from .fermion_simulator import FermionSimulator
+from .local_simulator import (
+    LocalSimulator,
+    MultiQuditSimulator,
+    SingleQuditSimulator,
+)
+from .multi_qudit_device import MultiQuditDevice
+from .single_qudit_device import SingleQuditDevice
+
+
+# pylint: disable=E1101
+class LocalDevice:
+    """
+    A mixin that replaces the endpoints of the server by a local simulator. The
+    jobs are simulated on submission and the results of the latest jobs are
+    kept, such that the rest of the device works as for the remote server.
+    With `shots=None` the measured values are computed from the exact
+    distribution of the final state instead of sampled shots. The devices
+    provide the exact jacobian of the expectation values and variances, which
+    is used by the QNodes by default.
+
+    Args:
+        seed: the seed of the random generator that draws the shots.
+        kwargs: the arguments of the remote device.
+    """
+
+    simulator_class = LocalSimulator
+
+    # the results of the jobs of all local devices by their id
+    _local_jobs = OrderedDict()
+    _local_lock = threading.Lock()
+
+    # the number of results that are kept
+    max_local_jobs = 1024
+
+    def __init__(self, *args, seed: int = None, **kwargs):
+        kwargs.setdefault("url", f"local://{self.short_name}/")
+        super().__init__(*args, **kwargs)
+        self.simulator = self.simulator_class(seed=seed)
+
+    @classmethod
+    def capabilities(cls):
+        """
+        The capabilities of the remote device, which are extended by the exact
+        computation without shots.
+        """
+        capabilities = super().capabilities().copy()
+        capabilities.update(supports_analytic_computation=True, provides_jacobian=True)
+        return capabilities
+
+    def execute_and_gradients(
+        self, circuits: List[QuantumTape], method: str = "jacobian", **kwargs
+    ) -> tuple:
+        """
+        Execute the circuits as a single job together with their exact jacobians,
+        which take a single pass through each circuit. The circuits with other
+        measurements or broadcast gates are only executed.
+
+        Args:
+            circuits: the `QuantumTape` of each circuit
+            method: the method of the device that computes the jacobian of a circuit
+            kwargs: further arguments of the method
+        """
+        jacobians = []
+        if all(self.differentiable(circuit) for circuit in circuits):
+            jacobians = self.gradients(circuits, method=method, **kwargs)
+        return self.batch_execute(circuits), jacobians
+
+    def differentiable(self, circuit: QuantumTape) -> bool:
+        """
+        Whether the jacobian of a circuit is known, i.e. it only measures
+        expectation values and variances and none of its gates is broadcast.
+
+        Args:
+            circuit: the `QuantumTape` of the circuit
+        """
+        return all(
+            obs.return_type in (Expectation, Variance) for obs in circuit.observables
+        ) and not any(
+            np.ndim(param) == 1 for op in circuit.operations for param in op.data
+        )
+
+    def jacobian(self, circuit: QuantumTape) -> np.ndarray:
+        """
+        The exact jacobian of the expectation values and variances of a circuit
+        by its trainable parameters. Each trainable gate adds a tangent to the
+        stack of states of the simulator, i.e. the derivative of the state by
+        the angle of the gate, which is propagated forward together with the
+        state. Hence all derivatives follow from a single pass through the
+        circuit. They are exact, also for devices with shots.
+
+        Args:
+            circuit: the `QuantumTape` of the circuit
+        """
+        num_params = len(circuit.trainable_params)
+        if not num_params:
+            return np.zeros((len(circuit.observables), 0))
+        if not self.differentiable(circuit):
+            raise qml.QuantumFunctionError(
+                "Only expectation values and variances of circuits without broadcast "
+                "gates are differentiated by the local devices."
+            )
+        operations = [circuit.get_operation(index)[0] for index in range(num_params)]
+        with set_shots(self, None):
+            self.pre_apply()
+            instructions = self.job_payload["experiment_0"]["instructions"]
+            starts = {}
+            for operation in circuit.operations:
+                starts[id(operation)] = len(instructions)
+                self.apply(operation.name, operation.wires, operation.parameters)
+            self._add_measurements(circuit.observables)
+            data = self.simulator.run_derivatives(
+                self.job_payload["experiment_0"],
+                [starts[id(operation)] for operation in operations],
+            )
+            values = np.stack(
+                [
+                    np.ravel(self.evaluate_result(circuit, self.local_result(item)))
+                    for item in data
+                ],
+                axis=-1,
+            )
+        self.reset()
+        scales = [operation.generator_scale for operation in operations]
+        return (values[:, :num_params] - values[:, num_params:]) / 2 * scales
+
+    @staticmethod
+    def local_result(data: dict) -> dict:
+        """
+        The result of a job with a single experiment of the given data.
+
+        Args:
+            data: the data of the experiment
+        """
+        return {
+            "job_id": None,
+            "status": "finished",
+            "results": [{"header": {"name": "experiment_0"}, "data": data}],
+        }
+
+    def submit_job(self, job_payload: dict) -> str:
+        """
+        Simulate the job and return its id.
+
+        Args:
+            job_payload: the experiments of the job
+        """
+        job_id = uuid.uuid4().hex
+        try:
+            answer = self.simulator.run(job_payload, job_id)
+        except (ValueError, KeyError, IndexError, TypeError) as exc:
+            answer = {"job_id": job_id, "status": "ERROR", "detail": str(exc)}
+        with LocalDevice._local_lock:
+            LocalDevice._local_jobs[job_id] = answer
+            while len(LocalDevice._local_jobs) > self.max_local_jobs:
+                LocalDevice._local_jobs.popitem(last=False)
+        return job_id
+
+    @staticmethod
+    def _local_status(job_id: str) -> dict:
+        """
+        The status answer for a local job, which is done from its submission on.
+        """
+        answer = LocalDevice._local_jobs.get(job_id)
+        if answer is None:
+            return {"job_id": job_id, "status": "ERROR", "detail": "Unknown job."}
+        if answer["status"] == "ERROR":
+            return answer
+        return {"job_id": job_id, "status": "DONE", "detail": ""}
+
+    # pylint: disable=W0613
+    def check_job_status(self, long_poll: float = None, job_id: str = None) -> str:
+        """
+        The status of a local job, which never has to be waited for.
+
+        Args:
+            long_poll: ignored, since local jobs are done on submission.
+            job_id: the id of the job. By default it is the current job of the device.
+        """
+        if job_id is None:
+            job_id = self.job_id
+        answer = self._local_status(job_id)
+        if answer["status"] == "ERROR":
+            raise SyntaxError(answer["detail"])
+        return answer["status"]
+
+    def check_job_statuses(self, job_ids: List[str]) -> dict:
+        """
+        The status answers of many local jobs.
+
+        Args:
+            job_ids: the ids of the jobs.
+        """
+        return {job_id: self._local_status(job_id) for job_id in job_ids}
+
+    def get_job_result(self, job_id: str = None) -> dict:
+        """
+        The result of a local job in the format of the server.
+
+        Args:
+            job_id: the id of the job. By default it is the current job of the device.
+        """
+        if job_id is None:
+            job_id = self.job_id
+        results_dict = LocalDevice._local_jobs.get(job_id, self._local_status(job_id))
+        if "results" not in results_dict:
+            raise DeviceError(str(results_dict))
+        return results_dict
+
+    def wait_till_done(self, job_id: str = None):
+        """
+        Raise the error of a failed job. Local jobs finish with their submission,
+        so there is nothing to wait for.
+
+        Args:
+            job_id: the id of the job. By default it is the current job of the device.
+        """
+        self.check_job_status(job_id=job_id)
+
+
+class LocalSingleQuditDevice(LocalDevice, SingleQuditDevice):
+    """
+    The single qudit device, which runs its jobs on the local simulator.
+    """
+
+    name = "Single Qudit Quantum Simulator local plugin"
+    short_name = "synqs.sqs.local"
+    simulator_class = SingleQuditSimulator
+
+
+class LocalMultiQuditDevice(LocalDevice, MultiQuditDevice):
+    """
+    The multi qudit device, which runs its jobs on the local simulator.
+    """
+
+    name = "Multi Qudit Quantum Simulator local plugin"
+    short_name = "synqs.mqs.local"
+    simulator_class = MultiQuditSimulator
+
+
+class LocalFermionDevice(LocalDevice, FermionDevice):
+    """
+    The fermion device, which runs its jobs on the local simulator. Circuits
+    without interactions are free fermions, so the number of wires is not limited.
+    """
+
+    name = "Fermion Quantum Simulator local plugin"
+    short_name = "synqs.fs.local"
+    simulator_class = FermionSimulator
+    max_wires = None
@@ -0,0 +1,647 @@
+"""
+Define the local simulators, which execute the job payloads of the devices with
+NumPy instead of sending them to the remote server. They answer in the result
+format of the server, such that the devices treat them like any other backend.
+Experiments without shots give the exact distribution of the measured values
+as `probabilities` instead of the sampled `memory`.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+
+def memory_strings(samples: np.ndarray) -> List[str]:
+    """
+    Convert the sampled values into the `memory` format of the server, i.e. one
+    string of space separated integers per shot.
+
+    Args:
+        samples: an integer array of the shape (shots, measured wires)
+    """
+    return [" ".join(map(str, shot)) for shot in samples.tolist()]
+
+
+@lru_cache(maxsize=None)
+def spin_operators(qdim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The generators of a spin with `qdim` levels, i.e. the diagonal of Lz and
+    the matrix Lx in the basis of increasing magnetisation.
+
+    Args:
+        qdim: the number of levels, i.e. the number of atoms plus one.
+    """
+    spin = (qdim - 1) / 2
+    lz = np.arange(qdim) - spin
+    # <m + 1|L+|m> = sqrt(l (l + 1) - m (m + 1))
+    lplus = np.sqrt(spin * (spin + 1) - lz[:-1] * (lz[:-1] + 1))
+    lx = np.diag(lplus / 2, -1) + np.diag(lplus / 2, 1)
+    return lz, lx
+
+
+@lru_cache(maxsize=None)
+def wigner_d_half_pi(qdim: int) -> np.ndarray:
+    """
+    The Wigner small-d matrix d(pi/2) = exp(-i pi/2 Ly) of a spin with `qdim`
+    levels. It turns Lz into Lx, such that its columns are the eigenvectors of Lx.
+    They are obtained from the three-term recursion of the eigenvalue equation,
+    which runs from the edge towards the centre, where the solutions grow and the
+    recursion is stable, and the other half follows from the reflection symmetry.
+    This takes O(qdim^2) operations and stays accurate for thousands of atoms.
+
+    Args:
+        qdim: the number of levels
+    """
+    num_atoms = qdim - 1
+    eigenvalues = np.arange(qdim) - num_atoms / 2
+    levels = np.arange(num_atoms)
+    # <k + 1|2 Lx|k> = sqrt((k + 1) (n - k))
+    couplings = np.sqrt((levels + 1) * (num_atoms - levels))
+    half = num_atoms // 2
+    rows = np.zeros((half + 1, qdim))
+    rows[0] = 1
+    for level in range(half):
+        rows[level + 1] = 2 * eigenvalues * rows[level]
+        if level:
+            rows[level + 1] -= couplings[level - 1] * rows[level - 1]
+        rows[level + 1] /= couplings[level]
+        # rescale the columns that would overflow for huge spins.
+        huge = np.abs(rows[level + 1]) > 1e150
+        if huge.any():
+            rows[: level + 2, huge] *= 1e-150
+    # the eigenvectors are alternately symmetric and antisymmetric under k -> n - k.
+    parity = (-1.0) ** (num_atoms - np.arange(qdim))
+    matrix = np.empty((qdim, qdim))
+    matrix[: half + 1] = rows
+    matrix[num_atoms - half :] = (rows * parity)[::-1]
+    return matrix / np.linalg.norm(matrix, axis=0)
+
+
+def apply_rlx(
+    state: np.ndarray, qdim: int, theta: Union[float, np.ndarray], axis: int = 0
+) -> np.ndarray:
+    """
+    Rotate a spin by exp(-i theta Lx) = d(pi/2) exp(-i theta Lz) d(pi/2)^T. This
+    takes O(qdim^2) operations per amplitude of the other qudits without forming
+    the rotation matrix. For an array of angles the leading axis of the state
+    is the stack of states that are rotated by them.
+
+    Args:
+        state: the state in the basis of increasing magnetisation
+        qdim: the number of levels of the rotated spin
+        theta: the angle of the rotation, or an array of angles
+        axis: the axis of the rotated spin in the state
+    """
+    basis = wigner_d_half_pi(qdim)
+    phases = along_axis(rlz_phases(qdim, theta), state.ndim, axis)
+    rotated = real_product(basis.T, state, axis) * phases
+    return real_product(basis, rotated, axis)
+
+
+def real_product(matrix: np.ndarray, state: np.ndarray, axis: int) -> np.ndarray:
+    """
+    The product of a real matrix with one axis of a complex state, which
+    multiplies the real and imaginary parts together instead of converting the
+    matrix to complex.
+
+    Args:
+        matrix: the real matrix
+        state: the complex state
+        axis: the axis of the state on which the matrix acts
+    """
+    moved = np.moveaxis(state, axis, 0)
+    shape = moved.shape
+    pairs = np.ascontiguousarray(moved, dtype=complex).reshape(shape[0], -1)
+    product = np.ascontiguousarray(matrix @ pairs.view(float)).view(complex)
+    return np.moveaxis(product.reshape(shape), 0, axis)
+
+
+def along_axis(vector: np.ndarray, ndim: int, axis: int) -> np.ndarray:
+    """
+    Reshape a vector such that it broadcasts along one axis of a state. The
+    leading axes of a stack of vectors stay the leading axes of the state.
+
+    Args:
+        vector: the values along the axis
+        ndim: the number of axes of the state
+        axis: the axis of the values
+    """
+    shape = list(vector.shape[:-1]) + [1] * (ndim - vector.ndim + 1)
+    shape[axis] = vector.shape[-1]
+    return vector.reshape(shape)
+
+
+def rlz_phases(qdim: int, theta: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    The diagonal of the rotation exp(-i theta Lz), with one row per angle for
+    an array of angles.
+
+    Args:
+        qdim: the number of levels
+        theta: the angle of the rotation
+    """
+    return np.exp(-1j * np.multiply.outer(theta, spin_operators(qdim)[0]))
+
+
+def rlz2_phases(qdim: int, theta: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    The diagonal of the squeezing exp(-i theta Lz^2), with one row per angle
+    for an array of angles.
+
+    Args:
+        qdim: the number of levels
+        theta: the strength of the squeezing
+    """
+    return np.exp(-1j * np.multiply.outer(theta, spin_operators(qdim)[0] ** 2))
+
+
+@lru_cache(maxsize=None)
+def flip_flop_blocks(qdim_1: int, qdim_2: int) -> List[tuple]:
+    """
+    The flip-flop coupling Lx Lx + Ly Ly = (L+ L- + L- L+) / 2 of two spins
+    conserves their total magnetisation. It is block diagonal in the sums of
+    the levels, and each block is a small tridiagonal matrix. For each block
+    the levels of both spins and the eigensystem of the block are returned.
+
+    Args:
+        qdim_1: the number of levels of the first spin
+        qdim_2: the number of levels of the second spin
+    """
+    raising_1 = 2 * np.diag(spin_operators(qdim_1)[1], -1)
+    raising_2 = 2 * np.diag(spin_operators(qdim_2)[1], -1)
+    blocks = []
+    for total in range(qdim_1 + qdim_2 - 1):
+        levels_1 = np.arange(max(0, total - qdim_2 + 1), min(qdim_1 - 1, total) + 1)
+        levels_2 = total - levels_1
+        # <a + 1, b - 1|L+ L-|a, b> / 2
+        couplings = raising_1[levels_1[:-1]] * raising_2[levels_2[1:]] / 2
+        block = np.diag(couplings, -1) + np.diag(couplings, 1)
+        values, vectors = np.linalg.eigh(block)
+        blocks.append((levels_1, levels_2, values, vectors))
+    return blocks
+
+
+class LocalSimulator:
+    """
+    The base class of the local simulators. The experiments of a job that only
+    differ by the angles of their gates are simulated together as a batch, and
+    the shots of each experiment are sampled from its final state. The exact
+    derivatives by the angles follow from tangents, which are stacked onto the
+    state like the experiments of a batch.
+
+    Args:
+        seed: the seed of the random generator that draws the shots.
+    """
+
+    backend_name = "local_simulator"
+
+    def __init__(self, seed: int = None):
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, job_payload: dict, job_id: str) -> dict:
+        """
+        Simulate all experiments of a job and return the result dictionary in
+        the format of the server.
+
+        Args:
+            job_payload: the experiments of the job
+            job_id: the id of the job
+        """
+        results = []
+        names = list(job_payload)
+        experiments = [job_payload[name] for name in names]
+        for name, experiment, data in zip(
+            names, experiments, self.run_experiments(experiments)
+        ):
+            results.append(
+                {
+                    "header": {"name": name},
+                    "shots": experiment["shots"],
+                    "success": True,
+                    "data": data,
+                }
+            )
+        return {
+            "job_id": job_id,
+            "status": "finished",
+            "backend_name": self.backend_name,
+            "results": results,
+        }
+
+    @staticmethod
+    def wire_axes(instructions: list) -> Dict:
+        """
+        Number the wires of the instructions in the order of their appearance.
+        Wires without any instruction are left out.
+
+        Args:
+            instructions: the instructions of the experiment
+        """
+        axes = {}
+        for _, wires, _ in instructions:
+            for wire in wires:
+                axes.setdefault(wire, len(axes))
+        return axes
+
+    @staticmethod
+    def batch_key(experiment: dict) -> tuple:
+        """
+        Everything of an experiment but the angles of its gates. The loaded
+        atoms are part of it, since they fix the size of the state.
+
+        Args:
+            experiment: the instructions, the number of wires and the shots
+        """
+        instructions = tuple(
+            (name, tuple(wires), tuple(int(param) for param in params))
+            if name == "load"
+            else (name, tuple(wires))
+            for name, wires, params in experiment["instructions"]
+        )
+        return instructions, experiment["shots"]
+
+    def run_experiments(self, experiments: List[dict]) -> List[dict]:
+        """
+        Simulate the experiments of a job and return the data of their results.
+        The experiments with the same `batch_key` are given to `run_batch`
+        together.
+
+        Args:
+            experiments: the experiments of the job
+        """
+        batches = {}
+        for index, experiment in enumerate(experiments):
+            batches.setdefault(self.batch_key(experiment), []).append(index)
+        data = [None] * len(experiments)
+        for indices in batches.values():
+            batch = [experiments[index] for index in indices]
+            for index, result in zip(indices, self.run_batch(batch)):
+                data[index] = result
+        return data
+
+    def run_batch(self, experiments: List[dict]) -> List[dict]:
+        """
+        Simulate experiments that only differ by the angles of their gates. By
+        default they are simulated one after the other.
+
+        Args:
+            experiments: the experiments of the batch
+        """
+        return [self.run_experiment(experiment) for experiment in experiments]
+
+    def run_experiment(self, experiment: dict) -> dict:
+        """
+        Simulate a single experiment and return the data of its result.
+
+        Args:
+            experiment: the instructions, the number of wires and the shots
+        """
+        raise NotImplementedError()
+
+    def final_states(self, experiments: List[dict], tangents: List[int] = ()) -> tuple:
+        """
+        The final states of experiments that only differ by the angles of their
+        gates, with one row per experiment, and the measured values of each basis
+        state, which are `None` without measurements. With tangents all
+        experiments are the same, and the rows after the first are the
+        derivatives of the first row by the angles of the instructions with
+        these indices.
+
+        Args:
+            experiments: the experiments of the batch
+            tangents: the indices of the instructions whose derivatives are needed
+        """
+        raise NotImplementedError()
+
+    def run_derivatives(self, experiment: dict, indices: List[int]) -> List[dict]:
+        """
+        The exact distribution p of the measured values of an experiment, moved
+        along its derivatives dp = 2 Re(psi^* dpsi) by the angles of the
+        instructions with the indices. The data of the distributions p + dp are
+        followed by those of p - dp, such that they have the format of
+        experiments without shots. Expectation values and variances are at most
+        quadratic in the distribution, so their derivatives are exactly
+        (f(p + dp) - f(p - dp)) / 2.
+
+        Args:
+            experiment: the instructions, the number of wires and the shots
+            indices: the indices of the differentiated instructions
+        """
+        experiments = [dict(experiment, shots=None)] * (len(indices) + 1)
+        states, outcomes = self.final_states(experiments, list(indices))
+        if outcomes is None:
+            return [{"memory": []} for _ in range(2 * len(indices))]
+        probabilities = np.abs(states[0]) ** 2
+        derivatives = 2 * np.real(states[0].conj() * states[1:])
+        return self.measured_data(
+            np.vstack([probabilities + derivatives, probabilities - derivatives]),
+            outcomes,
+            experiments[1:] * 2,
+        )
+
+    @staticmethod
+    def batch_angles(experiments: List[dict], index: int) -> np.ndarray:
+        """
+        The angles of the instruction with the index in each experiment of a
+        batch.
+
+        Args:
+            experiments: the experiments of the batch
+            index: the index of the instruction
+        """
+        return np.array(
+            [
+                float(experiment["instructions"][index][2][0])
+                for experiment in experiments
+            ]
+        )
+
+    def measured_data(
+        self, probabilities: np.ndarray, outcomes: np.ndarray, experiments: List[dict]
+    ) -> List[dict]:
+        """
+        The data of the measured wires for a batch of experiments, i.e. the shots
+        drawn from the distribution of the measured outcomes. Experiments without
+        shots give the exact probability of each outcome instead. The basis states
+        with the same outcome are added up once for the whole batch.
+
+        Args:
+            probabilities: the probabilities of the basis states with one row per
+                experiment
+            outcomes: the measured values of each basis state as an integer
+                array of the shape (basis states, measured wires)
+            experiments: the experiments of the batch
+        """
+        distinct, inverse = np.unique(outcomes, axis=0, return_inverse=True)
+        strings = memory_strings(distinct)
+        # shift the outcomes of each experiment into a range of their own.
+        offsets = np.arange(len(experiments))[:, np.newaxis] * len(distinct)
+        totals = np.bincount(
+            (inverse.ravel() + offsets).ravel(),
+            weights=probabilities.ravel(),
+            minlength=len(experiments) * len(distinct),
+        ).reshape(len(experiments), len(distinct))
+        totals /= totals.sum(axis=1, keepdims=True)
+        data = []
+        for row, experiment in zip(totals, experiments):
+            if experiment["shots"] is None:
+                observed = np.flatnonzero(row).tolist()
+                values = row[observed].tolist()
+                data.append(
+                    {"probabilities": dict(zip([strings[i] for i in observed], values))}
+                )
+            else:
+                indices = self.sample(row, experiment["shots"]).tolist()
+                data.append({"memory": [strings[i] for i in indices]})
+        return data
+
+    def sample(self, probabilities: np.ndarray, shots: int) -> np.ndarray:
+        """
+        Draw the indices of the measured basis states.
+
+        Args:
+            probabilities: the probabilities of the basis states
+            shots: the number of shots
+        """
+        probabilities = probabilities / probabilities.sum()
+        return self.rng.choice(probabilities.size, size=shots, p=probabilities)
+
+
+class SingleQuditSimulator(LocalSimulator):
+    """
+    The simulator of a single spin, which is the collective spin of the loaded
+    atoms. The state is a vector in the basis of increasing magnetisation, such
+    that its index is the number of atoms in the upper state. A batch of
+    experiments is a stack of states with one row per experiment.
+    """
+
+    backend_name = "singlequdit_local"
+
+    def run_experiment(self, experiment):
+        return self.run_batch([experiment])[0]
+
+    def run_batch(self, experiments):
+        state, outcomes = self.final_states(experiments)
+        if outcomes is None:
+            return [{"memory": []} for _ in experiments]
+        return self.measured_data(np.abs(state) ** 2, outcomes, experiments)
+
+    def final_states(self, experiments, tangents=()):
+        qdim = 2
+        state = np.zeros((len(experiments), qdim), dtype=complex)
+        state[:, 0] = 1
+        measured = False
+        for index, (name, _, params) in enumerate(experiments[0]["instructions"]):
+            if name == "load":
+                qdim = int(params[0]) + 1
+                state = np.zeros((len(experiments), qdim), dtype=complex)
+                state[:, 0] = 1
+                # the loaded state does not depend on the gates before.
+                state[
+                    [1 + row for row, tangent in enumerate(tangents) if tangent < index]
+                ] = 0
+                continue
+            if name == "measure":
+                measured = True
+                continue
+            theta = self.batch_angles(experiments, index)
+            if name == "rlx":
+                state = apply_rlx(state, qdim, theta, axis=1)
+            elif name == "rlz":
+                state = rlz_phases(qdim, theta) * state
+            elif name == "rlz2":
+                state = rlz2_phases(qdim, theta) * state
+            else:
+                raise ValueError(f"The instruction {name} is not known.")
+            if index in tangents:
+                state[1 + tangents.index(index)] = -1j * self.generate(
+                    name, state[0], qdim
+                )
+        if not measured:
+            return state, None
+        return state, np.arange(qdim)[:, np.newaxis]
+
+    @staticmethod
+    def generate(name: str, state: np.ndarray, qdim: int) -> np.ndarray:
+        """
+        Apply the generator of a gate, i.e. Lx, Lz or Lz^2, to a single state.
+
+        Args:
+            name: the name of the instruction
+            state: the state in the basis of increasing magnetisation
+            qdim: the number of levels
+        """
+        lz, lx = spin_operators(qdim)
+        if name == "rlx":
+            return lx @ state
+        if name == "rlz":
+            return lz * state
+        return lz ** 2 * state
+
+
+class MultiQuditSimulator(LocalSimulator):
+    """
+    The simulator of several spins, whose state is a tensor with one axis per
+    measured or manipulated wire. Single spin gates act on the axis of their
+    wire, `rlz`, `rlz2` and `rlzlz` are elementwise phases and `rlxly` acts
+    within the blocks of conserved total magnetisation of its two spins, such
+    that no Kronecker product of the full space is ever formed. A batch of
+    experiments adds a leading axis with one state per experiment.
+    """
+
+    backend_name = "multiqudit_local"
+
+    @staticmethod
+    def qudit_dims(instructions: list, axes: Dict) -> List[int]:
+        """
+        The number of levels of each spin, which is given by the loaded atoms.
+        Spins without `load` hold a single atom.
+        """
+        dims = [2] * len(axes)
+        manipulated = set()
+        for name, wires, params in instructions:
+            if name == "load":
+                if wires[0] in manipulated:
+                    raise ValueError(f"The wire {wires[0]} is loaded after its gates.")
+                dims[axes[wires[0]]] = int(params[0]) + 1
+            elif name != "measure":
+                manipulated.update(wires)
+        return dims
+
+    def run_experiment(self, experiment):
+        return self.run_batch([experiment])[0]
+
+    def run_batch(self, experiments):
+        state, outcomes = self.final_states(experiments)
+        if outcomes is None:
+            return [{"memory": []} for _ in experiments]
+        return self.measured_data(np.abs(state) ** 2, outcomes, experiments)
+
+    def final_states(self, experiments, tangents=()):
+        instructions = experiments[0]["instructions"]
+        axes = self.wire_axes(instructions)
+        dims = self.qudit_dims(instructions, axes)
+        state = np.zeros([len(experiments)] + dims, dtype=complex)
+        state[(slice(None),) + (0,) * len(dims)] = 1
+        measured = []
+        for index, (name, wires, _) in enumerate(instructions):
+            targets = [axes[wire] for wire in wires]
+            if name == "load":
+                continue
+            if name == "measure":
+                measured.append(targets[0])
+                continue
+            theta = self.batch_angles(experiments, index)
+            # the axis of each wire follows the axis of the batch.
+            axis = targets[0] + 1
+            if name == "rlx":
+                state = apply_rlx(state, dims[targets[0]], theta, axis)
+            elif name == "rlz":
+                phases = rlz_phases(dims[targets[0]], theta)
+                state = state * along_axis(phases, state.ndim, axis)
+            elif name == "rlz2":
+                phases = rlz2_phases(dims[targets[0]], theta)
+                state = state * along_axis(phases, state.ndim, axis)
+            elif name == "rlzlz":
+                state = self.apply_rlzlz(state, dims, theta, targets)
+            elif name == "rlxly":
+                state = self.apply_rlxly(state, dims, theta, targets)
+            else:
+                raise ValueError(f"The instruction {name} is not known.")
+            if index in tangents:
+                state[1 + tangents.index(index)] = -1j * self.generate(
+                    name, state[0], dims, targets
+                )
+        state = state.reshape(len(experiments), -1)
+        if not measured:
+            return state, None
+        levels = np.unravel_index(np.arange(int(np.prod(dims))), dims)
+        return state, np.stack([levels[axis] for axis in measured], axis=1)
+
+    @staticmethod
+    def generate(
+        name: str, state: np.ndarray, dims: List[int], targets: List[int]
+    ) -> np.ndarray:
+        """
+        Apply the generator of a gate to a single state, i.e. Lx, Lz or Lz^2 of
+        one spin, Lz Lz or the flip-flop Lx Lx + Ly Ly of two spins.
+
+        Args:
+            name: the name of the instruction
+            state: the state with one axis per spin
+            dims: the number of levels of each spin
+            targets: the axes of the spins of the gate
+        """
+        lz, lx = spin_operators(dims[targets[0]])
+        if name == "rlx":
+            return real_product(lx, state, targets[0])
+        if name == "rlz":
+            return state * along_axis(lz, state.ndim, targets[0])
+        if name == "rlz2":
+            return state * along_axis(lz ** 2, state.ndim, targets[0])
+        first, second = targets
+        if name == "rlzlz":
+            lz_2 = spin_operators(dims[second])[0]
+            return (
+                state
+                * along_axis(lz, state.ndim, first)
+                * along_axis(lz_2, state.ndim, second)
+            )
+        moved = np.moveaxis(state, (first, second), (0, 1))
+        result = np.zeros_like(moved)
+        for levels_1, levels_2, values, vectors in flip_flop_blocks(
+            dims[first], dims[second]
+        ):
+            block = moved[levels_1, levels_2]
+            values = values.reshape(values.shape + (1,) * (block.ndim - 1))
+            rotated = values * np.tensordot(vectors.T, block, 1)
+            result[levels_1, levels_2] = np.tensordot(vectors, rotated, 1)
+        return np.moveaxis(result, (0, 1), (first, second))
+
+    @staticmethod
+    def apply_rlzlz(state, dims, theta, targets):
+        """
+        The Ising coupling exp(-i theta Lz Lz) as elementwise phases. The axes
+        of the state in front of the spins are a stack of states, which belong
+        to an array of angles.
+        """
+        first, second = targets
+        if first == second:
+            raise ValueError("The rlzlz gate needs two different wires.")
+        lz_1 = spin_operators(dims[first])[0]
+        lz_2 = spin_operators(dims[second])[0]
+        phases = np.exp(-1j * np.multiply.outer(theta, np.outer(lz_1, lz_2)))
+        if first > second:
+            phases = np.swapaxes(phases, -1, -2)
+        offset = state.ndim - len(dims)
+        shape = list(np.shape(theta)) + [1] * (state.ndim - np.ndim(theta))
+        shape[offset + first] = dims[first]
+        shape[offset + second] = dims[second]
+        return state * phases.reshape(shape)
+
+    @staticmethod
+    def apply_rlxly(state, dims, theta, targets):
+        """
+        The flip-flop coupling exp(-i theta (Lx Lx + Ly Ly)), which is applied
+        block by block of the conserved total magnetisation. The axes of the
+        state in front of the spins are a stack of states, which belong to an
+        array of angles.
+        """
+        first, second = targets
+        if first == second:
+            raise ValueError("The rlxly gate needs two different wires.")
+        offset = state.ndim - len(dims)
+        spins = (offset + first, offset + second)
+        moved = np.moveaxis(state, spins, (0, 1))
+        result = np.empty_like(moved)
+        for levels_1, levels_2, values, vectors in flip_flop_blocks(
+            dims[first], dims[second]
+        ):
+            block = moved[levels_1, levels_2]
+            # the axes of the block are the levels, the stack and the other spins.
+            phases = np.exp(-1j * np.multiply.outer(values, theta))
+            phases = phases.reshape(phases.shape + (1,) * (block.ndim - phases.ndim))
+            rotated = np.tensordot(vectors.T, block, 1) * phases
+            result[levels_1, levels_2] = np.tensordot(vectors, rotated, 1)
+        return np.moveaxis(result, (0, 1), spins)
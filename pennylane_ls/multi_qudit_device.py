@@ -3,9 +3,6 @@ A device that allows us to implement operation on multiple qudits.
 The backend is a remote simulator.
 """
 
-import json
-
-import requests
 import numpy as np
 
 from .django_device import DjangoDevice
@@ -54,6 +51,17 @@ class MultiQuditDevice(DjangoDevice):
         password=None,
         job_id=None,
         blocking=True,
+        session_pool=None,
+        wait_strategy=None,
+        max_workers=None,
+        result_store=None,
+        poller=None,
+        token_auth=None,
+        transport=None,
+        wire_format=None,
+        stream_results=False,
+        memmap_dir=None,
+        counts_mode=False,
     ):
         """
         The initial part.
@@ -66,8 +74,19 @@ class MultiQuditDevice(DjangoDevice):
             password=password,
             blocking=blocking,
             job_id=job_id,
+            session_pool=session_pool,
+            wait_strategy=wait_strategy,
+            max_workers=max_workers,
+            result_store=result_store,
+            poller=poller,
+            token_auth=token_auth,
+            transport=transport,
+            wire_format=wire_format,
+            stream_results=stream_results,
+            memmap_dir=memmap_dir,
         )
         self.qdim = 2
+        self.counts_mode = counts_mode
 
     @classmethod
     def capabilities(cls):
@@ -115,10 +134,15 @@ class MultiQuditDevice(DjangoDevice):
         """
 
         try:
-            if self.job_id is None:
-                self.sample(observable, wires, par)
-            if self.check_job_status() != "DONE":
-                return "Job_not_done"
+            if self.counts_mode or self.shots is None:
+                counts = self.wire_counts()
+                if counts is None:
+                    return self.job_future()
+                # the mean of each wire follows from its histogram in O(qdim).
+                counts = counts[self._columns(wires)]
+                return counts @ np.arange(counts.shape[1]) / counts.sum(axis=1)
+            if self.job_samples() is None:
+                return self.job_future()
             shots = self.sample(observable, wires, par)
             return np.mean(shots, axis=0)
         except ValueError as exc:
@@ -129,56 +153,26 @@ class MultiQuditDevice(DjangoDevice):
         Retrieve the requested observable expectation value.
         """
 
-        # submit the job
-        if self.job_id is None:
-            wires = wires if isinstance(wires, list) else [wires]
-            for _, name in enumerate(wires):
-                m_obj = ("measure", [name.labels[0]], [])
-                self.job_payload["experiment_0"]["instructions"].append(m_obj)
-
-            url = self.url_prefix + "post_job/"
-            job_response = requests.post(
-                url,
-                data={
-                    "json": json.dumps(self.job_payload),
-                    "username": self.username,
-                    "password": self.password,
-                },
-            )
-
-            self.job_id = (job_response.json())["job_id"]
-            if self.blocking:
-                self.wait_till_done()
-            else:
-                return self.job_id
-
-        if self.blocking:
-            self.wait_till_done()
-        elif self.check_job_status() != "DONE":
-            return self.job_id
-
         # obtain the job result
-        result_payload = {"job_id": self.job_id}
-        url = self.url_prefix + "get_job_result/"
-
-        result_response = requests.get(
-            url,
-            params={
-                "json": json.dumps(result_payload),
-                "username": self.username,
-                "password": self.password,
-            },
-        )
-        results_dict = json.loads(result_response.text)
-        results = results_dict["results"][0]["data"]["memory"]
-
-        num_obs = len(wires)
-        out = np.zeros((self.shots, num_obs))
-        for i1 in np.arange(self.shots):
-            temp = results[i1].split()
-            for i2 in np.arange(num_obs):
-                out[i1, i2] = int(temp[i2])
-        return out
-
-    def reset(self):
-        self.job_id = None
+        samples = self.job_samples()
+        if samples is None:
+            return self.job_future()
+        return samples[:, self._columns(wires)]
+
+    def observable_context(self):
+        return self._measured_wires
+
+    def observable_values(self, observable, wires, outcomes, context):
+        return outcomes[:, self._columns(wires, context)]
+
+    def _columns(self, wires, measured_wires=None):
+        """
+        The columns of the memory that belong to the measured wires. By default
+        the wires are measured as in the current job.
+        """
+        wires = wires if isinstance(wires, list) else [wires]
+        if measured_wires is None:
+            measured_wires = self._measured_wires
+        if measured_wires is None:
+            return np.arange(len(wires))
+        return [measured_wires.index(wire.labels[0]) for wire in wires]
@@ -9,10 +9,15 @@ from pennylane.operation import Operation
 from pennylane.operation import Observable
 import numpy as np
 
+from .local_simulator import flip_flop_blocks, spin_operators
+
 
 class MultiQuditOperation(Operation):
     """
     A base class for all the single qudit operation that will later inherit from it.
+    The parametrised gates use `grad_method = "F"`, because their shift rule
+    depends on the loaded atoms. `gradients.param_shift` reads the atoms from the
+    circuit and applies the rule of `generator_eigvals`.
     """
 
     @classmethod
@@ -27,6 +32,19 @@ class MultiQuditOperation(Operation):
         """
         raise NotImplementedError()
 
+    # the factor of the parameter in the angle of the instruction
+    generator_scale = 1
+
+    @classmethod
+    def generator_eigvals(cls, qdims: List[int]) -> np.ndarray:
+        """the eigenvalues of the generator of the instruction, whose differences
+        are the frequencies of the gate
+
+        Args:
+            qdims: the number of levels of the qudits of the gate
+        """
+        raise NotImplementedError()
+
 
 class MultiQuditObservable(Observable):
     """
@@ -71,7 +89,7 @@ class RLX(MultiQuditOperation):
     num_wires = 1
     par_domain = "R"
 
-    grad_method = None
+    grad_method = "F"
     grad_recipe = None
 
     @classmethod
@@ -81,6 +99,10 @@ class RLX(MultiQuditOperation):
         l_obj = ("rlx", [wires[0]], [theta % (2 * np.pi)])
         return l_obj, False
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        return spin_operators(qdims[0])[0]
+
 
 class RLZ(MultiQuditOperation):
     """The RLZ operation"""
@@ -89,7 +111,7 @@ class RLZ(MultiQuditOperation):
     num_wires = 1
     par_domain = "R"
 
-    grad_method = None
+    grad_method = "F"
     grad_recipe = None
 
     @classmethod
@@ -98,6 +120,10 @@ class RLZ(MultiQuditOperation):
         l_obj = ("rlz", [wires[0]], [theta % (2 * np.pi)])
         return l_obj, False
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        return spin_operators(qdims[0])[0]
+
 
 class RLZ2(MultiQuditOperation):
     """The RLZ2 operation"""
@@ -106,7 +132,7 @@ class RLZ2(MultiQuditOperation):
     num_wires = 1
     par_domain = "R"
 
-    grad_method = None
+    grad_method = "F"
     grad_recipe = None
 
     @classmethod
@@ -115,6 +141,10 @@ class RLZ2(MultiQuditOperation):
         l_obj = ("rlz2", [wires[0]], [theta % (2 * np.pi)])
         return l_obj, False
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        return spin_operators(qdims[0])[0] ** 2
+
 
 class ID(MultiQuditOperation):
     """Identity gate"""
@@ -141,12 +171,20 @@ class RLXLY(MultiQuditOperation):
     num_wires = 2
     par_domain = "R"
 
+    grad_method = "F"
+    grad_recipe = None
+
     @classmethod
     def qudit_operator(cls, par, wires):
         theta = par[0]
-        l_obj = ("rlxly", [wires[0], wires[1]], [theta % (2 * np.pi)])
+        # the flip-flop of larger spins has no period, so its angle is not wrapped.
+        l_obj = ("rlxly", [wires[0], wires[1]], [theta])
         return l_obj, False
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        return np.concatenate([block[2] for block in flip_flop_blocks(*qdims)])
+
 
 class RLZLZ(MultiQuditOperation):
     """LzLz or generalized Ising gate"""
@@ -155,12 +193,22 @@ class RLZLZ(MultiQuditOperation):
     num_wires = 2
     par_domain = "R"
 
+    grad_method = "F"
+    grad_recipe = None
+
     @classmethod
     def qudit_operator(cls, par, wires):
         theta = par[0]
-        l_obj = ("rlzlz", [wires[0], wires[1]], [theta % (2 * np.pi)])
+        # the products of two half-integer magnetisations have the period 4 pi.
+        l_obj = ("rlzlz", [wires[0], wires[1]], [theta % (4 * np.pi)])
         return l_obj, False
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        return np.outer(
+            spin_operators(qdims[0])[0], spin_operators(qdims[1])[0]
+        ).ravel()
+
 
 ## Observables
 class ZObs(MultiQuditObservable):
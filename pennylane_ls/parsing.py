@@ -0,0 +1,154 @@
+"""
+Define the conversion of the measured shots, which the server returns as
+strings of space separated integers, into NumPy arrays.
+"""
+
+import base64
+from typing import List
+
+import numpy as np
+
+_SPACE = ord(" ")
+_ZERO = ord("0")
+
+# the largest number of bits, i.e. wires, that `pack_bits` packs into one code
+MAX_PACKED_WIRES = 64
+
+
+def parse_memory_loop(memory: List[str]) -> np.ndarray:
+    """
+    Convert the shots one by one. This is the reference for the vectorised
+    parser and handles every string that `int` understands.
+
+    Args:
+        memory: the shots as strings of space separated integers
+    """
+    num_obs = len(memory[0].split()) if memory else 0
+    out = np.zeros((len(memory), num_obs), dtype=int)
+    for ind_1, shot in enumerate(memory):
+        temp = shot.split()
+        if len(temp) != num_obs:
+            raise ValueError("All shots must contain the same number of values.")
+        for ind_2 in range(num_obs):
+            out[ind_1, ind_2] = int(temp[ind_2])
+    return out
+
+
+def parse_memory(memory: List[str], dtype: type = int) -> np.ndarray:
+    """
+    Convert the shots into an integer array of the shape (shots, measured wires).
+    All shots are joined into one buffer of bytes and the decimal digits are
+    converted in a single vectorised pass. Shots with other characters than
+    digits and spaces, e.g. signs, are handed to `parse_memory_loop`.
+
+    Args:
+        memory: the shots as strings of space separated integers
+        dtype: the integer type of the array
+    """
+    if not memory:
+        return np.zeros((0, 0), dtype=dtype)
+    try:
+        buffer = np.frombuffer(" ".join(memory).encode("ascii"), dtype=np.uint8)
+    except UnicodeEncodeError:
+        return parse_memory_loop(memory)
+
+    # the length of each shot locates the boundaries between the shots.
+    shot_lengths = np.fromiter(map(len, memory), dtype=np.int64, count=len(memory))
+    if buffer.size % 2 and np.all(buffer[1::2] == _SPACE):
+        # only single digit values, which is typical for occupations.
+        values = buffer[::2] - _ZERO
+        if np.any(values > 9):
+            return parse_memory_loop(memory).astype(dtype)
+        values = values.astype(dtype)
+        sizes = (shot_lengths + 1) // 2
+    else:
+        spaces = np.flatnonzero(buffer == _SPACE)
+        token_starts = np.append(0, spaces + 1)
+        token_ends = np.append(spaces, buffer.size)
+        lengths = token_ends - token_starts
+        digits = buffer - _ZERO
+        digits[spaces] = 0
+        if np.any(digits > 9):
+            return parse_memory_loop(memory).astype(dtype)
+        if not lengths.all():
+            # irregular spacing
+            values = np.array(" ".join(memory).split(), dtype=int)
+            sizes = np.array([len(shot.split()) for shot in memory])
+        else:
+            # right align all values in a block of the largest width
+            width = int(lengths.max())
+            index = token_ends[:, None] - width + np.arange(width)
+            block = digits[np.maximum(index, 0)].astype(int)
+            block[index < token_starts[:, None]] = 0
+            values = block @ (10 ** np.arange(width - 1, -1, -1))
+            # the spaces that separate the shots end the values of each shot.
+            separators = np.cumsum(shot_lengths + 1) - 1
+            sizes = np.diff(np.searchsorted(spaces, separators), prepend=-1)
+
+    if np.any(sizes != sizes[0]):
+        raise ValueError("All shots must contain the same number of values.")
+    return values.reshape(len(memory), -1).astype(dtype, copy=False)
+
+
+def unpack_memory(packed: dict, dtype: type = int) -> np.ndarray:
+    """
+    Convert the shots of a compact result into an integer array of the shape
+    (shots, measured wires). The compact result carries the raw bytes of the
+    array together with its `dtype` and `shape`. Streamed results carry the
+    array itself, which is not copied if it has the requested type already.
+
+    Args:
+        packed: the `memory_packed` entry of the result data
+        dtype: the integer type of the array
+    """
+    buffer = packed["data"]
+    if isinstance(buffer, np.ndarray):
+        return buffer.astype(dtype, copy=False)
+    if isinstance(buffer, str):
+        # JSON carries the bytes in base64.
+        buffer = base64.b64decode(buffer)
+    values = np.frombuffer(buffer, dtype=packed["dtype"])
+    return values.reshape(packed["shape"]).astype(dtype)
+
+
+def code_dtype(num_bits: int) -> type:
+    """
+    The smallest unsigned integer type that holds codes of `num_bits` bits.
+
+    Args:
+        num_bits: the number of bits per code
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if num_bits <= 8 * np.dtype(dtype).itemsize:
+            return dtype
+    raise ValueError(f"At most {MAX_PACKED_WIRES} bits can be packed into one code.")
+
+
+def pack_bits(bits: np.ndarray) -> np.ndarray:
+    """
+    Pack the rows of an array of zeros and ones into one integer code per row.
+    The first column is the most significant bit.
+
+    Args:
+        bits: an array of the shape (shots, number of bits)
+    """
+    num_bits = bits.shape[1]
+    dtype = code_dtype(num_bits)
+    codes = np.zeros(bits.shape[0], dtype=dtype)
+    for column in range(num_bits):
+        codes <<= dtype(1)
+        codes |= bits[:, column].astype(dtype)
+    return codes
+
+
+def unpack_bits(codes: np.ndarray, num_bits: int) -> np.ndarray:
+    """
+    Unpack integer codes into rows of zeros and ones, i.e. invert `pack_bits`.
+
+    Args:
+        codes: the integer codes
+        num_bits: the number of bits per code
+    """
+    shifts = np.arange(num_bits - 1, -1, -1, dtype=np.uint64)
+    codes = np.asarray(codes, dtype=np.uint64)
+    return ((codes[:, None] >> shifts) & np.uint64(1)).astype(int)
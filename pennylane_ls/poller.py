@@ -0,0 +1,182 @@
+"""
+Define a background service that polls the status of all outstanding jobs of
+a process, such that many waiting jobs do not need a polling loop each.
+"""
+
+import threading
+from typing import List, Optional
+
+from .job_future import JobFuture
+from .waiting import WaitStrategy, ExponentialBackoff
+
+
+class JobPoller:
+    """
+    A background thread that checks the status of all watched jobs in rounds.
+    The jobs of devices with the same server and credentials are checked
+    together in bulk status requests of up to `batch_size` jobs. Once a job has
+    finished, its future is completed, which wakes everybody that waits for it.
+    A job whose status cannot be checked `max_errors` times in a row fails with
+    the latest error.
+
+    Args:
+        wait_strategy: the pauses between two rounds. They start over whenever a
+            new job is watched, such that fast jobs are noticed quickly.
+        batch_size: the maximal number of jobs per status request.
+        max_errors: the number of failed status checks after which a job fails.
+    """
+
+    def __init__(
+        self,
+        wait_strategy: Optional[WaitStrategy] = None,
+        batch_size: int = 100,
+        max_errors: int = 5,
+    ):
+        if wait_strategy is None:
+            wait_strategy = ExponentialBackoff()
+        self.wait_strategy = wait_strategy
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self._futures = set()
+        # the failed status checks in a row of each future
+        self._failures = {}
+        self._condition = threading.Condition()
+        self._restart = False
+        self._closed = False
+        self._thread = None
+        self.rounds = 0
+        self.completed = 0
+        self.errors = 0
+
+    def watch(self, future: JobFuture):
+        """
+        Track the job of the future until it has finished.
+
+        Args:
+            future: the future of the job
+        """
+        with self._condition:
+            new = future not in self._futures
+            if new:
+                self._futures.add(future)
+                self._restart = True
+            if self._thread is None or not self._thread.is_alive():
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            elif new and len(self._futures) == 1:
+                # wake the idle thread
+                self._condition.notify_all()
+
+    def pending(self) -> int:
+        """
+        The number of watched jobs that have not finished yet.
+        """
+        with self._condition:
+            return len(self._futures)
+
+    def _run(self):
+        delays = self.wait_strategy.delays()
+        while True:
+            with self._condition:
+                while not self._futures and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                if self._restart:
+                    delays = self.wait_strategy.delays()
+                    self._restart = False
+                self._condition.wait(next(delays))
+                if self._closed:
+                    return
+            try:
+                self.poll_once()
+            except Exception:  # pylint: disable=W0703
+                # the thread has to survive for the other jobs.
+                self.errors += 1
+
+    def poll_once(self):
+        """
+        Check the status of all watched jobs once and complete the futures of the
+        finished ones.
+        """
+        with self._condition:
+            futures = list(self._futures)
+        # the jobs on the same server with the same credentials are checked together.
+        groups = {}
+        for future in futures:
+            device = future.device
+            key = (device.url_prefix, device.username, device.password)
+            groups.setdefault(key, []).append(future)
+
+        for group in groups.values():
+            for start in range(0, len(group), self.batch_size):
+                batch = group[start : start + self.batch_size]
+                job_ids = list({future.job_id: None for future in batch})
+                try:
+                    statuses = batch[0].device.check_job_statuses(job_ids)
+                except Exception as exc:  # pylint: disable=W0703
+                    # a failed round is repeated in the next one.
+                    self._fail(batch, exc)
+                    continue
+                for future in batch:
+                    try:
+                        self._update(future, statuses.get(future.job_id))
+                    except Exception as exc:  # pylint: disable=W0703
+                        self._fail([future], exc)
+        self.rounds += 1
+
+    def _update(self, future: JobFuture, answer: Optional[dict]):
+        """
+        Complete the future, if the status answer reports its job as finished.
+        """
+        status = None if answer is None else answer["status"]
+        with self._condition:
+            self._failures.pop(future, None)
+            if status not in ("DONE", "ERROR"):
+                return
+            self._futures.discard(future)
+            self.completed += 1
+        if status == "ERROR":
+            future.set_exception(SyntaxError(answer["detail"]))
+        else:
+            future.set_done()
+
+    def _fail(self, futures: List[JobFuture], exception: Exception):
+        """
+        Count a failed status check of the futures and let those fail that were
+        not checked successfully for `max_errors` times in a row.
+        """
+        failed = []
+        with self._condition:
+            self.errors += 1
+            for future in futures:
+                self._failures[future] = self._failures.get(future, 0) + 1
+                if self._failures[future] >= self.max_errors:
+                    del self._failures[future]
+                    self._futures.discard(future)
+                    failed.append(future)
+        for future in failed:
+            future.set_exception(exception)
+
+    def stats(self) -> dict:
+        """
+        The counters for the polling rounds, the finished jobs and the failed rounds.
+        """
+        return {
+            "rounds": self.rounds,
+            "completed": self.completed,
+            "errors": self.errors,
+            "pending": self.pending(),
+        }
+
+    def close(self):
+        """
+        Stop the background thread. Jobs that are watched later start it again.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
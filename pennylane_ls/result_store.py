@@ -0,0 +1,170 @@
+"""
+Define a persistent store for the results of jobs, such that identical
+circuits do not have to be submitted to the server again.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+
+def _encode_bytes(value):
+    """
+    Save the raw bytes of compact results and the arrays of streamed results
+    in base64.
+    """
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value).tobytes()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    raise TypeError(f"{type(value).__name__} cannot be saved.")
+
+
+class ResultStore:
+    """
+    An on-disk store for the results of jobs. Each result is saved under a
+    canonical hash of the url and the job payload. The least recently used
+    results are evicted once the store grows beyond `max_bytes`.
+
+    Args:
+        directory: the folder in which the results are saved.
+        max_bytes: the maximal size of all saved results in bytes.
+        ttl: the time in seconds after which a result is considered stale.
+            `None` keeps the results forever.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 100 * 1024 ** 2,
+        ttl: Optional[float] = None,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(url: str, job_payload: dict) -> str:
+        """
+        The canonical hash of the job payload for the API under the url.
+
+        Args:
+            url: the url prefix of the API
+            job_payload: the experiments of the job
+        """
+        canonical = json.dumps(
+            [url, job_payload], sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, url: str, job_payload: dict) -> Optional[dict]:
+        """
+        The saved result of the job payload or `None` if there is none.
+
+        Args:
+            url: the url prefix of the API
+            job_payload: the experiments of the job
+        """
+        path = self._path(self.key(url, job_payload))
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as result_file:
+                    entry = json.load(result_file)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            if self.ttl is not None and time.time() - entry["created"] > self.ttl:
+                self._remove(path)
+                self.misses += 1
+                return None
+            # the modification time marks the last use for the eviction.
+            os.utime(path)
+            self.hits += 1
+            return entry["results_dict"]
+
+    def put(self, url: str, job_payload: dict, results_dict: dict):
+        """
+        Save the result of a job payload and evict old results if necessary.
+
+        Args:
+            url: the url prefix of the API
+            job_payload: the experiments of the job
+            results_dict: the result of the job
+        """
+        path = self._path(self.key(url, job_payload))
+        entry = {"created": time.time(), "results_dict": results_dict}
+        with self._lock:
+            # write to a temporary file first, such that readers never see half a result.
+            handle, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(handle, "w", encoding="utf-8") as result_file:
+                json.dump(entry, result_file, default=_encode_bytes)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """
+        Remove the least recently used results until the store fits into `max_bytes`.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            self.evictions += 1
+
+    def size(self) -> int:
+        """
+        The size of all saved results in bytes.
+        """
+        return sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        )
+
+    def stats(self) -> dict:
+        """
+        The counters for the hits, misses and evictions of the store.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def clear(self):
+        """
+        Remove all saved results.
+        """
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    self._remove(os.path.join(self.directory, name))
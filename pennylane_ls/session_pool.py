@@ -0,0 +1,125 @@
+"""
+Define the pool of keep-alive HTTP sessions that is shared by all the devices
+which communicate with the Django API.
+"""
+
+import threading
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool:
+    """
+    A pool of keep-alive HTTP sessions. One session is kept per host, such that
+    the TCP/TLS connections are reused between the status polls and result
+    fetches of all devices that talk to this host.
+
+    Args:
+        pool_connections: the number of connection pools that are cached per session.
+        pool_maxsize: the maximum number of connections that are kept alive per host.
+        timeout: the default timeout in seconds for each request. It might be a tuple
+            of the connection and the read timeout.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 10,
+        timeout: Optional[Union[float, Tuple[float, float]]] = (3.05, 30),
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self._sessions: Dict[str, requests.Session] = {}
+        self._seen_connections: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    @staticmethod
+    def host(url: str) -> str:
+        """
+        The scheme and host part of the url, which identifies the session.
+        """
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def session(self, url: str) -> requests.Session:
+        """
+        Return the session for the host of the url and create it if necessary.
+
+        Args:
+            url: any url on the host
+        """
+        host = self.host(url)
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return self._sessions[host]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the session of the host and keep track of
+        whether a new connection had to be opened for it.
+
+        Args:
+            method: the HTTP method, e.g. "GET" or "POST"
+            url: the url of the request
+            kwargs: further arguments that are passed on to `requests.Session.request`
+        """
+        session = self.session(url)
+        kwargs.setdefault("timeout", self.timeout)
+        response = session.request(method, url, **kwargs)
+
+        # the urllib3 pool of the host counts the connections that it opened.
+        conn_pool = getattr(response.raw, "_pool", None)
+        if conn_pool is not None:
+            with self._lock:
+                seen = self._seen_connections.get(id(conn_pool), 0)
+                self._seen_connections[id(conn_pool)] = conn_pool.num_connections
+                if conn_pool.num_connections > seen:
+                    self.connections_opened += conn_pool.num_connections - seen
+                else:
+                    self.connections_reused += 1
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send a GET request through the pool.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send a POST request through the pool.
+        """
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        The counters for the opened and reused connections.
+        """
+        return {
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+        }
+
+    def close(self):
+        """
+        Close all sessions and their connections.
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+            self._seen_connections = {}
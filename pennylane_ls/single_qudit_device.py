@@ -2,8 +2,6 @@
 A device that allows us to implement operation on a single qudit. The backend is a remote simulator.
 """
 
-import json
-import requests
 import numpy as np
 
 from .django_device import DjangoDevice
@@ -45,6 +43,17 @@ class SingleQuditDevice(DjangoDevice):
         password=None,
         job_id=None,
         blocking=True,
+        session_pool=None,
+        wait_strategy=None,
+        max_workers=None,
+        result_store=None,
+        poller=None,
+        token_auth=None,
+        transport=None,
+        wire_format=None,
+        stream_results=False,
+        memmap_dir=None,
+        counts_mode=False,
     ):
         """
         The initial part.
@@ -57,8 +66,19 @@ class SingleQuditDevice(DjangoDevice):
             password=password,
             blocking=blocking,
             job_id=job_id,
+            session_pool=session_pool,
+            wait_strategy=wait_strategy,
+            max_workers=max_workers,
+            result_store=result_store,
+            poller=poller,
+            token_auth=token_auth,
+            transport=transport,
+            wire_format=wire_format,
+            stream_results=stream_results,
+            memmap_dir=memmap_dir,
         )
         self.qdim = 2
+        self.counts_mode = counts_mode
 
     def apply(self, operation, wires, par):
         """
@@ -83,10 +103,12 @@ class SingleQuditDevice(DjangoDevice):
         """
 
         try:
-            if self.job_id is None:
-                self.sample(observable, wires, par)
-            if self.check_job_status() != "DONE":
-                return "Job_not_done"
+            if self.counts_mode or self.shots is None:
+                if self.wire_counts() is None:
+                    return self.job_future()
+                return self._moments(observable)[0]
+            if self.job_samples() is None:
+                return self.job_future()
             shots = self.sample(observable, wires, par)
             return shots.mean()
         except ValueError as exc:
@@ -98,15 +120,30 @@ class SingleQuditDevice(DjangoDevice):
         """
 
         try:
-            if self.job_id is None:
-                self.sample(observable, wires, par)
-            if self.check_job_status() != "DONE":
-                return "Job_not_done"
+            if self.counts_mode or self.shots is None:
+                if self.wire_counts() is None:
+                    return self.job_future()
+                return self._moments(observable)[1]
+            if self.job_samples() is None:
+                return self.job_future()
             shots = self.sample(observable, wires, par)
             return shots.var()
         except ValueError as exc:
             raise NotImplementedError() from exc
 
+    def _moments(self, observable):
+        """
+        The mean and the variance of the observable, which follow from the
+        histogram of the measured values in O(qdim) instead of O(shots). Without
+        shots the histogram is the exact distribution of the values.
+        """
+        counts = self.wire_counts()[0]
+        observable_class = self._observable_map[observable]
+        values = observable_class.qudit_operator(np.arange(counts.size), self.qdim)
+        probabilities = counts / counts.sum()
+        mean = probabilities @ values
+        return mean, probabilities @ (values - mean) ** 2
+
     def sample(self, observable, wires, par):
         """
         Retrieve the requested observable expectation value.
@@ -114,53 +151,28 @@ class SingleQuditDevice(DjangoDevice):
 
         observable_class = self._observable_map[observable]
         if issubclass(observable_class, SingleQuditObservable):
-
-            # submit the job
-            if self.job_id is None:
-                m_obj = ("measure", [0], [])
-                url = self.url_prefix + "post_job/"
-                self.job_payload["experiment_0"]["instructions"].append(m_obj)
-                job_response = requests.post(
-                    url,
-                    data={
-                        "json": json.dumps(self.job_payload),
-                        "username": self.username,
-                        "password": self.password,
-                    },
-                )
-
-                self.job_id = (job_response.json())["job_id"]
-                if self.blocking is True:
-                    self.wait_till_done()
-                else:
-                    return self.job_id
-
-            if self.blocking is True:
-                self.wait_till_done()
-            elif self.check_job_status() != "DONE":
-                return self.job_id
             # obtain the job result
-            result_payload = {"job_id": self.job_id}
-            url = self.url_prefix + "get_job_result/"
-
-            result_response = requests.get(
-                url,
-                params={
-                    "json": json.dumps(result_payload),
-                    "username": self.username,
-                    "password": self.password,
-                },
-            )
-            results_dict = json.loads(result_response.text)
-            shots = results_dict["results"][0]["data"]["memory"]
-            shots = np.array([int(shot) for shot in shots])
+            samples = self.job_samples()
+            if samples is None:
+                return self.job_future()
+            shots = samples[:, 0]
 
             # and give back the appropiate observable.
             shots = observable_class.qudit_operator(shots, self.qdim)
             return shots
         raise NotImplementedError()
 
+    def observable_context(self):
+        return self.qdim
+
+    def observable_values(self, observable, wires, outcomes, context):
+        observable_class = self._observable_map[observable]
+        return observable_class.qudit_operator(outcomes[:, 0], context)
+
+    def measurement_instructions(self, wires):
+        return [("measure", [0], [])]
+
     def reset(self):
+        super().reset()
         self.qdim = 2
-        self.job_id = None
         self.job_payload = None
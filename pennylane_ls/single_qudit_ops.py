@@ -9,10 +9,15 @@ from pennylane.operation import Operation
 from pennylane.operation import Observable
 import numpy as np
 
+from .local_simulator import spin_operators
+
 
 class SingleQuditOperation(Operation):
     """
     A base class for all the single qudit operation that will later inherit from it.
+    The parametrised gates use `grad_method = "F"`, because their shift rule
+    depends on the loaded atoms. `gradients.param_shift` reads the atoms from the
+    circuit and applies the rule of `generator_eigvals`.
     """
 
     @classmethod
@@ -26,6 +31,19 @@ class SingleQuditOperation(Operation):
         """
         raise NotImplementedError()
 
+    # the factor of the parameter in the angle of the instruction
+    generator_scale = 1
+
+    @classmethod
+    def generator_eigvals(cls, qdims: List[int]) -> np.ndarray:
+        """the eigenvalues of the generator of the instruction, whose differences
+        are the frequencies of the gate
+
+        Args:
+            qdims: the number of levels of the qudit
+        """
+        raise NotImplementedError()
+
 
 class SingleQuditObservable(Observable):
     """
@@ -69,7 +87,7 @@ class RLX(SingleQuditOperation):
     num_wires = 1
     par_domain = "R"
 
-    grad_method = None
+    grad_method = "F"
     grad_recipe = None
 
     @classmethod
@@ -79,6 +97,10 @@ class RLX(SingleQuditOperation):
         l_obj = ("rlx", [0], [theta % (2 * np.pi)])
         return l_obj, False
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        return spin_operators(qdims[0])[0]
+
 
 class RLZ(SingleQuditOperation):
     """The rLz operation"""
@@ -87,7 +109,7 @@ class RLZ(SingleQuditOperation):
     num_wires = 1
     par_domain = "R"
 
-    grad_method = None
+    grad_method = "F"
     grad_recipe = None
 
     @classmethod
@@ -96,6 +118,10 @@ class RLZ(SingleQuditOperation):
         l_obj = ("rlz", [0], [theta % (2 * np.pi)])
         return l_obj, False
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        return spin_operators(qdims[0])[0]
+
 
 class RLZ2(SingleQuditOperation):
     """The rLz operation"""
@@ -104,7 +130,7 @@ class RLZ2(SingleQuditOperation):
     num_wires = 1
     par_domain = "R"
 
-    grad_method = None
+    grad_method = "F"
     grad_recipe = None
 
     @classmethod
@@ -112,6 +138,10 @@ class RLZ2(SingleQuditOperation):
         l_obj = ("rlz2", [0], par)
         return l_obj, False
 
+    @classmethod
+    def generator_eigvals(cls, qdims):
+        return spin_operators(qdims[0])[0] ** 2
+
 
 class ID(SingleQuditOperation):
     """Custom gate"""
@@ -0,0 +1,181 @@
+"""
+Define the streaming reader for large results, which converts the measured
+shots chunk by chunk instead of decoding the whole document at once.
+"""
+
+import json
+import os
+import re
+import tempfile
+import weakref
+from typing import List, Optional
+
+import numpy as np
+
+from .parsing import parse_memory
+
+_MEMORY_KEY = re.compile(rb'"memory"\s*:\s*\[')
+
+# the size in bytes of the chunks in which results are downloaded
+CHUNK_SIZE = 1 << 16
+
+# the bytes at the end of a chunk that might hold the beginning of the key
+_KEY_TAIL = 64
+
+
+def _remove(path: str):
+    """
+    Remove the file of a memmap that is no longer used.
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class MemoryStreamReader:
+    """
+    Read a result document from a stream of chunks. The shots of each `memory`
+    list are converted block by block into a preallocated integer array, or an
+    on-disk memmap, while the rest of the document is decoded as JSON at the
+    end. The arrays end up as the `memory_packed` entries of the result data,
+    such that at no point the whole list of strings is held in memory.
+
+    Args:
+        shots: the expected number of shots per experiment, which is the size of
+            the preallocated arrays. They grow if there are more.
+        dtype: the integer type of the arrays.
+        memmap_dir: the folder in which the arrays are kept as `.npy` memmaps.
+            `None` keeps them in memory. The files are removed once their
+            arrays are garbage collected.
+    """
+
+    def __init__(
+        self,
+        shots: Optional[int] = None,
+        dtype: type = np.int64,
+        memmap_dir: Optional[str] = None,
+    ):
+        self.shots = shots
+        self.dtype = np.dtype(dtype)
+        self.memmap_dir = memmap_dir
+        self._buffer = b""
+        self._skeleton: List[bytes] = []
+        self._arrays: List[np.ndarray] = []
+        self._in_memory = False
+        self._array = None
+        self._rows = 0
+
+    def feed(self, chunk: bytes):
+        """
+        Process the next chunk of the document.
+
+        Args:
+            chunk: the bytes of the chunk
+        """
+        self._buffer += chunk
+        while True:
+            if not self._in_memory:
+                match = _MEMORY_KEY.search(self._buffer)
+                if match is None:
+                    cut = max(len(self._buffer) - _KEY_TAIL, 0)
+                    self._skeleton.append(self._buffer[:cut])
+                    self._buffer = self._buffer[cut:]
+                    return
+                self._skeleton.append(self._buffer[: match.start()])
+                # the list is replaced by the index of its array.
+                self._skeleton.append(b'"memory_packed": %d' % len(self._arrays))
+                self._buffer = self._buffer[match.end() :]
+                self._in_memory = True
+                self._array = None
+                self._rows = 0
+                continue
+            end = self._buffer.find(b"]")
+            if end < 0:
+                # the shot strings contain no commas, so the last comma closes a shot.
+                cut = self._buffer.rfind(b",")
+                if cut >= 0:
+                    self._add_shots(self._buffer[:cut])
+                    self._buffer = self._buffer[cut + 1 :]
+                return
+            self._add_shots(self._buffer[:end])
+            self._buffer = self._buffer[end + 1 :]
+            self._finish_array()
+            self._in_memory = False
+
+    def _add_shots(self, segment: bytes):
+        """
+        Convert a block of complete shot strings and append them to the array.
+        """
+        shots = [
+            shot.strip().strip(b'"').decode("ascii") for shot in segment.split(b",")
+        ]
+        shots = [shot for shot in shots if shot]
+        if not shots:
+            return
+        values = parse_memory(shots, dtype=self.dtype)
+        if self._array is None:
+            self._array = self._allocate(
+                max(self.shots or 0, len(shots)), values.shape[1]
+            )
+        needed = self._rows + len(values)
+        if needed > self._array.shape[0]:
+            self._array = self._grow(max(needed, 2 * self._array.shape[0]))
+        self._array[self._rows : needed] = values
+        self._rows = needed
+
+    def _allocate(self, rows: int, columns: int) -> np.ndarray:
+        """
+        A new array for the shots, either in memory or as memmap on disk.
+        """
+        if self.memmap_dir is None:
+            return np.empty((rows, columns), dtype=self.dtype)
+        handle, path = tempfile.mkstemp(dir=self.memmap_dir, suffix=".npy")
+        os.close(handle)
+        try:
+            array = np.lib.format.open_memmap(
+                path, mode="w+", dtype=self.dtype, shape=(rows, columns)
+            )
+        except BaseException:
+            _remove(path)
+            raise
+        # the views of the array keep it alive, so the file lives as long as they do.
+        weakref.finalize(array, _remove, path)
+        return array
+
+    def _grow(self, rows: int) -> np.ndarray:
+        """
+        Copy the shots into a larger array, if there are more than expected.
+        """
+        array = self._allocate(rows, self._array.shape[1])
+        array[: self._rows] = self._array[: self._rows]
+        return array
+
+    def _finish_array(self):
+        """
+        Trim the array of the completed `memory` list to its shots.
+        """
+        if self._array is None:
+            array = np.zeros((0, 0), dtype=self.dtype)
+        else:
+            array = self._array[: self._rows]
+        self._arrays.append(array)
+        self._array = None
+
+    def close(self) -> dict:
+        """
+        Decode the rest of the document and return the result dictionary.
+        """
+        if self._in_memory:
+            raise ValueError("The result ended within a memory list.")
+        results_dict = json.loads(b"".join(self._skeleton) + self._buffer)
+        for result in results_dict.get("results", []):
+            data = result.get("data", {})
+            if isinstance(data.get("memory_packed"), int):
+                array = self._arrays[data["memory_packed"]]
+                data["memory_packed"] = {
+                    "dtype": array.dtype.str,
+                    "shape": list(array.shape),
+                    "data": array,
+                }
+        return results_dict
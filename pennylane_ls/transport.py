@@ -0,0 +1,209 @@
+"""
+Define the resilient transport of the requests to the Django API, i.e. the
+retries of failed requests and the circuit breaker for servers that are down.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from pennylane import DeviceError
+
+from .session_pool import SessionPool
+from .waiting import WaitStrategy, ExponentialBackoff
+
+
+class CircuitOpenError(DeviceError):
+    """
+    The server failed too often in a row, so requests fail fast for a while.
+    """
+
+
+class CircuitBreaker:
+    """
+    Count the consecutive failures of a server. Beyond `failure_threshold` the
+    circuit opens and all requests are refused until `reset_timeout` has passed.
+    Then a single trial request decides whether the circuit closes again.
+
+    Args:
+        failure_threshold: the number of consecutive failures that open the circuit.
+        reset_timeout: the time in seconds after which a trial request is allowed.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """
+        Raise a `CircuitOpenError` if the circuit is open.
+        """
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(
+                        f"The server failed {self.failures} times in a row."
+                    )
+                self.state = "half-open"
+                return
+            # only a single trial request passes in the half-open state.
+            raise CircuitOpenError("The server is being tested by another request.")
+
+    def record_success(self):
+        """
+        Close the circuit after a successful request.
+        """
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> bool:
+        """
+        Count a failed request and return whether it opened the circuit.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                opened = self.state != "open"
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                return opened
+            return False
+
+
+class Transport:
+    """
+    Send the requests of the devices with retries and a circuit breaker per
+    scope, i.e. per API of a device or per host. Idempotent requests are
+    repeated with the pauses of the `backoff` after connection errors, timeouts
+    and the `retry_statuses`. Other requests are never repeated, because the
+    server might have processed them already.
+
+    Args:
+        retries: the maximal number of repetitions of a request.
+        backoff: the pauses before the repetitions.
+        retry_statuses: the HTTP status codes that are worth a repetition.
+        failure_threshold: the number of consecutive failures that open the circuit.
+        reset_timeout: the time in seconds for which an open circuit refuses requests.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff: Optional[WaitStrategy] = None,
+        retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504),
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+    ):
+        self.retries = retries
+        if backoff is None:
+            backoff = ExponentialBackoff(initial=0.1, max_delay=2)
+        self.backoff = backoff
+        self.retry_statuses = retry_statuses
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.fast_failures = 0
+        self.circuit_opens = 0
+
+    def breaker(self, scope: str) -> CircuitBreaker:
+        """
+        The circuit breaker of the scope.
+
+        Args:
+            scope: the url prefix of the API or any url on the host
+        """
+        with self._lock:
+            if scope not in self._breakers:
+                self._breakers[scope] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return self._breakers[scope]
+
+    def _failed(self, breaker: CircuitBreaker):
+        with self._lock:
+            self.failures += 1
+            if breaker.record_failure():
+                self.circuit_opens += 1
+
+    def request(
+        self,
+        session_pool: SessionPool,
+        method: str,
+        url: str,
+        idempotent: bool = True,
+        scope: str = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request through the session pool.
+
+        Args:
+            session_pool: the pool of the keep-alive sessions
+            method: the HTTP method, e.g. "GET" or "POST"
+            url: the url of the request
+            idempotent: whether the request may be repeated safely.
+            scope: the requests that share a circuit breaker, e.g. the url prefix
+                of a device. By default it is the host of the url.
+            kwargs: further arguments that are passed on to `SessionPool.request`
+        """
+        breaker = self.breaker(SessionPool.host(url) if scope is None else scope)
+        delays = self.backoff.delays()
+        attempts = self.retries + 1 if idempotent else 1
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(next(delays))
+                with self._lock:
+                    self.retried += 1
+            try:
+                breaker.before_request()
+            except CircuitOpenError:
+                with self._lock:
+                    self.fast_failures += 1
+                raise
+            with self._lock:
+                self.requests += 1
+            try:
+                response = session_pool.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._failed(breaker)
+                if attempt == attempts - 1:
+                    raise
+                continue
+            except BaseException:
+                # any other error ends the trial of a half-open circuit as well.
+                self._failed(breaker)
+                raise
+            if response.status_code not in self.retry_statuses:
+                breaker.record_success()
+                return response
+            self._failed(breaker)
+            if attempt < attempts - 1:
+                # the dropped answer releases its connection, also when streamed.
+                response.close()
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """
+        The counters for the sent requests, the repetitions, the failures, the
+        requests that were refused by an open circuit and the opened circuits.
+        """
+        return {
+            "requests": self.requests,
+            "retries": self.retried,
+            "failures": self.failures,
+            "fast_failures": self.fast_failures,
+            "circuit_opens": self.circuit_opens,
+        }
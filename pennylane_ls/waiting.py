@@ -0,0 +1,104 @@
+"""
+Define the strategies with which the devices wait for their jobs on the server.
+"""
+
+import random
+from typing import Iterator, Optional
+
+# the time in seconds that we wait for a job, unless told otherwise
+DEFAULT_DEADLINE = 3600
+
+
+class WaitStrategy:
+    """
+    The base class for all waiting strategies. A strategy defines the pauses
+    between two status requests and the overall time that we are willing to wait.
+
+    Args:
+        deadline: the maximal time in seconds that we wait for a job, one hour by
+            default. `None` waits forever.
+    """
+
+    # the time in seconds for which the server may hold a status request
+    long_poll: Optional[float] = None
+
+    def __init__(self, deadline: Optional[float] = DEFAULT_DEADLINE):
+        self.deadline = deadline
+
+    def delays(self) -> Iterator[float]:
+        """
+        The pauses in seconds before each status request.
+        """
+        raise NotImplementedError()
+
+
+class FixedInterval(WaitStrategy):
+    """
+    Check the status in fixed intervals.
+
+    Args:
+        interval: the pause between two status requests in seconds.
+        deadline: the maximal time in seconds that we wait for a job.
+    """
+
+    def __init__(
+        self, interval: float = 2, deadline: Optional[float] = DEFAULT_DEADLINE
+    ):
+        super().__init__(deadline=deadline)
+        self.interval = interval
+
+    def delays(self):
+        while True:
+            yield self.interval
+
+
+class ExponentialBackoff(WaitStrategy):
+    """
+    Start with a short poll and increase the pauses exponentially up to a cap,
+    such that fast jobs return quickly and long queues cost few requests.
+
+    Args:
+        initial: the pause before the first status request in seconds.
+        factor: the factor by which the pause grows after each request.
+        max_delay: the cap of the pauses in seconds.
+        jitter: the relative random spread of each pause, which avoids that many
+            waiting devices poll the server in lockstep.
+        deadline: the maximal time in seconds that we wait for a job.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        initial: float = 0.05,
+        factor: float = 2,
+        max_delay: float = 5,
+        jitter: float = 0.1,
+        deadline: Optional[float] = DEFAULT_DEADLINE,
+    ):
+        super().__init__(deadline=deadline)
+        self.initial = initial
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delays(self):
+        delay = self.initial
+        while True:
+            yield delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            delay = min(delay * self.factor, self.max_delay)
+
+
+class LongPoll(ExponentialBackoff):
+    """
+    Ask the server to hold each status request until the status of the job
+    changes. Servers that do not support this answer right away, in which case
+    the strategy falls back to the exponential backoff.
+
+    Args:
+        hold: the time in seconds for which the server may hold a status request.
+        kwargs: the arguments of `ExponentialBackoff`.
+    """
+
+    def __init__(self, hold: float = 30, **kwargs):
+        super().__init__(**kwargs)
+        self.long_poll = hold
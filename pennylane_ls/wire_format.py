@@ -0,0 +1,181 @@
+"""
+Define the negotiated wire format of the requests to the Django API, i.e. the
+compression of the bodies and the compact binary encoding with msgpack. Both
+require the optional packages `zstandard` and `msgpack`, e.g. through
+`pip install pennylane-ls[wire]`, and fall back to plain JSON without them.
+"""
+
+import gzip
+import json
+import threading
+import time
+from typing import Dict, Set
+from urllib.parse import urlencode
+
+import requests
+
+from .session_pool import SessionPool
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# zstd is only offered if the bodies can be decompressed
+HAS_ZSTD = zstandard is not None
+
+try:
+    # urllib3 decompresses zstd bodies itself from version 2 on
+    from urllib3.response import HAS_ZSTD as URLLIB3_ZSTD
+except ImportError:  # pragma: no cover
+    URLLIB3_ZSTD = False
+
+MSGPACK = "application/msgpack"
+FORM = "application/x-www-form-urlencoded"
+
+
+class WireFormat:
+    """
+    Negotiate the encoding of the requests and answers with the server. The
+    answers are requested as msgpack and as compressed bodies, while the server
+    is free to answer in plain JSON. The request bodies are only compressed or
+    binary if the server advertised it in the `Accept-Encoding` and `Accept-Post`
+    headers of an earlier answer. All bytes on the wire and the decoding time
+    are counted.
+
+    Args:
+        binary: whether the msgpack encoding is offered and used.
+        compression: the preferred compression of request bodies, "zstd" or "gzip".
+        min_size: the size in bytes from which on request bodies are compressed.
+    """
+
+    def __init__(
+        self, binary: bool = True, compression: str = "zstd", min_size: int = 1024
+    ):
+        self.binary = binary and msgpack is not None
+        self.compression = compression
+        self.min_size = min_size
+        self._encodings: Dict[str, Set[str]] = {}
+        self._binary_hosts: Set[str] = set()
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+        self.decode_time = 0.0
+
+    def request_headers(self) -> Dict[str, str]:
+        """
+        The headers that offer the compact answers to the server.
+        """
+        encodings = ["gzip", "deflate"]
+        if HAS_ZSTD:
+            encodings.insert(0, "zstd")
+        accept = "application/json"
+        if self.binary:
+            accept = f"{MSGPACK}, application/json;q=0.9"
+        return {"Accept": accept, "Accept-Encoding": ", ".join(encodings)}
+
+    def _request_encoding(self, host: str) -> str:
+        """
+        The compression of request bodies that the server accepts, if any.
+        """
+        accepted = self._encodings.get(host, set())
+        for encoding in (self.compression, "zstd", "gzip"):
+            if encoding in accepted and (encoding != "zstd" or HAS_ZSTD):
+                return encoding
+        return None
+
+    # pylint: disable=R0913
+    def encode(
+        self, method: str, url: str, payload: dict, fields: dict, headers: dict
+    ) -> dict:
+        """
+        The arguments of the request that carries the payload and the fields.
+
+        Args:
+            method: "GET" sends the data as url parameters and "POST" in the body.
+            url: the url of the request
+            payload: the dictionary which is send to the endpoint
+            fields: further form fields like the credentials
+            headers: further headers like the authorization
+        """
+        headers = dict(headers, **self.request_headers())
+        fields = {key: value for key, value in fields.items() if value is not None}
+        if method != "POST":
+            params = dict(fields, json=json.dumps(payload))
+            self._count("bytes_sent", len(urlencode(params)))
+            return {"params": params, "headers": headers}
+
+        host = SessionPool.host(url)
+        if self.binary and host in self._binary_hosts:
+            body = msgpack.packb(dict(fields, payload=payload))
+            headers["Content-Type"] = MSGPACK
+        else:
+            body = urlencode(dict(fields, json=json.dumps(payload))).encode()
+            headers["Content-Type"] = FORM
+        encoding = self._request_encoding(host)
+        if encoding is not None and len(body) >= self.min_size:
+            if encoding == "zstd":
+                body = zstandard.ZstdCompressor().compress(body)
+            else:
+                body = gzip.compress(body)
+            headers["Content-Encoding"] = encoding
+        self._count("bytes_sent", len(body))
+        return {"data": body, "headers": headers}
+
+    def decode(self, response: requests.Response) -> dict:
+        """
+        Decode the answer of the server and learn which request formats it accepts.
+
+        Args:
+            response: the answer of the server
+        """
+        self._learn(SessionPool.host(response.url), response.headers)
+        content = response.content
+        wire_size = int(response.headers.get("Content-Length", len(content)))
+        start = time.perf_counter()
+        if response.headers.get("Content-Encoding") == "zstd" and not URLLIB3_ZSTD:
+            # urllib3 leaves the bodies alone that it cannot decompress.
+            content = zstandard.ZstdDecompressor().decompressobj().decompress(content)
+        if response.headers.get("Content-Type", "").startswith(MSGPACK):
+            answer = msgpack.unpackb(content)
+        else:
+            answer = json.loads(content)
+        with self._lock:
+            self.decode_time += time.perf_counter() - start
+            self.bytes_received += wire_size
+            self.bytes_decoded += len(content)
+        return answer
+
+    def _learn(self, host: str, headers):
+        """
+        Remember the request encodings that the server advertises.
+        """
+        accept_encoding = headers.get("Accept-Encoding")
+        if accept_encoding is not None:
+            self._encodings[host] = {
+                token.split(";")[0].strip() for token in accept_encoding.split(",")
+            }
+        if self.binary and MSGPACK in headers.get("Accept-Post", ""):
+            self._binary_hosts.add(host)
+
+    def _count(self, name: str, size: int):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + size)
+
+    def stats(self) -> dict:
+        """
+        The bytes that were sent and received on the wire, the bytes of the
+        decompressed answers and the time in seconds that the decoding took.
+        """
+        return {
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "bytes_decoded": self.bytes_decoded,
+            "decode_time": self.decode_time,
+        }
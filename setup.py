@@ -4,6 +4,9 @@ pennylane_devices_list = [
     "synqs.sqs = pennylane_ls:SingleQuditDevice",
     "synqs.mqs = pennylane_ls:MultiQuditDevice",
     "synqs.fs = pennylane_ls:FermionDevice",
+    "synqs.sqs.local = pennylane_ls:LocalSingleQuditDevice",
+    "synqs.mqs.local = pennylane_ls:LocalMultiQuditDevice",
+    "synqs.fs.local = pennylane_ls:LocalFermionDevice",
 ]
 
 setup(
@@ -19,7 +22,9 @@ setup(
     install_requires=[
         "pennylane >= 0.16",
         "numpy",
+        "requests",
     ],
+    extras_require={"async": ["aiohttp"], "wire": ["msgpack", "zstandard"]},
     entry_points={
         "pennylane.plugins": pennylane_devices_list
     },  # for registering the pennylane device(s)
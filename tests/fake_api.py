@@ -0,0 +1,236 @@
+"""
+A minimal local imitation of the Django API of `labscript-qc`, such that the
+communication of the devices can be tested without the remote server.
+"""
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+try:
+    import msgpack
+    import zstandard
+except ImportError:
+    msgpack = zstandard = None
+
+
+class FakeDjangoAPI:
+    """
+    A threaded HTTP server that answers `post_job`, `get_job_status` and
+    `get_job_result` requests.
+
+    Args:
+        memory: a function that returns the list of measured shots for a given
+            experiment dictionary.
+        polls_till_done: the number of status requests that answer "RUNNING"
+            before a job is reported as "DONE".
+        bulk_status: whether a status request may carry many job ids.
+        tokens: whether the credentials may be exchanged for a token.
+        wire: whether compressed and msgpack requests and answers are understood.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self, memory, polls_till_done=0, bulk_status=True, tokens=False, wire=False
+    ):
+        self.memory = memory
+        self.polls_till_done = polls_till_done
+        self.bulk_status = bulk_status
+        self.tokens = tokens
+        self.wire = wire
+        self.body_formats = []
+        self.valid_tokens = set()
+        self.failing = {}
+        self._submissions = {}
+        self.jobs = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def url(self):
+        """
+        The url prefix under which the API is reachable.
+        """
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/api/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def answer(self, endpoint, fields, authorization=None):
+        """
+        Create the json answer for the endpoint and its HTTP status code.
+        """
+        self.requests.append((endpoint, fields))
+        if self.tokens and endpoint == "get_token":
+            if self.failing.get(endpoint):
+                self.failing[endpoint] -= 1
+                return {"detail": "Bad gateway."}, 502
+            token = f"token-{len(self.requests)}"
+            self.valid_tokens.add(token)
+            return {"token": token, "expires_in": 3600}, 200
+        if authorization is not None:
+            if authorization.split()[-1] not in self.valid_tokens:
+                return {"detail": "Invalid token."}, 401
+        elif endpoint not in ("post_job", "get_job_status", "get_job_result"):
+            return {"detail": "Not found."}, 404
+        answer = self.answer_job(endpoint, fields)
+        if self.failing.get(endpoint):
+            # the request was handled, but the answer is lost on the way back.
+            self.failing[endpoint] -= 1
+            return {"detail": "Bad gateway."}, 502
+        return answer, 200
+
+    def fail(self, endpoint, times=1):
+        """
+        Answer the next requests to the endpoint with a 502 error.
+        """
+        self.failing[endpoint] = times
+
+    def answer_job(self, endpoint, fields):
+        """
+        Create the json answer for the endpoints of the jobs.
+        """
+        payload = json.loads(fields["json"])
+        if endpoint == "post_job":
+            key = fields.get("idempotency_key")
+            job_id = self._submissions.get(key)
+            if job_id is None:
+                job_id = str(len(self.jobs))
+                self.jobs[job_id] = {"payload": payload, "polls": 0}
+                if key is not None:
+                    self._submissions[key] = job_id
+            return {"job_id": job_id, "status": "INITIALIZING", "detail": "Got job"}
+        if endpoint == "get_job_status" and "job_ids" in payload:
+            if not self.bulk_status:
+                return {"status": "ERROR", "detail": "No job_id given."}
+            statuses = {job_id: self.status(job_id) for job_id in payload["job_ids"]}
+            return {"statuses": statuses}
+        if endpoint == "get_job_status":
+            return self.status(payload["job_id"])
+        job = self.jobs[payload["job_id"]]
+        results = [
+            {"header": {"name": name}, "data": {"memory": self.memory(experiment)}}
+            for name, experiment in job["payload"].items()
+        ]
+        return {"job_id": payload["job_id"], "status": "finished", "results": results}
+
+    def status(self, job_id):
+        """
+        Count the status request of the job and answer it.
+        """
+        job = self.jobs[job_id]
+        job["polls"] += 1
+        status = "DONE" if job["polls"] > self.polls_till_done else "RUNNING"
+        return {"job_id": job_id, "status": status, "detail": ""}
+
+    def decode_request(self, headers, body):
+        """
+        Decode the form fields of a request body.
+        """
+        encoding = headers.get("Content-Encoding")
+        self.body_formats.append((headers.get("Content-Type"), encoding, len(body)))
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "zstd":
+            body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+        if headers.get("Content-Type") == "application/msgpack":
+            fields = msgpack.unpackb(body)
+            fields["json"] = json.dumps(fields.pop("payload"))
+            return fields
+        return {key: values[0] for key, values in parse_qs(body.decode()).items()}
+
+    def encode_answer(self, headers, answer):
+        """
+        Encode the answer in the best format that the request accepts and return
+        the body together with its headers.
+        """
+        if not self.wire:
+            return json.dumps(answer).encode(), {"Content-Type": "application/json"}
+        answer_headers = {
+            "Accept-Encoding": "zstd, gzip",
+            "Accept-Post": "application/msgpack",
+        }
+        if "application/msgpack" in headers.get("Accept", ""):
+            for result in answer.get("results", []):
+                memory = result["data"].pop("memory")
+                shots = np.array([shot.split() for shot in memory], dtype=np.uint8)
+                result["data"]["memory_packed"] = {
+                    "dtype": shots.dtype.str,
+                    "shape": list(shots.shape),
+                    "data": shots.tobytes(),
+                }
+            body = msgpack.packb(answer)
+            answer_headers["Content-Type"] = "application/msgpack"
+        else:
+            body = json.dumps(answer).encode()
+            answer_headers["Content-Type"] = "application/json"
+        accept_encoding = headers.get("Accept-Encoding", "")
+        if "zstd" in accept_encoding:
+            body = zstandard.ZstdCompressor().compress(body)
+            answer_headers["Content-Encoding"] = "zstd"
+        elif "gzip" in accept_encoding:
+            body = gzip.compress(body)
+            answer_headers["Content-Encoding"] = "gzip"
+        return body, answer_headers
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Route the requests to the API.
+            """
+
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, fields):
+                endpoint = urlsplit(self.path).path.strip("/").split("/")[-1]
+                with api._lock:
+                    answer, code = api.answer(
+                        endpoint, fields, self.headers.get("Authorization")
+                    )
+                    body, headers = api.encode_answer(self.headers, answer)
+                self.send_response(code)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            # pylint: disable=C0103
+            def do_GET(self):
+                """
+                Answer a GET request.
+                """
+                fields = parse_qs(urlsplit(self.path).query)
+                self._respond({key: values[0] for key, values in fields.items()})
+
+            # pylint: disable=C0103
+            def do_POST(self):
+                """
+                Answer a POST request.
+                """
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                with api._lock:
+                    fields = api.decode_request(self.headers, body)
+                self._respond(fields)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,127 @@
+"""
+Tests for the authentication with session tokens.
+"""
+
+import unittest
+from unittest import mock
+
+import requests
+
+import pennylane as qml
+from pennylane import DeviceError
+from fake_api import FakeDjangoAPI
+
+from pennylane_ls import single_qudit_ops
+from pennylane_ls.auth import TokenAuth
+
+
+def full_load(experiment):
+    """
+    Every shot finds all atoms in the upper state.
+    """
+    atoms = experiment["instructions"][0][2][0]
+    return [str(atoms)] * experiment["shots"]
+
+
+def token_requests(api):
+    """
+    The number of requests that exchanged the credentials for a token.
+    """
+    return sum(endpoint == "get_token" for endpoint, _ in api.requests)
+
+
+class TestTokenAuth(unittest.TestCase):
+    """
+    The test case for the session tokens.
+    """
+
+    def make_circuit(self, api, token_auth):
+        """
+        A circuit on a device with the token cache, which loads some atoms.
+        """
+        test_device = qml.device(
+            "synqs.sqs",
+            shots=5,
+            url=api.url,
+            username="user",
+            password="secret",
+            token_auth=token_auth,
+        )
+
+        @qml.qnode(test_device)
+        def quantum_circuit(atoms):
+            single_qudit_ops.Load(atoms, wires=0)
+            return qml.expval(single_qudit_ops.ZObs(0))
+
+        return quantum_circuit
+
+    def test_credentials_sent_once(self):
+        """
+        The credentials are exchanged once and all later requests carry the token.
+        """
+        token_auth = TokenAuth()
+        with FakeDjangoAPI(full_load, tokens=True) as api:
+            quantum_circuit = self.make_circuit(api, token_auth)
+            for atoms in range(3):
+                self.assertEqual(quantum_circuit(atoms), atoms)
+            self.assertEqual(token_requests(api), 1)
+            job_requests = [
+                fields for endpoint, fields in api.requests if endpoint != "get_token"
+            ]
+            self.assertEqual(len(job_requests), 9)
+            self.assertTrue(all("password" not in fields for fields in job_requests))
+
+    def test_rejected_token_is_refreshed(self):
+        """
+        A token that the server dropped is replaced and the request is repeated.
+        """
+        token_auth = TokenAuth()
+        with FakeDjangoAPI(full_load, tokens=True) as api:
+            quantum_circuit = self.make_circuit(api, token_auth)
+            self.assertEqual(quantum_circuit(2), 2)
+            api.valid_tokens.clear()
+            with mock.patch.object(requests.Response, "close", autospec=True) as close:
+                self.assertEqual(quantum_circuit(3), 3)
+            # the rejected answer is closed before the request is repeated.
+            closed = [call[0][0].status_code for call in close.call_args_list]
+            self.assertEqual(len([code for code in closed if code in (401, 403)]), 1)
+            self.assertEqual(token_requests(api), 2)
+            self.assertEqual(token_auth.stats(), {"exchanges": 2, "refreshes": 1})
+
+    def test_server_without_tokens(self):
+        """
+        Servers without the token endpoint keep receiving the credentials.
+        """
+        token_auth = TokenAuth()
+        with FakeDjangoAPI(full_load) as api:
+            quantum_circuit = self.make_circuit(api, token_auth)
+            for atoms in range(2):
+                self.assertEqual(quantum_circuit(atoms), atoms)
+            self.assertEqual(token_requests(api), 1)
+            _, fields = api.requests[-1]
+            self.assertEqual(fields["password"], "secret")
+
+    def test_failed_exchange(self):
+        """
+        Failed exchanges are retried or raised, but never disable the tokens.
+        """
+        token_auth = TokenAuth()
+        with FakeDjangoAPI(full_load, tokens=True) as api:
+            quantum_circuit = self.make_circuit(api, token_auth)
+            api.fail("get_token", times=1)
+            self.assertEqual(quantum_circuit(2), 2)
+            self.assertEqual(token_requests(api), 2)
+
+            token_auth = TokenAuth()
+            quantum_circuit = self.make_circuit(api, token_auth)
+            api.fail("get_token", times=10)
+            with self.assertRaises(DeviceError):
+                quantum_circuit(3)
+            api.failing.clear()
+            self.assertEqual(quantum_circuit(3), 3)
+            _, fields = api.requests[-1]
+            self.assertNotIn("password", fields)
+
+
+if __name__ == "__main__":
+    unittest.main()
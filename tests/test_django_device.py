@@ -0,0 +1,481 @@
+"""
+Tests for the communication of the devices with the Django API.
+"""
+
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import pennylane as qml
+from fake_api import FakeDjangoAPI
+
+from pennylane_ls import single_qudit_ops, multi_qudit_ops, fermion_ops
+from pennylane_ls.django_device import DjangoDevice
+from pennylane_ls.gradients import param_shift
+from pennylane_ls.session_pool import SessionPool
+from pennylane_ls.waiting import ExponentialBackoff, FixedInterval, LongPoll
+
+
+def full_load(experiment):
+    """
+    Every shot finds all atoms in the upper state.
+    """
+    atoms = experiment["instructions"][0][2][0]
+    return [str(atoms)] * experiment["shots"]
+
+
+def fermion_memory(experiment):
+    """
+    Every shot finds the loaded wires occupied.
+    """
+    instructions = experiment["instructions"]
+    occupation = [0] * sum(name == "measure" for name, _, _ in instructions)
+    for name, wires, _ in instructions:
+        if name == "load":
+            occupation[wires[0]] = 1
+    return [" ".join(str(n) for n in occupation)] * experiment["shots"]
+
+
+class TestSessionPool(unittest.TestCase):
+    """
+    The test case for the keep-alive sessions.
+    """
+
+    def test_shared_pool(self):
+        """
+        All devices share the same pool unless they are given their own.
+        """
+        sqs_device = qml.device("synqs.sqs")
+        fs_device = qml.device("synqs.fs")
+        self.assertIs(sqs_device.session_pool, fs_device.session_pool)
+        self.assertIs(sqs_device.session_pool, DjangoDevice.shared_session_pool())
+
+        own_pool = SessionPool(pool_maxsize=2, timeout=5)
+        mqs_device = qml.device("synqs.mqs", session_pool=own_pool)
+        self.assertIs(mqs_device.session_pool, own_pool)
+
+    def test_connections_are_reused(self):
+        """
+        The status polls and the result fetch reuse the connection of the submission.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            pool = SessionPool()
+            test_device = qml.device(
+                "synqs.sqs", shots=5, url=api.url, session_pool=pool
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit():
+                single_qudit_ops.Load(20, wires=0)
+                return qml.expval(single_qudit_ops.ZObs(0))
+
+            self.assertEqual(quantum_circuit(), 20)
+            stats = pool.stats()
+            self.assertEqual(stats["connections_opened"], 1)
+            self.assertEqual(stats["connections_reused"], len(api.requests) - 1)
+            pool.close()
+
+
+class TestWaiting(unittest.TestCase):
+    """
+    The test case for the waiting strategies.
+    """
+
+    def test_backoff_delays(self):
+        """
+        The pauses grow exponentially up to the cap.
+        """
+        strategy = ExponentialBackoff(initial=0.1, factor=2, max_delay=0.5, jitter=0)
+        delays = strategy.delays()
+        self.assertEqual([next(delays) for _ in range(5)], [0.1, 0.2, 0.4, 0.5, 0.5])
+
+    def test_fast_job_returns_quickly(self):
+        """
+        A job that is done after a few polls does not wait for seconds.
+        """
+        with FakeDjangoAPI(full_load, polls_till_done=3) as api:
+            test_device = qml.device(
+                "synqs.sqs",
+                shots=5,
+                url=api.url,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit():
+                single_qudit_ops.Load(20, wires=0)
+                return qml.expval(single_qudit_ops.ZObs(0))
+
+            start = time.monotonic()
+            self.assertEqual(quantum_circuit(), 20)
+            self.assertLess(time.monotonic() - start, 1)
+
+    def test_deadline(self):
+        """
+        The waiting stops with an error once the deadline has passed.
+        """
+        with FakeDjangoAPI(full_load, polls_till_done=100) as api:
+            test_device = qml.device(
+                "synqs.fs",
+                url=api.url,
+                wait_strategy=FixedInterval(interval=0.01, deadline=0.05),
+            )
+            test_device.post_job()
+            with self.assertRaises(TimeoutError):
+                test_device.wait_till_done()
+
+    def test_long_poll(self):
+        """
+        The long poll strategy asks the server to hold the status request.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            test_device = qml.device(
+                "synqs.mqs", url=api.url, wait_strategy=LongPoll(hold=5)
+            )
+            test_device.post_job()
+            test_device.wait_till_done()
+            endpoint, fields = api.requests[-1]
+            self.assertEqual(endpoint, "get_job_status")
+            self.assertIn('"wait": 5', fields["json"])
+
+
+class TestAsyncClient(unittest.TestCase):
+    """
+    The test case for the asynchronous submission of jobs.
+    """
+
+    def test_many_jobs_in_flight(self):
+        """
+        Several circuits are submitted before any of them is awaited.
+        """
+        with FakeDjangoAPI(full_load, polls_till_done=2) as api:
+            test_device = qml.device("synqs.sqs", shots=4, url=api.url)
+            tapes = []
+            for atoms in range(1, 6):
+                with qml.tape.QuantumTape() as tape:
+                    single_qudit_ops.Load(atoms, wires=0)
+                    qml.expval(single_qudit_ops.LZ(0))
+                tapes.append(tape)
+
+            async def run_all():
+                async with test_device.async_client(
+                    wait_strategy=ExponentialBackoff(initial=0.01)
+                ) as client:
+                    jobs = [await test_device.submit(tape, client) for tape in tapes]
+                    return await asyncio.gather(*(job.result() for job in jobs))
+
+            results = asyncio.run(run_all())
+            self.assertEqual(len(api.jobs), 5)
+            lz_values = [atoms - (atoms + 1) / 2 for atoms in range(1, 6)]
+            np.testing.assert_allclose(np.ravel(results), lz_values)
+
+    def test_fermion_result(self):
+        """
+        The measured values are evaluated by the device that compiled the circuit.
+        """
+        with FakeDjangoAPI(fermion_memory) as api:
+            test_device = qml.device("synqs.fs", shots=3, url=api.url)
+            with qml.tape.QuantumTape() as tape:
+                fermion_ops.Load(wires=0)
+                fermion_ops.Load(wires=3)
+                qml.expval(fermion_ops.ParticleNumber([0, 1, 2, 3]))
+
+            async def run():
+                async with test_device.async_client() as client:
+                    job = await test_device.submit(tape, client)
+                    return await job.result()
+
+            result = asyncio.run(run())
+            self.assertListEqual(list(np.ravel(result)), [1.0, 0.0, 0.0, 1.0])
+
+
+class TestMeasurement(unittest.TestCase):
+    """
+    The test case for the compilation and evaluation of the measurements.
+    """
+
+    def test_measured_columns(self):
+        """
+        Each observable of the multi qudit device reads the column of its wire.
+        """
+        with FakeDjangoAPI(lambda experiment: ["3 7"] * experiment["shots"]) as api:
+            test_device = qml.device(
+                "synqs.mqs",
+                wires=2,
+                shots=2,
+                url=api.url,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit():
+                multi_qudit_ops.Load(3, wires=0)
+                multi_qudit_ops.Load(7, wires=1)
+                return qml.expval(multi_qudit_ops.ZObs(0)), qml.expval(
+                    multi_qudit_ops.ZObs(1)
+                )
+
+            np.testing.assert_allclose(np.ravel(quantum_circuit()), [3, 7])
+            self.assertEqual(len(api.jobs), 1)
+
+
+class TestResultMemoisation(unittest.TestCase):
+    """
+    The test case for the reuse of the result within one circuit evaluation.
+    """
+
+    def test_single_fetch_and_parse(self):
+        """
+        Several observables of one circuit are derived from one parsed result.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            test_device = qml.device(
+                "synqs.sqs",
+                shots=4,
+                url=api.url,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+
+            with qml.tape.QuantumTape() as tape:
+                single_qudit_ops.Load(6, wires=0)
+                qml.expval(single_qudit_ops.LZ(0))
+                qml.var(single_qudit_ops.LZ2(0))
+                qml.expval(single_qudit_ops.ZObs(0))
+
+            with mock.patch.object(
+                DjangoDevice, "parse_memory", wraps=DjangoDevice.parse_memory
+            ) as parse_memory:
+                results = test_device.batch_execute([tape])[0]
+            np.testing.assert_allclose(np.ravel(results), [2.5, 0, 6])
+            self.assertEqual(parse_memory.call_count, 1)
+            endpoints = [endpoint for endpoint, _ in api.requests]
+            self.assertEqual(endpoints.count("get_job_result"), 1)
+            self.assertEqual(endpoints.count("get_job_status"), 1)
+
+
+class TestCountsMode(unittest.TestCase):
+    """
+    The test case for the observables that are derived from the histograms.
+    """
+
+    @staticmethod
+    def random_memory(experiment):
+        """
+        Random shots with up to four atoms.
+        """
+        rng = np.random.default_rng(len(experiment["instructions"]))
+        return [str(value) for value in rng.integers(0, 5, size=experiment["shots"])]
+
+    def test_single_qudit_moments(self):
+        """
+        The counts give the same moments as the shots, which are not kept.
+        """
+        with FakeDjangoAPI(self.random_memory) as api:
+            results = []
+            for counts_mode in (False, True):
+                test_device = qml.device(
+                    "synqs.sqs",
+                    shots=200,
+                    url=api.url,
+                    counts_mode=counts_mode,
+                    wait_strategy=ExponentialBackoff(initial=0.01),
+                )
+                with qml.tape.QuantumTape() as tape:
+                    single_qudit_ops.Load(4, wires=0)
+                    qml.expval(single_qudit_ops.LZ(0))
+                    qml.var(single_qudit_ops.LZ2(0))
+                    qml.expval(single_qudit_ops.ZObs(0))
+                    qml.var(single_qudit_ops.ZObs(0))
+                results.append(np.ravel(test_device.batch_execute([tape])[0]))
+                self.assertEqual(test_device.wire_counts().sum(), 200)
+            self.assertIsNone(test_device._job_samples)
+            np.testing.assert_allclose(results[1], results[0])
+
+    def test_multi_qudit_counts(self):
+        """
+        The multi qudit means follow from the per-wire counts and the joint
+        counts agree with the shots.
+        """
+        with FakeDjangoAPI(lambda experiment: ["3 1", "1 1", "3 0"]) as api:
+            test_device = qml.device(
+                "synqs.mqs",
+                wires=2,
+                shots=3,
+                url=api.url,
+                counts_mode=True,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit():
+                multi_qudit_ops.Load(3, wires=0)
+                multi_qudit_ops.Load(1, wires=1)
+                return qml.expval(multi_qudit_ops.ZObs(0)), qml.expval(
+                    multi_qudit_ops.ZObs(1)
+                )
+
+            np.testing.assert_allclose(np.ravel(quantum_circuit()), [7 / 3, 2 / 3])
+            np.testing.assert_array_equal(
+                test_device.wire_counts(), [[0, 1, 0, 2], [1, 2, 0, 0]]
+            )
+            joint = test_device.joint_counts([0, 1])
+            self.assertEqual(joint.shape, (4, 4))
+            self.assertEqual((joint[3, 1], joint[1, 1], joint[3, 0]), (1, 1, 1))
+            self.assertEqual(joint.sum(), 3)
+
+
+class TestBatchExecution(unittest.TestCase):
+    """
+    The test case for the submission of many circuits in a single job.
+    """
+
+    def test_parameter_sweep(self):
+        """
+        A sweep is submitted as the experiments of a single job.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            test_device = qml.device(
+                "synqs.sqs",
+                shots=3,
+                url=api.url,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+            tapes = []
+            for atoms in range(1, 21):
+                with qml.tape.QuantumTape() as tape:
+                    single_qudit_ops.Load(atoms, wires=0)
+                    single_qudit_ops.RLX(0.1 * atoms, wires=0)
+                    qml.expval(single_qudit_ops.ZObs(0))
+                tapes.append(tape)
+
+            results = qml.execute(tapes, test_device, gradient_fn=None)
+            np.testing.assert_allclose(np.ravel(results), np.arange(1, 21))
+            self.assertEqual(len(api.jobs), 1)
+            self.assertEqual(len(api.jobs["0"]["payload"]), 20)
+            self.assertEqual(
+                [endpoint for endpoint, _ in api.requests].count("get_job_result"), 1
+            )
+
+    def test_fermion_batch(self):
+        """
+        Each circuit of the batch obtains the samples of its own experiment.
+        """
+        with FakeDjangoAPI(fermion_memory) as api:
+            test_device = qml.device(
+                "synqs.fs",
+                shots=2,
+                url=api.url,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+            tapes = []
+            for wire in range(4):
+                with qml.tape.QuantumTape() as tape:
+                    fermion_ops.Load(wires=wire)
+                    qml.expval(fermion_ops.ParticleNumber([0, 1, 2, 3]))
+                tapes.append(tape)
+
+            results = test_device.batch_execute(tapes)
+            np.testing.assert_allclose(np.squeeze(results), np.eye(4))
+            self.assertEqual(len(api.jobs), 1)
+
+    def test_gradient_batch(self):
+        """
+        The shifted circuits of a gradient are submitted as a single job, e.g. the
+        40 circuits of the shift rule of twenty atoms, while plain evaluations run
+        no shifted circuits.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            test_device = qml.device(
+                "synqs.sqs",
+                shots=3,
+                url=api.url,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+
+            @qml.qnode(test_device, diff_method=param_shift)
+            def quantum_circuit(theta):
+                single_qudit_ops.Load(20, wires=0)
+                single_qudit_ops.RLX(theta, wires=0)
+                return qml.expval(single_qudit_ops.ZObs(0))
+
+            self.assertEqual(quantum_circuit(qml.numpy.array(0.3)), 20)
+            self.assertEqual(len(api.jobs), 1)
+
+            gradient = qml.grad(quantum_circuit)(qml.numpy.array(0.3))
+            self.assertAlmostEqual(gradient, 0)
+            self.assertEqual(len(api.jobs), 3)
+            self.assertEqual(len(api.jobs["2"]["payload"]), 40)
+
+    def test_variance_gradient(self):
+        """
+        The QNodes of the remote devices differentiate variances by default.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            test_device = qml.device(
+                "synqs.sqs",
+                shots=3,
+                url=api.url,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit(theta):
+                single_qudit_ops.Load(20, wires=0)
+                single_qudit_ops.RLX(theta, wires=0)
+                return qml.var(single_qudit_ops.ZObs(0))
+
+            self.assertAlmostEqual(qml.grad(quantum_circuit)(qml.numpy.array(0.3)), 0)
+
+    def test_broadcast_shots(self):
+        """
+        A sweep evaluates the measured shots of each element in a single job.
+        """
+        with FakeDjangoAPI(fermion_memory) as api:
+            test_device = qml.device(
+                "synqs.fs",
+                wires=4,
+                shots=3,
+                url=api.url,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit(theta):
+                fermion_ops.Load(wires=0)
+                fermion_ops.Hop(theta, wires=[0, 1, 2, 3])
+                return qml.expval(fermion_ops.ParticleNumber([0, 1])), qml.var(
+                    fermion_ops.ParticleNumber([2, 3])
+                )
+
+            values = quantum_circuit(np.linspace(0, 1, 4))
+            np.testing.assert_allclose(values, [[[1, 0], [0, 0]]] * 4)
+            self.assertEqual(len(api.jobs), 1)
+
+    def test_parallel_jobs(self):
+        """
+        With a worker pool each circuit is a job of its own and the jobs wait
+        in parallel, while the results keep the order of the circuits.
+        """
+        with FakeDjangoAPI(full_load, polls_till_done=3) as api:
+            test_device = qml.device(
+                "synqs.sqs",
+                shots=3,
+                url=api.url,
+                wait_strategy=FixedInterval(interval=0.1),
+                max_workers=8,
+            )
+            tapes = []
+            for atoms in range(1, 9):
+                with qml.tape.QuantumTape() as tape:
+                    single_qudit_ops.Load(atoms, wires=0)
+                    qml.expval(single_qudit_ops.ZObs(0))
+                tapes.append(tape)
+
+            start = time.monotonic()
+            results = test_device.batch_execute(tapes)
+            self.assertLess(time.monotonic() - start, 1.6)
+            np.testing.assert_allclose(np.ravel(results), np.arange(1, 9))
+            self.assertEqual(len(api.jobs), 8)
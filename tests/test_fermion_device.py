@@ -4,8 +4,21 @@ Tests for the femrion device.
 import unittest
 import numpy as np
 import pennylane as qml
+from fake_api import FakeDjangoAPI
 
 from pennylane_ls import fermion_ops
+from pennylane_ls.parsing import pack_bits
+from pennylane_ls.waiting import ExponentialBackoff
+
+
+def random_occupations(experiment):
+    """
+    Random occupations of all measured wires, reproducible for every job.
+    """
+    num_wires = sum(inst[0] == "measure" for inst in experiment["instructions"])
+    rng = np.random.default_rng(7)
+    shots = rng.integers(0, 2, size=(experiment["shots"], num_wires))
+    return [" ".join(str(n) for n in shot) for shot in shots]
 
 
 class TestFermionDevice(unittest.TestCase):
@@ -155,3 +168,139 @@ class TestFermionDevice(unittest.TestCase):
 
         res = simple_hopping()
         self.assertListEqual(list(res), [0.0, 0.0, 0.0, 0.0])
+
+
+class TestPackedSamples(unittest.TestCase):
+    """
+    The packed samples give the same results as the dense samples.
+    """
+
+    def run_circuits(self, packed_samples):
+        """
+        Evaluate expectation values, variances, samples and probabilities.
+        """
+        with FakeDjangoAPI(random_occupations) as api:
+            test_device = qml.device(
+                "synqs.fs",
+                shots=500,
+                url=api.url,
+                packed_samples=packed_samples,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+            tapes = []
+            for measurement in [qml.expval, qml.var, qml.sample]:
+                with qml.tape.QuantumTape() as tape:
+                    fermion_ops.Load(wires=0)
+                    measurement(fermion_ops.ParticleNumber([0, 2, 5]))
+                tapes.append(tape)
+            with qml.tape.QuantumTape() as tape:
+                fermion_ops.Load(wires=0)
+                qml.var(fermion_ops.PauliZ(3))
+            tapes.append(tape)
+            with qml.tape.QuantumTape() as tape:
+                fermion_ops.Load(wires=0)
+                qml.probs(wires=[1, 4, 6])
+            tapes.append(tape)
+            results = [np.squeeze(res) for res in test_device.batch_execute(tapes)]
+            return results, test_device._samples
+
+    def test_packed_equals_dense(self):
+        """
+        All measurements agree and the packed samples use one byte per shot.
+        """
+        dense_results, dense_samples = self.run_circuits(False)
+        packed_results, packed_samples = self.run_circuits(True)
+        for dense, packed in zip(dense_results, packed_results):
+            np.testing.assert_allclose(packed, dense)
+        self.assertEqual(packed_samples.dtype, np.uint8)
+        self.assertEqual(packed_samples.shape, (500,))
+        self.assertEqual(dense_samples.shape, (500, 8))
+
+
+class TestWireLabels(unittest.TestCase):
+    """
+    The measured values of labelled wires are found by their position.
+    """
+
+    def test_dense_and_packed(self):
+        """
+        The dense and the packed samples select the same wires.
+        """
+        samples = np.array([[1, 0, 0, 1], [1, 0, 0, 1], [0, 1, 1, 0], [1, 1, 0, 0]])
+        results = []
+        for packed_samples in (False, True):
+            test_device = qml.device(
+                "synqs.fs", wires=["a", "b", "c", "d"], packed_samples=packed_samples
+            )
+            test_device._samples = pack_bits(samples) if packed_samples else samples
+            wires = qml.wires.Wires(["b", "d"])
+            results.append(
+                [
+                    test_device.expval("ParticleNumber", wires, []),
+                    test_device.var("PauliZ", wires, []),
+                ]
+            )
+        np.testing.assert_allclose(results[0], [[0.5, 0.5], [1.0, 1.0]])
+        np.testing.assert_allclose(results[1], results[0])
+
+
+class TestPackedWires(unittest.TestCase):
+    """
+    The packed samples hold up to 64 wires in one code.
+    """
+
+    def test_max_packed_wires(self):
+        """
+        Devices with more wires are rejected when they are created.
+        """
+        test_device = qml.device("synqs.fs.local", wires=64, packed_samples=True)
+        samples = np.ones((3, 64), dtype=np.uint8)
+        test_device._samples = pack_bits(samples)
+        self.assertEqual(test_device._samples.dtype, np.uint64)
+        self.assertEqual(
+            test_device.expval("ParticleNumber", qml.wires.Wires([63]), []), 1
+        )
+        with self.assertRaisesRegex(ValueError, "at most 64 wires"):
+            qml.device("synqs.fs.local", wires=65, packed_samples=True)
+        qml.device("synqs.fs.local", wires=65)
+
+
+class TestProbability(unittest.TestCase):
+    """
+    The test case for the vectorised probabilities.
+    """
+
+    def setUp(self):
+        self.test_device = qml.device("synqs.fs", wires=4)
+        self.test_device._samples = np.array(
+            [[1, 0, 0, 1], [1, 0, 0, 1], [0, 1, 1, 0], [1, 1, 0, 0]]
+        )
+
+    def test_dense(self):
+        """
+        The first wire is the most significant bit of the outcome.
+        """
+        probabilities = self.test_device.probability(wires=qml.wires.Wires([0, 1]))
+        self.assertEqual(list(probabilities.keys()), [(0, 0), (0, 1), (1, 0), (1, 1)])
+        self.assertListEqual(list(probabilities.values()), [0, 0.25, 0.5, 0.25])
+
+    def test_sparse(self):
+        """
+        The sparse mode only returns the observed outcomes.
+        """
+        probabilities = self.test_device.probability(sparse=True)
+        self.assertDictEqual(
+            dict(probabilities),
+            {(0, 1, 1, 0): 0.25, (1, 0, 0, 1): 0.5, (1, 1, 0, 0): 0.25},
+        )
+
+    def test_cached_marginals(self):
+        """
+        The samples are histogrammed once for all marginals.
+        """
+        first = self.test_device.marginal_counts(qml.wires.Wires([3, 0]))
+        self.assertListEqual(list(first), [1, 1, 0, 2])
+        self.test_device._samples = None
+        second = self.test_device.marginal_counts(qml.wires.Wires([3, 0]))
+        self.assertIs(first, second)
+        self.assertListEqual(list(self.test_device.marginal_counts([2])), [3, 1])
@@ -0,0 +1,160 @@
+"""
+Tests for the futures of the jobs in the non-blocking mode.
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import pennylane as qml
+from fake_api import FakeDjangoAPI
+
+from pennylane_ls import single_qudit_ops, fermion_ops
+from pennylane_ls.job_future import JobFuture, as_completed
+from pennylane_ls.waiting import FixedInterval
+
+
+def full_load(experiment):
+    """
+    Every shot finds all atoms in the upper state.
+    """
+    atoms = experiment["instructions"][0][2][0]
+    return [str(atoms)] * experiment["shots"]
+
+
+def load_circuit(atoms):
+    """
+    The tape of a circuit that loads the atoms and measures them.
+    """
+    with qml.tape.QuantumTape() as tape:
+        single_qudit_ops.Load(atoms, wires=0)
+        qml.expval(single_qudit_ops.ZObs(0))
+    return tape
+
+
+class TestJobFuture(unittest.TestCase):
+    """
+    The test case for the futures of the jobs.
+    """
+
+    def test_qnode_returns_future(self):
+        """
+        A non-blocking circuit hands out the future of its job, which gives the
+        measured values once the job is done.
+        """
+        with FakeDjangoAPI(full_load, polls_till_done=2) as api:
+            test_device = qml.device("synqs.sqs", shots=5, url=api.url, blocking=False)
+
+            @qml.qnode(test_device)
+            def quantum_circuit():
+                single_qudit_ops.Load(7, wires=0)
+                return qml.expval(single_qudit_ops.ZObs(0))
+
+            result = np.ravel(quantum_circuit())[0]
+            future = test_device.job_future()
+            self.assertIsInstance(future, JobFuture)
+            self.assertIs(result.item(), future)
+            self.assertFalse(future.done())
+            self.assertEqual(future.result(timeout=5), [7])
+            self.assertEqual(future.status(), "DONE")
+            # a finished future does not contact the server again
+            num_requests = len(api.requests)
+            self.assertEqual(future.result(), [7])
+            self.assertEqual(len(api.requests), num_requests)
+
+    def test_fermion_future(self):
+        """
+        The fermion device hands out futures for all its measurements.
+        """
+        with FakeDjangoAPI(lambda exp: ["1 0"] * exp["shots"]) as api:
+            test_device = qml.device(
+                "synqs.fs", wires=2, shots=5, url=api.url, blocking=False
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit():
+                fermion_ops.Load(wires=0)
+                return qml.expval(fermion_ops.ParticleNumber(0)), qml.var(
+                    fermion_ops.ParticleNumber(1)
+                )
+
+            results = np.ravel(quantum_circuit())
+            future = test_device.job_future()
+            self.assertIs(results[0].item(), future)
+            self.assertIs(results[1].item(), future)
+            self.assertEqual(future.result(timeout=5).tolist(), [1, 0])
+
+            @qml.qnode(test_device)
+            def probability_circuit():
+                fermion_ops.Load(wires=0)
+                return qml.probs(wires=[0, 1])
+
+            result = np.ravel(probability_circuit())[0]
+            future = test_device.probability()
+            self.assertIsInstance(future, JobFuture)
+            self.assertIs(result.item(), future)
+
+    def test_as_completed(self):
+        """
+        Many circuits are in flight at the same time and are harvested as their
+        jobs finish.
+        """
+        with FakeDjangoAPI(full_load, polls_till_done=1) as api:
+            test_device = qml.device(
+                "synqs.sqs",
+                shots=5,
+                url=api.url,
+                blocking=False,
+                wait_strategy=FixedInterval(0.01),
+            )
+            futures = [test_device.submit_circuit(load_circuit(n)) for n in range(6)]
+            self.assertEqual(len(api.jobs), 6)
+            results = sorted(
+                future.result()[0] for future in as_completed(futures, timeout=5)
+            )
+            self.assertEqual(results, list(range(6)))
+
+    def test_callbacks_and_errors(self):
+        """
+        The callbacks run once the job finished and failed jobs raise their error.
+        """
+        with FakeDjangoAPI(full_load, polls_till_done=1) as api:
+            test_device = qml.device(
+                "synqs.sqs", shots=5, url=api.url, wait_strategy=FixedInterval(0.01)
+            )
+            future = test_device.submit_circuit(load_circuit(3))
+            finished = []
+            future.add_done_callback(finished.append)
+            self.assertEqual(finished, [])
+            future.wait(timeout=5)
+            self.assertEqual(finished, [future])
+            future.add_done_callback(finished.append)
+            self.assertEqual(finished, [future, future])
+
+            failing = test_device.submit_circuit(load_circuit(3))
+            with mock.patch.object(
+                test_device, "check_job_status", side_effect=SyntaxError("bad job")
+            ):
+                self.assertTrue(failing.done())
+            self.assertEqual(failing.status(), "ERROR")
+            with self.assertRaises(SyntaxError):
+                failing.result()
+
+    def test_timeout(self):
+        """
+        Waiting for an unfinished job stops after the timeout.
+        """
+        with FakeDjangoAPI(full_load, polls_till_done=1000) as api:
+            test_device = qml.device(
+                "synqs.sqs", shots=5, url=api.url, wait_strategy=FixedInterval(0.01)
+            )
+            future = test_device.submit_circuit(load_circuit(3))
+            with self.assertRaises(TimeoutError):
+                future.result(timeout=0.1)
+            with self.assertRaises(TimeoutError):
+                list(as_completed([future], timeout=0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
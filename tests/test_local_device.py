@@ -0,0 +1,692 @@
+"""
+Tests for the devices that run on the local simulators.
+"""
+
+import unittest
+
+import numpy as np
+from scipy.linalg import expm
+from scipy.special import comb
+
+import pennylane as qml
+from pennylane import numpy as pnp
+
+from pennylane_ls import fermion_ops, multi_qudit_ops, single_qudit_ops
+from pennylane_ls.fermion_simulator import FermionSimulator
+from pennylane_ls.gradients import param_shift, shift_rule
+from pennylane_ls.parsing import parse_memory
+from pennylane_ls.local_simulator import (
+    MultiQuditSimulator,
+    SingleQuditSimulator,
+    apply_rlx,
+    spin_operators,
+    wigner_d_half_pi,
+)
+
+
+class TestLocalSingleQuditDevice(unittest.TestCase):
+    """
+    The test case for the local single qudit device.
+    """
+
+    def setUp(self):
+        self.test_device = qml.device("synqs.sqs.local", shots=2000, seed=7)
+
+    def test_load_gate(self):
+        """
+        A rotation by pi flips all loaded atoms, as on the remote simulator.
+        """
+
+        @qml.qnode(self.test_device)
+        def quantum_circuit():
+            single_qudit_ops.Load(50, wires=0)
+            single_qudit_ops.RLX(np.pi, wires=0)
+            return qml.expval(single_qudit_ops.ZObs(0))
+
+        self.assertEqual(quantum_circuit(), 50)
+
+    def test_rabi_oscillation(self):
+        """
+        The mean number of flipped atoms follows the Rabi oscillation.
+        """
+
+        @qml.qnode(self.test_device)
+        def quantum_circuit(theta):
+            single_qudit_ops.Load(20, wires=0)
+            single_qudit_ops.RLX(theta, wires=0)
+            return qml.expval(single_qudit_ops.ZObs(0))
+
+        for theta in (0.4, 1.5, 2.7):
+            self.assertAlmostEqual(
+                quantum_circuit(theta), 20 * np.sin(theta / 2) ** 2, delta=0.3
+            )
+
+    def test_echo(self):
+        """
+        A rotation by pi around z in between two rotations around x reverses them.
+        """
+
+        @qml.qnode(self.test_device)
+        def quantum_circuit():
+            single_qudit_ops.Load(4, wires=0)
+            single_qudit_ops.RLZ2(0.3, wires=0)
+            single_qudit_ops.RLX(np.pi / 2, wires=0)
+            single_qudit_ops.RLZ(np.pi, wires=0)
+            single_qudit_ops.RLX(np.pi / 2, wires=0)
+            return qml.var(single_qudit_ops.LZ(0))
+
+        self.assertEqual(quantum_circuit(), 0)
+
+    def test_analytic(self):
+        """
+        Without shots the moments are exact, e.g. the variance n sin(theta)^2 / 4
+        of Lz after the rotation of n atoms.
+        """
+        test_device = qml.device("synqs.sqs.local", shots=None)
+
+        @qml.qnode(test_device)
+        def quantum_circuit(theta):
+            single_qudit_ops.Load(20, wires=0)
+            single_qudit_ops.RLX(theta, wires=0)
+            return qml.var(single_qudit_ops.LZ(0))
+
+        for theta in (0.4, 1.5, 2.7):
+            np.testing.assert_allclose(quantum_circuit(theta), 5 * np.sin(theta) ** 2)
+        self.assertIn("probabilities", test_device.job_result()["results"][0]["data"])
+
+    def test_broadcast(self):
+        """
+        An array of angles evaluates the circuit for each of them in a single job.
+        """
+        test_device = qml.device("synqs.sqs.local", shots=None)
+
+        @qml.qnode(test_device)
+        def quantum_circuit(theta):
+            single_qudit_ops.Load(20, wires=0)
+            single_qudit_ops.RLX(theta, wires=0)
+            single_qudit_ops.RLZ(0.3, wires=0)
+            return qml.expval(single_qudit_ops.ZObs(0))
+
+        thetas = np.linspace(0, np.pi, 50)
+        with qml.Tracker(test_device) as tracker:
+            values = quantum_circuit(thetas)
+        np.testing.assert_allclose(values, 20 * np.sin(thetas / 2) ** 2, atol=1e-10)
+        self.assertIn(50, tracker.history["batch_len"])
+
+        @qml.qnode(test_device)
+        def mismatched_circuit():
+            single_qudit_ops.RLX(np.zeros(2), wires=0)
+            single_qudit_ops.RLZ(np.zeros(3), wires=0)
+            return qml.expval(single_qudit_ops.ZObs(0))
+
+        with self.assertRaises(ValueError):
+            mismatched_circuit()
+
+    def test_gradient(self):
+        """
+        The exact jacobian of the device and the shift rule of the loaded atoms
+        give the derivative 10 sin(theta) of the mean 20 sin(theta / 2)^2, and
+        all shifted circuits run as a single batch.
+        """
+        test_device = qml.device("synqs.sqs.local", shots=None)
+
+        def circuit(theta):
+            single_qudit_ops.Load(20, wires=0)
+            single_qudit_ops.RLX(theta, wires=0)
+            return qml.expval(single_qudit_ops.ZObs(0))
+
+        theta = pnp.array(0.8, requires_grad=True)
+        for diff_method in ("device", param_shift):
+            quantum_circuit = qml.qnode(test_device, diff_method=diff_method)(circuit)
+            with qml.Tracker(test_device) as tracker:
+                gradient = qml.grad(quantum_circuit)(theta)
+            self.assertAlmostEqual(gradient, 10 * np.sin(0.8))
+        self.assertIn(40, tracker.history["batch_len"])
+
+        @qml.qnode(test_device, diff_method="device")
+        def variance_circuit(theta):
+            single_qudit_ops.Load(20, wires=0)
+            single_qudit_ops.RLX(theta, wires=0)
+            return qml.var(single_qudit_ops.LZ(0))
+
+        self.assertAlmostEqual(qml.grad(variance_circuit)(theta), 5 * np.sin(1.6))
+
+    def test_rotation_matrix(self):
+        """
+        The rotation of every basis state agrees with the matrix exponential.
+        """
+        for qdim in (2, 5, 12, 41):
+            _, lx = spin_operators(qdim)
+            rotation = apply_rlx(np.eye(qdim, dtype=complex), qdim, 1.3, 0)
+            np.testing.assert_allclose(rotation, expm(-1.3j * lx), atol=1e-12)
+
+    def test_wigner_d(self):
+        """
+        The recursion reproduces the matrix exponential and the closed form of
+        the first row, sqrt(binomial(n, k)) / 2^(n / 2).
+        """
+        for qdim in (2, 5, 12, 41):
+            lz, lx = spin_operators(qdim)
+            basis = wigner_d_half_pi(qdim)
+            np.testing.assert_allclose(basis @ np.diag(lz) @ basis.T, lx, atol=1e-12)
+            num_atoms = qdim - 1
+            np.testing.assert_allclose(
+                basis[0],
+                np.sqrt(comb(num_atoms, np.arange(qdim))) / 2 ** (num_atoms / 2),
+            )
+
+    def test_large_spin(self):
+        """
+        Spins of many hundred atoms keep their norm and follow the Rabi oscillation.
+        """
+        qdim = 801
+        state = np.zeros(qdim, dtype=complex)
+        state[0] = 1
+        for theta in (0.3, 1.1, 2.0):
+            rotated = apply_rlx(state, qdim, theta)
+            self.assertAlmostEqual(np.linalg.norm(rotated), 1, places=12)
+            mean = np.abs(rotated) ** 2 @ np.arange(qdim)
+            self.assertAlmostEqual(mean, 800 * np.sin(theta / 2) ** 2, places=8)
+        np.testing.assert_allclose(np.abs(apply_rlx(state, qdim, np.pi))[-1], 1)
+
+    def test_server_format(self):
+        """
+        The simulator answers with the result format of the server.
+        """
+        job_payload = {
+            "experiment_0": {
+                "instructions": [("load", [0], [3]), ("measure", [0], [])],
+                "num_wires": 1,
+                "shots": 4,
+            }
+        }
+        results_dict = SingleQuditSimulator(seed=1).run(job_payload, "1")
+        self.assertEqual(results_dict["job_id"], "1")
+        self.assertEqual(results_dict["results"][0]["header"]["name"], "experiment_0")
+        self.assertEqual(results_dict["results"][0]["data"]["memory"], ["0"] * 4)
+
+    def test_unknown_instruction(self):
+        """
+        Unknown instructions are reported like a failed job on the server.
+        """
+        job_id = self.test_device.submit_job(
+            {"experiment_0": {"instructions": [("swap", [0], [])], "shots": 1}}
+        )
+        with self.assertRaises(SyntaxError):
+            self.test_device.check_job_status(job_id=job_id)
+
+    def test_batch_execution(self):
+        """
+        A batch of circuits is simulated as a single job.
+        """
+        tapes = []
+        for atoms in (1, 5, 9):
+            with qml.tape.QuantumTape() as tape:
+                single_qudit_ops.Load(atoms, wires=0)
+                single_qudit_ops.RLX(np.pi, wires=0)
+                qml.expval(single_qudit_ops.ZObs(0))
+            tapes.append(tape)
+        results = self.test_device.batch_execute(tapes)
+        np.testing.assert_allclose(np.ravel(results), [1, 5, 9])
+
+
+class TestLocalMultiQuditDevice(unittest.TestCase):
+    """
+    The test case for the local multi qudit device.
+    """
+
+    def setUp(self):
+        self.test_device = qml.device("synqs.mqs.local", wires=3, shots=500, seed=3)
+
+    def test_rX_gate(self):
+        """
+        A rotation by pi flips all atoms of its wire only.
+        """
+
+        @qml.qnode(self.test_device)
+        def quantum_circuit():
+            multi_qudit_ops.Load(50, wires=0)
+            multi_qudit_ops.Load(5, wires=2)
+            multi_qudit_ops.RLX(np.pi, wires=0)
+            return qml.expval(multi_qudit_ops.ZObs(0)), qml.expval(
+                multi_qudit_ops.ZObs(2)
+            )
+
+        np.testing.assert_allclose(np.ravel(quantum_circuit()), [50, 0])
+
+    def test_flip_flop(self):
+        """
+        The flip-flop gate moves atoms between the wires, but conserves their sum.
+        """
+
+        @qml.qnode(self.test_device)
+        def quantum_circuit(theta):
+            multi_qudit_ops.Load(3, wires=0)
+            multi_qudit_ops.Load(2, wires=1)
+            multi_qudit_ops.RLX(np.pi, wires=0)
+            multi_qudit_ops.RLZLZ(0.4, wires=[0, 1])
+            multi_qudit_ops.RLXLY(theta, wires=[0, 1])
+            return qml.expval(multi_qudit_ops.ZObs(0)), qml.expval(
+                multi_qudit_ops.ZObs(1)
+            )
+
+        first, second = np.ravel(quantum_circuit(0.9))
+        self.assertLess(first, 3)
+        self.assertGreater(second, 0)
+        np.testing.assert_array_equal(self.test_device.job_samples().sum(axis=1), 3)
+
+    def test_gates(self):
+        """
+        The blockwise and elementwise gates agree with the matrix exponentials
+        on the full space.
+        """
+        dims = [3, 4, 2]
+        rng = np.random.default_rng(0)
+        state = rng.normal(size=dims) + 1j * rng.normal(size=dims)
+        lz_1, lx_1 = spin_operators(3)
+        lz_2, lx_2 = spin_operators(4)
+        raising_1 = np.diag(2 * np.diag(lx_1, -1), -1)
+        raising_2 = np.diag(2 * np.diag(lx_2, -1), -1)
+        flip_flop = (
+            np.kron(raising_1, raising_2.T) + np.kron(raising_1.T, raising_2)
+        ) / 2
+        ising = np.kron(np.diag(lz_1), np.diag(lz_2))
+        for name, generator in (("rlxly", flip_flop), ("rlzlz", ising)):
+            full = np.kron(expm(-0.7j * generator), np.eye(2))
+            expected = (full @ state.ravel()).reshape(dims)
+            apply = getattr(MultiQuditSimulator, f"apply_{name}")
+            np.testing.assert_allclose(
+                apply(state, dims, 0.7, [1, 0]), expected, atol=1e-12
+            )
+
+    def test_analytic(self):
+        """
+        Without shots the means of the wires are exact.
+        """
+        test_device = qml.device("synqs.mqs.local", wires=2, shots=None)
+
+        @qml.qnode(test_device)
+        def quantum_circuit(theta):
+            multi_qudit_ops.Load(20, wires=0)
+            multi_qudit_ops.Load(3, wires=1)
+            multi_qudit_ops.RLX(theta, wires=0)
+            multi_qudit_ops.RLXLY(0.5, wires=[0, 1])
+            return qml.expval(multi_qudit_ops.ZObs(0)), qml.expval(
+                multi_qudit_ops.ZObs(1)
+            )
+
+        first, second = np.ravel(quantum_circuit(0.7))
+        self.assertAlmostEqual(first + second, 20 * np.sin(0.35) ** 2)
+        self.assertGreater(second, 0)
+
+    def test_gradient(self):
+        """
+        The exact jacobian of the device agrees with the shift rules of the spin
+        couplings and with finite differences.
+        """
+        test_device = qml.device("synqs.mqs.local", wires=2, shots=None)
+
+        def circuit(params):
+            multi_qudit_ops.Load(2, wires=0)
+            multi_qudit_ops.Load(3, wires=1)
+            multi_qudit_ops.RLX(0.7, wires=0)
+            multi_qudit_ops.RLX(1.1, wires=1)
+            multi_qudit_ops.RLXLY(params[0], wires=[0, 1])
+            multi_qudit_ops.RLZLZ(params[1], wires=[0, 1])
+            multi_qudit_ops.RLX(params[2], wires=0)
+            return qml.expval(multi_qudit_ops.ZObs(0)), qml.expval(
+                multi_qudit_ops.ZObs(1)
+            )
+
+        params = pnp.array([0.3, 0.9, 0.5], requires_grad=True)
+        jacobians = [
+            qml.jacobian(qml.qnode(test_device, diff_method=diff_method)(circuit))(
+                params
+            )
+            for diff_method in ("device", param_shift, "finite-diff")
+        ]
+        np.testing.assert_allclose(jacobians[0], jacobians[1], atol=1e-10)
+        np.testing.assert_allclose(jacobians[0], jacobians[2], atol=1e-5)
+
+    def test_large_spin_gradient(self):
+        """
+        The flip-flop couplings of large spins, whose spectra give ill-conditioned
+        shift rules, and the squeezing of many atoms, whose rule needs too many
+        circuits, are differentiated by central differences instead.
+        """
+        test_device = qml.device("synqs.mqs.local", wires=2, shots=None)
+
+        def make_circuit(qdims):
+            def circuit(params):
+                multi_qudit_ops.Load(qdims[0] - 1, wires=0)
+                multi_qudit_ops.Load(qdims[1] - 1, wires=1)
+                multi_qudit_ops.RLX(0.4, wires=0)
+                multi_qudit_ops.RLXLY(params[0], wires=[0, 1])
+                multi_qudit_ops.RLZ2(params[1], wires=0)
+                multi_qudit_ops.RLX(0.3, wires=0)
+                return qml.expval(multi_qudit_ops.LZ(0)), qml.expval(
+                    multi_qudit_ops.LZ(1)
+                )
+
+            return circuit
+
+        params = pnp.array([0.7, 0.2], requires_grad=True)
+        for qdims in ((11, 2), (11, 11), (5, 5), (31, 2)):
+            exact, shifted = [
+                qml.jacobian(
+                    qml.qnode(test_device, diff_method=diff_method)(make_circuit(qdims))
+                )(params)
+                for diff_method in ("device", param_shift)
+            ]
+            np.testing.assert_allclose(shifted, exact, atol=1e-6 * qdims[0])
+        with self.assertRaisesRegex(qml.QuantumFunctionError, "5000 shifted circuits"):
+            shift_rule(multi_qudit_ops.RLZ2.generator_eigvals([101]))
+
+    def test_broadcast(self):
+        """
+        The stacked means of a sweep agree with the circuits of its elements.
+        """
+        test_device = qml.device("synqs.mqs.local", wires=2, shots=None)
+
+        @qml.qnode(test_device)
+        def quantum_circuit(theta):
+            multi_qudit_ops.Load(4, wires=0)
+            multi_qudit_ops.Load(2, wires=1)
+            multi_qudit_ops.RLX(theta, wires=0)
+            multi_qudit_ops.RLXLY(0.5, wires=[0, 1])
+            return qml.expval(multi_qudit_ops.ZObs(0)), qml.expval(
+                multi_qudit_ops.ZObs(1)
+            )
+
+        thetas = np.linspace(0, np.pi, 7)
+        values = quantum_circuit(thetas)
+        expected = [np.ravel(quantum_circuit(theta)) for theta in thetas]
+        np.testing.assert_allclose(np.reshape(values, (7, 2)), expected, atol=1e-12)
+
+    def test_batch(self):
+        """
+        Experiments that only differ by their angles are simulated as a stack of
+        states, which agrees with their simulation one by one.
+        """
+        rng = np.random.default_rng(1)
+        experiments = []
+        for angles in rng.uniform(0, np.pi, size=(4, 5)):
+            instructions = [
+                ("load", [0], [3]),
+                ("load", [2], [2]),
+                ("rlx", [0], [angles[0]]),
+                ("rlzlz", [2, 0], [angles[1]]),
+                ("rlxly", [0, 2], [angles[2]]),
+                ("rlz2", [2], [angles[3]]),
+                ("rlxly", [1, 2], [angles[4]]),
+            ] + [("measure", [wire], []) for wire in range(3)]
+            experiments.append({"instructions": instructions, "shots": None})
+        simulator = MultiQuditSimulator()
+        for batched, experiment in zip(simulator.run_batch(experiments), experiments):
+            single = simulator.run_experiment(experiment)
+            self.assertEqual(
+                batched["probabilities"].keys(), single["probabilities"].keys()
+            )
+            np.testing.assert_allclose(
+                list(batched["probabilities"].values()),
+                list(single["probabilities"].values()),
+                atol=1e-12,
+            )
+
+    def test_load_after_gates(self):
+        """
+        Atoms can only be loaded before the gates on their wire.
+        """
+        job_id = self.test_device.submit_job(
+            {
+                "experiment_0": {
+                    "instructions": [("rlx", [0], [0.1]), ("load", [0], [2])],
+                    "shots": 1,
+                }
+            }
+        )
+        with self.assertRaises(SyntaxError):
+            self.test_device.check_job_status(job_id=job_id)
+
+
+def jordan_wigner(num_modes):
+    """
+    The annihilation operators of the modes on the full Fock space, whose basis
+    states are ordered by their codes with one bit per mode.
+    """
+    annihilation = np.array([[0, 1], [0, 0]])
+    operators = []
+    for mode in range(num_modes):
+        factors = [
+            annihilation if other == mode else np.diag([1, -1 if other < mode else 1])
+            for other in reversed(range(num_modes))
+        ]
+        operator = factors[0]
+        for factor in factors[1:]:
+            operator = np.kron(operator, factor)
+        operators.append(operator)
+    return operators
+
+
+class TestLocalFermionDevice(unittest.TestCase):
+    """
+    The test case for the local fermion device.
+    """
+
+    def setUp(self):
+        self.test_device = qml.device("synqs.fs.local", shots=100, seed=5)
+
+    def test_hop_gate(self):
+        """
+        A hop by pi moves the particle to the other site, but two particles of the
+        same spin block each other.
+        """
+
+        @qml.qnode(self.test_device)
+        def quantum_circuit(second_particle):
+            fermion_ops.Load(wires=0)
+            if second_particle:
+                fermion_ops.Load(wires=2)
+            fermion_ops.Hop(np.pi, wires=[0, 1, 2, 3])
+            return qml.expval(fermion_ops.ParticleNumber(self.test_device.wires))
+
+        np.testing.assert_allclose(quantum_circuit(False), [0, 0, 1, 0, 0, 0, 0, 0])
+        np.testing.assert_allclose(quantum_circuit(True), [1, 0, 1, 0, 0, 0, 0, 0])
+
+    def test_against_fock_space(self):
+        """
+        The sector simulation agrees with the evolution in the full Fock space.
+        """
+        instructions = [
+            ("load", [0], []),
+            ("load", [3], []),
+            ("load", [1], []),
+            ("fhop", [0, 1, 2, 3], [0.7]),
+            ("fint", [0, 1, 2, 3, 4, 5], [1.1]),
+            ("fhop", [2, 3, 4, 5], [0.4]),
+            ("fphase", [2, 3], [0.5]),
+            ("fhop", [0, 1, 4, 5], [0.9]),
+        ]
+        operators = jordan_wigner(6)
+        numbers = [operator.T @ operator for operator in operators]
+        state = np.zeros(2 ** 6)
+        state[0] = 1
+        for name, wires, params in instructions:
+            if name == "load":
+                state = operators[wires[0]].T @ state
+                continue
+            if name == "fhop":
+                generator = sum(
+                    operators[first].T @ operators[second]
+                    + operators[second].T @ operators[first]
+                    for first, second in [(wires[0], wires[2]), (wires[1], wires[3])]
+                )
+            elif name == "fint":
+                generator = sum(
+                    numbers[up] @ numbers[down]
+                    for up, down in zip(wires[::2], wires[1::2])
+                )
+            else:
+                generator = numbers[wires[0]] + numbers[wires[1]]
+            state = expm(-1j * params[0] * generator) @ state
+        expected = [np.abs(state) ** 2 @ np.diag(number) for number in numbers]
+
+        measurements = [("measure", [wire], []) for wire in range(6)]
+        memory = FermionSimulator(seed=2).run_experiment(
+            {"instructions": instructions + measurements, "shots": 20000}
+        )["memory"]
+        means = parse_memory(memory).mean(axis=0)
+        np.testing.assert_allclose(means, expected, atol=0.02)
+
+        probabilities = FermionSimulator().run_experiment(
+            {"instructions": instructions + measurements, "shots": None}
+        )["probabilities"]
+        outcomes = parse_memory(list(probabilities))
+        means = np.array(list(probabilities.values())) @ outcomes
+        np.testing.assert_allclose(means, expected, atol=1e-10)
+
+    def test_free_fermions(self):
+        """
+        Circuits without interactions are sampled from their Slater determinant,
+        which agrees with the sector simulation.
+        """
+        instructions = [
+            ("load", [0], []),
+            ("load", [3], []),
+            ("load", [1], []),
+            ("fhop", [0, 1, 2, 3], [0.7]),
+            ("fhop", [2, 3, 4, 5], [0.4]),
+            ("fphase", [2, 3], [0.5]),
+            ("fhop", [0, 1, 4, 5], [0.9]),
+        ] + [("measure", [wire], []) for wire in range(6)]
+        free = parse_memory(
+            FermionSimulator(seed=3).run_free(
+                {"instructions": instructions, "shots": 20000}
+            )["memory"]
+        )
+        sector = parse_memory(
+            FermionSimulator(seed=4).run_experiment(
+                {
+                    "instructions": [("fint", [0, 1], [0.0])] + instructions,
+                    "shots": 20000,
+                }
+            )["memory"]
+        )
+        np.testing.assert_array_equal(free.sum(axis=1), 3)
+        np.testing.assert_allclose(free.mean(axis=0), sector.mean(axis=0), atol=0.02)
+
+    def test_many_wires(self):
+        """
+        The local device is not limited to eight wires for free fermions.
+        """
+        test_device = qml.device("synqs.fs.local", wires=60, shots=50, seed=6)
+
+        @qml.qnode(test_device)
+        def quantum_circuit():
+            for wire in range(0, 20, 2):
+                fermion_ops.Load(wires=wire)
+            for site in range(0, 56, 2):
+                fermion_ops.Hop(0.8, wires=[site, site + 1, site + 2, site + 3])
+            return qml.expval(fermion_ops.ParticleNumber(test_device.wires))
+
+        self.assertAlmostEqual(np.sum(quantum_circuit()), 10)
+        self.assertTrue(
+            np.all(test_device.sample("ParticleNumber", None, None)[:, 1::2] == 0)
+        )
+        probabilities = test_device.probability(wires=[0, 2, 4])
+        self.assertEqual(len(probabilities), 8)
+        self.assertAlmostEqual(sum(probabilities.values()), 1)
+
+    def test_analytic(self):
+        """
+        Without shots the occupations and the probabilities are exact, also for
+        circuits with interactions.
+        """
+        test_device = qml.device("synqs.fs.local", shots=None)
+
+        @qml.qnode(test_device)
+        def quantum_circuit(theta):
+            fermion_ops.Load(wires=0)
+            fermion_ops.Load(wires=1)
+            fermion_ops.Hop(theta, wires=[0, 1, 2, 3])
+            fermion_ops.Inter(0.3, wires=test_device.wires)
+            return qml.expval(fermion_ops.ParticleNumber(test_device.wires))
+
+        moved = np.sin(0.2) ** 2
+        np.testing.assert_allclose(
+            quantum_circuit(0.4), [1 - moved, 1 - moved, moved, moved, 0, 0, 0, 0]
+        )
+        probabilities = test_device.probability(wires=[0, 1])
+        self.assertAlmostEqual(probabilities[(1, 1)], (1 - moved) ** 2)
+        self.assertAlmostEqual(probabilities[(1, 0)], moved * (1 - moved))
+        self.assertAlmostEqual(probabilities[(0, 0)], moved ** 2)
+
+    def test_gradient(self):
+        """
+        The exact jacobian of the device agrees with both shift rules, i.e. the
+        one of the loaded modes and the `grad_recipe` of the gates.
+        """
+        test_device = qml.device("synqs.fs.local", wires=4, shots=None)
+
+        def circuit(params):
+            fermion_ops.Load(wires=0)
+            fermion_ops.Load(wires=1)
+            fermion_ops.Hop(params[0], wires=[0, 1, 2, 3])
+            fermion_ops.Inter(params[1], wires=[0, 1, 2, 3])
+            fermion_ops.Phase(params[2], wires=[0, 1])
+            fermion_ops.Hop(0.8, wires=[0, 1, 2, 3])
+            return qml.expval(fermion_ops.ParticleNumber([0, 3]))
+
+        params = pnp.array([0.3, 0.9, 0.4], requires_grad=True)
+        jacobians = [
+            qml.jacobian(qml.qnode(test_device, diff_method=diff_method)(circuit))(
+                params
+            )
+            for diff_method in ("device", param_shift, qml.gradients.param_shift)
+        ]
+        np.testing.assert_allclose(jacobians[0], jacobians[1], atol=1e-10)
+        np.testing.assert_allclose(jacobians[0], jacobians[2], atol=1e-10)
+        self.assertGreater(np.abs(jacobians[0]).max(), 0.1)
+        self.assertIs(
+            fermion_ops.Hop(0.1, wires=[0, 1, 2, 3]).grad_recipe,
+            fermion_ops.Hop(0.2, wires=[4, 5, 6, 7]).grad_recipe,
+        )
+
+    def test_broadcast(self):
+        """
+        The stacked moments of a sweep agree with the circuits of its elements.
+        """
+        test_device = qml.device("synqs.fs.local", wires=4, shots=None)
+
+        @qml.qnode(test_device)
+        def quantum_circuit(theta):
+            fermion_ops.Load(wires=0)
+            fermion_ops.Load(wires=1)
+            fermion_ops.Hop(theta, wires=[0, 1, 2, 3])
+            fermion_ops.Inter(0.3, wires=[0, 1, 2, 3])
+            return qml.expval(fermion_ops.ParticleNumber([0, 2])), qml.var(
+                fermion_ops.ParticleNumber([1, 3])
+            )
+
+        thetas = np.linspace(0, np.pi, 5)
+        values = quantum_circuit(thetas)
+        expected = [quantum_circuit(theta) for theta in thetas]
+        np.testing.assert_allclose(values, expected, atol=1e-12)
+
+    def test_double_load(self):
+        """
+        A wire cannot be loaded twice.
+        """
+
+        @qml.qnode(self.test_device)
+        def quantum_circuit():
+            fermion_ops.Load(wires=1)
+            fermion_ops.Load(wires=1)
+            return qml.expval(fermion_ops.ParticleNumber(self.test_device.wires))
+
+        with self.assertRaises(SyntaxError):
+            quantum_circuit()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Tests for the conversion of the measured shots.
+"""
+
+import base64
+import unittest
+
+import numpy as np
+
+from pennylane_ls.parsing import parse_memory, parse_memory_loop, unpack_memory
+
+
+class TestParseMemory(unittest.TestCase):
+    """
+    The test case for the vectorised parser.
+    """
+
+    def test_agrees_with_loop(self):
+        """
+        The vectorised parser gives the same array as the loop.
+        """
+        rng = np.random.default_rng(1)
+        for high in [2, 10, 51, 1000]:
+            values = rng.integers(0, high, size=(200, 5))
+            memory = [" ".join(str(value) for value in row) for row in values]
+            np.testing.assert_array_equal(parse_memory(memory), values)
+            np.testing.assert_array_equal(parse_memory_loop(memory), values)
+
+    def test_irregular_input(self):
+        """
+        Irregular spacing and signs are still converted.
+        """
+        np.testing.assert_array_equal(parse_memory(["1  2", " 3 4"]), [[1, 2], [3, 4]])
+        np.testing.assert_array_equal(parse_memory(["-1 2", "3 4"]), [[-1, 2], [3, 4]])
+        self.assertEqual(parse_memory([]).shape, (0, 0))
+
+    def test_inconsistent_shots(self):
+        """
+        Shots with different numbers of values are rejected.
+        """
+        for memory in (["1 2", "3"], ["1 0 1", "1"], ["10 2 3", "4"], ["1  2", "3"]):
+            with self.assertRaises(ValueError):
+                parse_memory(memory)
+            with self.assertRaises(ValueError):
+                parse_memory_loop(memory)
+
+    def test_packed_memory(self):
+        """
+        Packed shots are read from raw bytes and from base64 strings.
+        """
+        shots = np.array([[1, 0, 3], [2, 2, 0]], dtype=np.uint8)
+        packed = {"dtype": shots.dtype.str, "shape": [2, 3], "data": shots.tobytes()}
+        np.testing.assert_array_equal(unpack_memory(packed), shots)
+        packed["data"] = base64.b64encode(shots.tobytes()).decode("ascii")
+        np.testing.assert_array_equal(unpack_memory(packed), shots)
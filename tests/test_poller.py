@@ -0,0 +1,178 @@
+"""
+Tests for the background poller of the jobs.
+"""
+
+import json
+import threading
+import unittest
+from unittest import mock
+
+import pennylane as qml
+from fake_api import FakeDjangoAPI
+
+from pennylane_ls import single_qudit_ops, fermion_ops
+from pennylane_ls.job_future import as_completed
+from pennylane_ls.poller import JobPoller
+from pennylane_ls.waiting import FixedInterval
+
+
+def memory(experiment):
+    """
+    Single qudit jobs find all atoms in the upper state and fermion jobs find
+    the first wire occupied.
+    """
+    first = experiment["instructions"][0]
+    if first[0] == "load" and first[2]:
+        return [str(first[2][0])] * experiment["shots"]
+    return ["1 0"] * experiment["shots"]
+
+
+def load_circuit(atoms):
+    """
+    The tape of a circuit that loads the atoms and measures them.
+    """
+    with qml.tape.QuantumTape() as tape:
+        single_qudit_ops.Load(atoms, wires=0)
+        qml.expval(single_qudit_ops.ZObs(0))
+    return tape
+
+
+def status_requests(api):
+    """
+    The payloads of all status requests that the server received.
+    """
+    return [
+        json.loads(fields["json"])
+        for endpoint, fields in api.requests
+        if endpoint == "get_job_status"
+    ]
+
+
+class TestJobPoller(unittest.TestCase):
+    """
+    The test case for the background poller.
+    """
+
+    def setUp(self):
+        self.poller = JobPoller(wait_strategy=FixedInterval(0.02))
+
+    def tearDown(self):
+        self.poller.close()
+
+    def test_bulk_status_requests(self):
+        """
+        The jobs of different devices are checked together in bulk requests.
+        """
+        with FakeDjangoAPI(memory, polls_till_done=2) as api:
+            sqs_device = qml.device(
+                "synqs.sqs", shots=5, url=api.url, blocking=False, poller=self.poller
+            )
+            fs_device = qml.device(
+                "synqs.fs",
+                wires=2,
+                shots=5,
+                url=api.url,
+                blocking=False,
+                poller=self.poller,
+            )
+            futures = [sqs_device.submit_circuit(load_circuit(n)) for n in range(8)]
+            with qml.tape.QuantumTape() as tape:
+                fermion_ops.Load(wires=0)
+                qml.expval(fermion_ops.ParticleNumber(0))
+            futures.append(fs_device.submit_circuit(tape))
+
+            results = [future.result(timeout=5) for future in futures]
+            self.assertEqual([result[0] for result in results], [*range(8), 1])
+            requests = status_requests(api)
+            # each job is reported as done on its third status request
+            self.assertLess(len(requests), 3 * 9)
+            self.assertGreater(max(len(r.get("job_ids", [])) for r in requests), 1)
+            self.assertEqual(self.poller.stats()["completed"], 9)
+            self.assertEqual(self.poller.pending(), 0)
+
+    def test_single_status_fallback(self):
+        """
+        Servers without bulk requests are asked for each job on its own.
+        """
+        with FakeDjangoAPI(memory, polls_till_done=1, bulk_status=False) as api:
+            test_device = qml.device(
+                "synqs.sqs", shots=5, url=api.url, blocking=False, poller=self.poller
+            )
+            futures = [test_device.submit_circuit(load_circuit(n)) for n in range(4)]
+            results = sorted(
+                future.result()[0] for future in as_completed(futures, timeout=5)
+            )
+            self.assertEqual(results, list(range(4)))
+            single_requests = [r for r in status_requests(api) if "job_id" in r]
+            self.assertGreaterEqual(len(single_requests), 4)
+
+    def test_transient_bulk_failure(self):
+        """
+        A failed bulk request keeps the bulk requests for later rounds.
+        """
+        with FakeDjangoAPI(memory) as api:
+            test_device = qml.device("synqs.sqs", shots=5, url=api.url, blocking=False)
+            job_ids = [test_device.submit_job({}) for _ in range(2)]
+            api.fail("get_job_status", times=test_device.transport.retries + 1)
+            with self.assertRaises(qml.DeviceError):
+                test_device.check_job_statuses(job_ids)
+            statuses = test_device.check_job_statuses(job_ids)
+            self.assertEqual({s["status"] for s in statuses.values()}, {"DONE"})
+            self.assertIn("job_ids", status_requests(api)[-1])
+
+    def test_blocking_device(self):
+        """
+        Blocking devices sleep until the poller reports their job as done.
+        """
+        with FakeDjangoAPI(memory, polls_till_done=2) as api:
+            test_device = qml.device(
+                "synqs.sqs", shots=5, url=api.url, poller=self.poller
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit():
+                single_qudit_ops.Load(5, wires=0)
+                return qml.expval(single_qudit_ops.ZObs(0))
+
+            self.assertEqual(quantum_circuit(), 5)
+            self.assertEqual(self.poller.stats()["completed"], 1)
+
+    def test_failing_callback(self):
+        """
+        A failing callback neither stops the poller nor the other jobs.
+        """
+        with FakeDjangoAPI(memory, polls_till_done=1) as api:
+            test_device = qml.device(
+                "synqs.sqs", shots=5, url=api.url, blocking=False, poller=self.poller
+            )
+            first = test_device.submit_circuit(load_circuit(1))
+            called = threading.Event()
+            first.add_done_callback(lambda future: 1 / 0)
+            first.add_done_callback(lambda future: called.set())
+            with self.assertLogs("pennylane_ls.job_future", level="ERROR"):
+                self.assertTrue(called.wait(timeout=5))
+            second = test_device.submit_circuit(load_circuit(2))
+            self.assertEqual(second.result(timeout=5)[0], 2)
+
+    def test_status_errors(self):
+        """
+        Jobs whose status cannot be checked fail after repeated errors.
+        """
+        poller = JobPoller(wait_strategy=FixedInterval(0.01), max_errors=3)
+        with FakeDjangoAPI(memory) as api:
+            test_device = qml.device(
+                "synqs.sqs", shots=5, url=api.url, blocking=False, poller=poller
+            )
+            with mock.patch.object(
+                test_device, "check_job_statuses", side_effect=ConnectionError("down")
+            ):
+                future = test_device.submit_circuit(load_circuit(3))
+                with self.assertRaises(ConnectionError):
+                    future.result(timeout=5)
+            self.assertGreaterEqual(poller.stats()["errors"], 3)
+            self.assertEqual(poller.pending(), 0)
+        poller.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the persistent result store.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+
+import pennylane as qml
+from fake_api import FakeDjangoAPI
+
+from pennylane_ls import single_qudit_ops
+from pennylane_ls.result_store import ResultStore
+from pennylane_ls.waiting import ExponentialBackoff
+
+
+def full_load(experiment):
+    """
+    Every shot finds all atoms in the upper state.
+    """
+    atoms = experiment["instructions"][0][2][0]
+    return [str(atoms)] * experiment["shots"]
+
+
+class TestResultStore(unittest.TestCase):
+    """
+    The test case for the result store.
+    """
+
+    def setUp(self):
+        # pylint: disable=R1732
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.payload = {"experiment_0": {"instructions": [["load", [0], [5]]]}}
+        self.result = {"job_id": "1", "results": [{"data": {"memory": ["5"]}}]}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_canonical_key(self):
+        """
+        The key does not depend on the order of the dictionaries or on tuples.
+        """
+        key = ResultStore.key("url", {"a": 1, "b": [("load", [0], [5])]})
+        self.assertEqual(
+            key, ResultStore.key("url", {"b": [["load", [0], [5]]], "a": 1})
+        )
+        self.assertNotEqual(key, ResultStore.key("other_url", {"a": 1, "b": []}))
+
+    def test_hit_and_miss(self):
+        """
+        A saved result is found again and counted.
+        """
+        store = ResultStore(self.tmp_dir.name)
+        self.assertIsNone(store.get("url", self.payload))
+        store.put("url", self.payload, self.result)
+        self.assertEqual(store.get("url", self.payload), self.result)
+        self.assertEqual(store.stats(), {"hits": 1, "misses": 1, "evictions": 0})
+
+    def test_ttl(self):
+        """
+        Stale results are not returned.
+        """
+        store = ResultStore(self.tmp_dir.name, ttl=0.01)
+        store.put("url", self.payload, self.result)
+        time.sleep(0.02)
+        self.assertIsNone(store.get("url", self.payload))
+        self.assertEqual(store.size(), 0)
+
+    def test_eviction(self):
+        """
+        The least recently used results are evicted beyond the size cap.
+        """
+        store = ResultStore(self.tmp_dir.name)
+        store.put("url", {"index": 0}, self.result)
+        entry_size = store.size()
+        # the entries differ by a few bytes in their time stamps.
+        store.max_bytes = 2 * entry_size + entry_size // 2
+        store.put("url", {"index": 1}, self.result)
+        # use the first result, such that the second one is the oldest.
+        old_time = time.time() - 10
+        os.utime(store._path(store.key("url", {"index": 1})), (old_time, old_time))
+        store.get("url", {"index": 0})
+        store.put("url", {"index": 2}, self.result)
+
+        self.assertEqual(store.stats()["evictions"], 1)
+        self.assertIsNone(store.get("url", {"index": 1}))
+        self.assertIsNotNone(store.get("url", {"index": 0}))
+        self.assertIsNotNone(store.get("url", {"index": 2}))
+
+    def test_device_skips_server(self):
+        """
+        A device with a store submits identical circuits only once.
+        """
+        store = ResultStore(self.tmp_dir.name)
+        with FakeDjangoAPI(full_load) as api:
+            test_device = qml.device(
+                "synqs.sqs",
+                shots=3,
+                url=api.url,
+                result_store=store,
+                wait_strategy=ExponentialBackoff(initial=0.01),
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit():
+                single_qudit_ops.Load(10, wires=0)
+                return qml.expval(single_qudit_ops.ZObs(0))
+
+            self.assertEqual(quantum_circuit(), 10)
+            self.assertEqual(quantum_circuit(), 10)
+            self.assertEqual(len(api.jobs), 1)
+            self.assertEqual(store.stats()["hits"], 1)
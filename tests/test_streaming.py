@@ -0,0 +1,105 @@
+"""
+Tests for the streaming reader of large results.
+"""
+
+import gc
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import pennylane as qml
+from fake_api import FakeDjangoAPI
+
+from pennylane_ls import single_qudit_ops
+from pennylane_ls.parsing import parse_memory
+from pennylane_ls.streaming import MemoryStreamReader
+
+
+def random_document(shots, rng):
+    """
+    A result document with two experiments of random shots.
+    """
+    results = []
+    for index, width in enumerate([3, 1]):
+        memory = [
+            " ".join(str(value) for value in rng.integers(0, 12, size=width))
+            for _ in range(shots)
+        ]
+        results.append(
+            {"header": {"name": f"experiment_{index}"}, "data": {"memory": memory}}
+        )
+    return {"job_id": "5", "status": "finished", "results": results}
+
+
+def stream(reader, document, chunk_size):
+    """
+    Feed the encoded document to the reader in chunks.
+    """
+    text = json.dumps(document).encode()
+    for start in range(0, len(text), chunk_size):
+        reader.feed(text[start : start + chunk_size])
+    return reader.close()
+
+
+class TestMemoryStreamReader(unittest.TestCase):
+    """
+    The test case for the streaming reader.
+    """
+
+    def test_chunks_agree_with_parser(self):
+        """
+        The streamed arrays agree with the parsed lists for any chunk size, and
+        the rest of the document is kept.
+        """
+        document = random_document(50, np.random.default_rng(3))
+        for chunk_size, shots in [(7, 50), (64, 10), (100000, None)]:
+            results_dict = stream(MemoryStreamReader(shots=shots), document, chunk_size)
+            self.assertEqual(results_dict["job_id"], "5")
+            for result, expected in zip(results_dict["results"], document["results"]):
+                self.assertEqual(result["header"], expected["header"])
+                np.testing.assert_array_equal(
+                    result["data"]["memory_packed"]["data"],
+                    parse_memory(expected["data"]["memory"]),
+                )
+
+    def test_memmap(self):
+        """
+        Huge results are kept as memmaps on disk.
+        """
+        document = random_document(20, np.random.default_rng(4))
+        with tempfile.TemporaryDirectory() as directory:
+            reader = MemoryStreamReader(shots=5, memmap_dir=directory)
+            results_dict = stream(reader, document, 16)
+            array = results_dict["results"][0]["data"]["memory_packed"]["data"]
+            self.assertIsInstance(array, np.memmap)
+            self.assertEqual(array.shape, (20, 3))
+            self.assertEqual(len(os.listdir(directory)), 2)
+            del array, results_dict, reader
+            gc.collect()
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_streaming_device(self):
+        """
+        A streaming device obtains the samples without the list of strings.
+        """
+        with FakeDjangoAPI(lambda exp: ["3"] * exp["shots"]) as api:
+            test_device = qml.device(
+                "synqs.sqs", shots=20000, url=api.url, stream_results=True
+            )
+
+            @qml.qnode(test_device)
+            def quantum_circuit():
+                single_qudit_ops.Load(3, wires=0)
+                return qml.expval(single_qudit_ops.ZObs(0))
+
+            self.assertEqual(quantum_circuit(), 3)
+            data = test_device.job_result()["results"][0]["data"]
+            self.assertNotIn("memory", data)
+            self.assertIs(test_device.job_samples(), data["memory_packed"]["data"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Tests for the retries and the circuit breaker of the transport.
+"""
+
+import socket
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import pennylane as qml
+from fake_api import FakeDjangoAPI
+
+from pennylane_ls import single_qudit_ops
+from pennylane_ls.session_pool import SessionPool
+from pennylane_ls.transport import CircuitBreaker, CircuitOpenError, Transport
+from pennylane_ls.waiting import FixedInterval
+
+
+def full_load(experiment):
+    """
+    Every shot finds all atoms in the upper state.
+    """
+    atoms = experiment["instructions"][0][2][0]
+    return [str(atoms)] * experiment["shots"]
+
+
+def closed_url():
+    """
+    The url of a local port on which nobody listens.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api/"
+
+
+class TestTransport(unittest.TestCase):
+    """
+    The test case for the resilient transport.
+    """
+
+    def setUp(self):
+        self.transport = Transport(backoff=FixedInterval(0.01))
+
+    def make_circuit(self, url):
+        """
+        A circuit on a device with the transport of the test, which loads 4 atoms.
+        """
+        test_device = qml.device(
+            "synqs.sqs",
+            shots=5,
+            url=url,
+            transport=self.transport,
+            wait_strategy=FixedInterval(0.01),
+        )
+
+        @qml.qnode(test_device)
+        def quantum_circuit():
+            single_qudit_ops.Load(4, wires=0)
+            return qml.expval(single_qudit_ops.ZObs(0))
+
+        return quantum_circuit
+
+    def test_transient_errors_are_retried(self):
+        """
+        Status and result requests are repeated after a bad gateway.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            api.fail("get_job_status", 2)
+            api.fail("get_job_result", 1)
+            self.assertEqual(self.make_circuit(api.url)(), 4)
+            self.assertEqual(self.transport.stats()["retries"], 3)
+            self.assertEqual(self.transport.stats()["failures"], 3)
+
+    def test_submission_is_deduplicated(self):
+        """
+        A submission whose answer was lost is repeated with the same key, such
+        that the server runs the job only once.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            api.fail("post_job", 1)
+            self.assertEqual(self.make_circuit(api.url)(), 4)
+            posts = [
+                fields for endpoint, fields in api.requests if endpoint == "post_job"
+            ]
+            self.assertEqual(len(posts), 2)
+            self.assertEqual(posts[0]["idempotency_key"], posts[1]["idempotency_key"])
+            self.assertEqual(len(api.jobs), 1)
+
+    def test_non_idempotent_requests(self):
+        """
+        Requests without an idempotency key are never repeated.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            api.fail("post_job", 1)
+            response = self.transport.request(
+                SessionPool(),
+                "POST",
+                api.url + "post_job/",
+                idempotent=False,
+                data={"json": "{}"},
+            )
+            self.assertEqual(response.status_code, 502)
+            self.assertEqual(self.transport.stats()["retries"], 0)
+
+    def test_circuit_breaker(self):
+        """
+        A server that is down fails fast after a few failures.
+        """
+        transport = Transport(retries=1, backoff=FixedInterval(0), failure_threshold=4)
+        url = closed_url() + "get_job_status/"
+        pool = SessionPool()
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                transport.request(pool, "GET", url)
+        with self.assertRaises(CircuitOpenError):
+            transport.request(pool, "GET", url)
+        stats = transport.stats()
+        self.assertEqual(stats["failures"], 4)
+        self.assertEqual(stats["fast_failures"], 1)
+        self.assertEqual(stats["circuit_opens"], 1)
+
+    def test_half_open(self):
+        """
+        After the reset timeout a single trial request decides about the circuit.
+        """
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        time.sleep(0.06)
+        breaker.before_request()
+        self.assertEqual(breaker.state, "half-open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        breaker.before_request()
+
+    def test_failed_trial(self):
+        """
+        Any error of the trial request opens the circuit again, while the
+        circuits of other scopes stay closed.
+        """
+        transport = Transport(failure_threshold=1, reset_timeout=0.05)
+        pool = SessionPool()
+        url = closed_url()
+        with self.assertRaises(requests.ConnectionError):
+            transport.request(pool, "GET", url, idempotent=False, scope="first")
+        time.sleep(0.06)
+        with mock.patch.object(pool, "request", side_effect=ValueError("bad body")):
+            with self.assertRaises(ValueError):
+                transport.request(pool, "GET", url, scope="first")
+        self.assertEqual(transport.breaker("first").state, "open")
+        self.assertEqual(transport.breaker("second").state, "closed")
+
+    def test_dropped_answers_are_closed(self):
+        """
+        The answers that are repeated are closed before the next attempt.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            api.fail("post_job", 1)
+            with mock.patch.object(requests.Response, "close", autospec=True) as close:
+                response = self.transport.request(
+                    SessionPool(),
+                    "POST",
+                    api.url + "post_job/",
+                    data={"json": "{}"},
+                    stream=True,
+                )
+            self.assertEqual(close.call_count, 1)
+            self.assertIsNot(close.call_args[0][0], response)
+            response.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for the negotiated compression and binary encoding.
+"""
+
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import pennylane as qml
+from fake_api import FakeDjangoAPI
+
+from pennylane_ls import single_qudit_ops, fermion_ops
+from pennylane_ls.result_store import ResultStore
+from pennylane_ls.wire_format import WireFormat, msgpack, zstandard
+
+
+def full_load(experiment):
+    """
+    Every shot finds all atoms in the upper state.
+    """
+    atoms = experiment["instructions"][0][2][0]
+    return [str(atoms)] * experiment["shots"]
+
+
+@unittest.skipIf(msgpack is None or zstandard is None, "requires the wire packages")
+class TestWireFormat(unittest.TestCase):
+    """
+    The test case for the wire format.
+    """
+
+    def make_circuit(self, api, wire_format, **kwargs):
+        """
+        A long circuit on a device with the wire format, which loads some atoms.
+        """
+        test_device = qml.device(
+            "synqs.sqs", shots=50, url=api.url, wire_format=wire_format, **kwargs
+        )
+
+        @qml.qnode(test_device)
+        def quantum_circuit(atoms):
+            single_qudit_ops.Load(atoms, wires=0)
+            for _ in range(40):
+                single_qudit_ops.RLZ(0.0, wires=0)
+            return qml.expval(single_qudit_ops.ZObs(0))
+
+        return quantum_circuit
+
+    def test_negotiated_format(self):
+        """
+        Once the server advertised it, the payloads are sent compressed as
+        msgpack and the shots come back as packed integers.
+        """
+        wire_format = WireFormat(min_size=100)
+        with FakeDjangoAPI(full_load, wire=True) as api:
+            quantum_circuit = self.make_circuit(api, wire_format)
+            self.assertEqual(quantum_circuit(3), 3)
+            self.assertEqual(quantum_circuit(5), 5)
+            first, last = api.body_formats[0], api.body_formats[-1]
+            self.assertEqual(first[:2], ("application/x-www-form-urlencoded", None))
+            self.assertEqual(last[:2], ("application/msgpack", "zstd"))
+            self.assertLess(last[2], first[2])
+        stats = wire_format.stats()
+        self.assertGreater(stats["bytes_decoded"], stats["bytes_received"])
+        self.assertGreater(stats["decode_time"], 0)
+
+    def test_without_zstd(self):
+        """
+        Without a zstd decoder the compression falls back to gzip.
+        """
+        wire_format = WireFormat(min_size=100)
+        with mock.patch("pennylane_ls.wire_format.HAS_ZSTD", False):
+            self.assertNotIn("zstd", wire_format.request_headers()["Accept-Encoding"])
+            with FakeDjangoAPI(full_load, wire=True) as api:
+                quantum_circuit = self.make_circuit(api, wire_format)
+                self.assertEqual(quantum_circuit(3), 3)
+                self.assertEqual(quantum_circuit(5), 5)
+                self.assertEqual(api.body_formats[-1][1], "gzip")
+
+    def test_json_fallback(self):
+        """
+        Servers without the compact formats keep receiving plain forms.
+        """
+        with FakeDjangoAPI(full_load) as api:
+            quantum_circuit = self.make_circuit(api, WireFormat())
+            self.assertEqual(quantum_circuit(3), 3)
+            self.assertEqual(quantum_circuit(4), 4)
+            self.assertEqual(
+                {body_format[:2] for body_format in api.body_formats},
+                {("application/x-www-form-urlencoded", None)},
+            )
+
+    def test_packed_result_store(self):
+        """
+        Packed shots survive the round trip through the result store.
+        """
+        with tempfile.TemporaryDirectory() as directory, FakeDjangoAPI(
+            full_load, wire=True
+        ) as api:
+            store = ResultStore(directory)
+            self.assertEqual(
+                self.make_circuit(api, WireFormat(), result_store=store)(7), 7
+            )
+            self.assertEqual(self.make_circuit(api, None, result_store=store)(7), 7)
+            self.assertEqual(len(api.jobs), 1)
+
+    def test_packed_fermions(self):
+        """
+        The fermion device reads the packed shots in both of its sample modes.
+        """
+        with FakeDjangoAPI(lambda exp: ["1 0 1"] * exp["shots"], wire=True) as api:
+            for packed_samples in (False, True):
+                test_device = qml.device(
+                    "synqs.fs",
+                    wires=3,
+                    shots=10,
+                    url=api.url,
+                    wire_format=WireFormat(),
+                    packed_samples=packed_samples,
+                )
+
+                @qml.qnode(test_device)
+                def quantum_circuit():
+                    fermion_ops.Load(wires=0)
+                    return [qml.expval(fermion_ops.ParticleNumber(i)) for i in range(3)]
+
+                np.testing.assert_allclose(quantum_circuit(), [1, 0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()